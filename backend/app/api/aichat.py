@@ -1,34 +1,63 @@
 """
 AI Chat API Endpoints with RAG and Thread Management
 """
-from fastapi import APIRouter, HTTPException, Body, Depends
-from typing import Dict, Any, Optional, List
-from pydantic import BaseModel
-from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, Body, Depends, Request, BackgroundTasks, Query
+from fastapi.responses import Response, StreamingResponse, ORJSONResponse
+from typing import Dict, Any, Optional, List, Tuple, Annotated, Literal
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from datetime import datetime
 from sqlalchemy.orm import Session
+import asyncio
+import hashlib
 import logging
+import json
+import math
+import msgspec
+import time
 import uuid
 
+from langchain.schema import SystemMessage, HumanMessage
+
 from app.services.rag_chat_service import RAGChatService
+from app.services.chat_dispatcher import BatchingChatDispatcher, EmbeddingBatcher
+from app.services.response_cache import ResponseCache
+from app.services.history_window import MAX_HISTORY_MESSAGES, with_rolling_summary
 from app.services.conversation_service import ConversationService
 from app.services.note_service import NoteService
 from app.models.note import NoteType
-from app.database import get_db
+from app.database import get_db, SessionLocal
+from app.core.clock import now_iso
+from app.core.concurrency import limited_ainvoke
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Initialize services as singleton
-_rag_chat_service = None
+# (the RAG chat service, dispatcher and response cache are created in the app lifespan)
 _conversation_service = None
 _note_service = None
 
-def get_rag_chat_service():
-    global _rag_chat_service
-    if _rag_chat_service is None:
-        logger.info("Initializing RAG chat service (singleton)")
-        _rag_chat_service = RAGChatService()
-    return _rag_chat_service
+def get_rag_chat_service(request: Request) -> RAGChatService:
+    """RAG chat service created during application startup"""
+    service = getattr(request.app.state, "rag_chat_service", None)
+    if service is None:
+        raise HTTPException(status_code=503, detail="RAG chat service is not available")
+    return service
+
+def get_chat_dispatcher(request: Request) -> BatchingChatDispatcher:
+    """Chat dispatcher created during application startup"""
+    dispatcher = getattr(request.app.state, "chat_dispatcher", None)
+    if dispatcher is None:
+        raise HTTPException(status_code=503, detail="RAG chat service is not available")
+    return dispatcher
+
+def get_response_cache(request: Request) -> Optional[ResponseCache]:
+    """Chat response cache created during application startup"""
+    return getattr(request.app.state, "response_cache", None)
+
+def get_embedding_batcher(request: Request) -> Optional[EmbeddingBatcher]:
+    """Query embedding batcher created during application startup"""
+    return getattr(request.app.state, "embedding_batcher", None)
 
 def get_conversation_service():
     global _conversation_service
@@ -44,16 +73,160 @@ def get_note_service():
         _note_service = NoteService()
     return _note_service
 
-class ChatRequest(BaseModel):
+# Probe traffic hits /health and /stats at several Hz; serve their payloads from a short-lived memo
+STATS_TTL_SECONDS = 5
+_payload_cache: Dict[Tuple[str, int], Tuple[float, Dict[str, Any]]] = {}
+
+def _memoized(name: str, rag_chat_service: RAGChatService, compute, fresh: bool = False) -> Dict[str, Any]:
+    """
+    Return compute(rag_chat_service), memoized per endpoint and service instance
+    
+    Args:
+        name: Endpoint name used as part of the cache key
+        rag_chat_service: RAG chat service the payload is computed from
+        compute: Function building the payload
+        fresh: Recompute even if a cached payload is still valid
+        
+    Returns:
+        Payload no older than STATS_TTL_SECONDS
+    """
+    key = (name, id(rag_chat_service))
+    now = time.monotonic()
+    cached = _payload_cache.get(key)
+    if not fresh and cached and now - cached[0] < STATS_TTL_SECONDS:
+        return cached[1]
+    
+    payload = compute(rag_chat_service)
+    _payload_cache[key] = (now, payload)
+    return payload
+
+def _compute_health(rag_chat_service: RAGChatService) -> Dict[str, Any]:
+    """Health payload for /health"""
+    # Check vector service
+    vector_stats = rag_chat_service.vector_service.get_collection_stats()
+    
+    # Check LLM availability
+    llm_available = rag_chat_service.llm is not None
+    
+    return {
+        "status": "healthy",
+        "vector_db": {
+            "status": "connected",
+            "documents": vector_stats.get("unique_documents", 0),
+            "chunks": vector_stats.get("total_chunks", 0),
+            "index": vector_stats.get("index")
+        },
+        "llm": {
+            "status": "available" if llm_available else "unavailable",
+            "model": "gpt-4o-mini" if llm_available else None
+        },
+        "reranker": {
+            "status": "active",
+            "weights": dict(rag_chat_service.reranker.weights)
+        }
+    }
+
+def _compute_stats(rag_chat_service: RAGChatService) -> Dict[str, Any]:
+    """Statistics payload for /stats"""
+    # Get thread statistics from memory service
+    threads = rag_chat_service.memory_service.list_threads()
+    vector_db_stats = rag_chat_service.vector_service.get_collection_stats()
+    total_messages = sum(t["message_count"] for t in threads)
+    
+    return {
+        "active_threads": len(threads),
+        "total_messages": total_messages,
+        "vector_db_stats": vector_db_stats,
+        "reranker_weights": dict(rag_chat_service.reranker.weights)
+    }
+
+# Conversation summary prompt (only the context is substituted per request)
+_SUMMARY_SYSTEM_MESSAGE = SystemMessage(content="あなたは会話を要約する専門家です。明確で簡潔な要約を作成してください。")
+_SUMMARY_PROMPT_TEMPLATE = """以下の会話を要約してください。重要なポイント、質問と回答、結論を含めて、構造化された要約を作成してください。
+
+会話内容:
+{context}
+
+要約形式:
+## 会話の概要
+[会話全体の概要を2-3文で説明]
+
+## 主な質問と回答
+[重要な質問と回答のペアを箇条書きで]
+
+## 重要なポイント
+[会話から得られた重要な情報や洞察を箇条書きで]
+
+## 結論または次のアクション
+[会話の結論や、次に取るべきアクションがあれば記載]"""
+
+# Transcripts longer than one window are summarized map-reduce style
+SUMMARY_WINDOW_CHARS = 6000
+_PARTIAL_SUMMARY_PROMPT_TEMPLATE = """以下は長い会話の一部（{index}/{total}）です。重要な質問と回答、決定事項を箇条書きで簡潔にまとめてください。
+
+会話内容:
+{context}"""
+
+def _split_context(context: str, window_chars: int = SUMMARY_WINDOW_CHARS) -> List[str]:
+    """Split a transcript on line boundaries into windows of about window_chars"""
+    windows = []
+    current = ""
+    for line in context.split("\n"):
+        if current and len(current) + len(line) + 1 > window_chars:
+            windows.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        windows.append(current)
+    return windows
+
+async def _summarize_context(llm, context: str) -> str:
+    """
+    Summarize a conversation transcript
+    
+    Short transcripts take a single LLM call. Longer ones are split into
+    windows summarized concurrently (map), then combined in one call (reduce).
+    
+    Args:
+        llm: Chat model
+        context: Transcript text
+        
+    Returns:
+        Summary text
+    """
+    windows = _split_context(context)
+    if len(windows) > 1:
+        prompts = [
+            [
+                _SUMMARY_SYSTEM_MESSAGE,
+                HumanMessage(content=_PARTIAL_SUMMARY_PROMPT_TEMPLATE.format(
+                    index=i + 1, total=len(windows), context=window
+                ))
+            ]
+            for i, window in enumerate(windows)
+        ]
+        partials = await asyncio.gather(*(limited_ainvoke(llm, prompt) for prompt in prompts))
+        context = "\n\n".join(
+            f"（パート{i + 1}の要約）\n{partial.content}" for i, partial in enumerate(partials)
+        )
+    
+    response = await limited_ainvoke(llm, [
+        _SUMMARY_SYSTEM_MESSAGE,
+        HumanMessage(content=_SUMMARY_PROMPT_TEMPLATE.format(context=context))
+    ])
+    return response.content
+
+# Hot-path models use msgspec: JSON decoding and validation happen in a single pass
+class ChatRequest(msgspec.Struct):
     """Chat request model"""
-    message: str
+    message: Annotated[str, msgspec.Meta(min_length=1, max_length=8000)]
     conversation_id: Optional[str] = None
     use_reranking: Optional[bool] = True
-    n_results: Optional[int] = 10
+    n_results: Annotated[int, msgspec.Meta(ge=1, le=50)] = 10
     use_database: Optional[bool] = True
     use_web_search: Optional[bool] = False
 
-class ChatResponse(BaseModel):
+class ChatResponse(msgspec.Struct):
     """Chat response model"""
     query: str
     response: str
@@ -62,16 +235,148 @@ class ChatResponse(BaseModel):
     search_results: int
     processing_time: float
 
+def _encode_hook(obj: Any) -> Any:
+    """Convert numpy scalars that may appear in search metadata"""
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise NotImplementedError(f"Cannot encode {type(obj).__name__}")
+
+_json_encoder = msgspec.json.Encoder(enc_hook=_encode_hook)
+
+async def decode_chat_request(http_request: Request) -> ChatRequest:
+    """Decode and validate the chat request body"""
+    try:
+        return msgspec.json.decode(await http_request.body(), type=ChatRequest)
+    except msgspec.DecodeError as e:
+        # ValidationError is a subclass of DecodeError
+        raise HTTPException(status_code=422, detail=str(e))
+
+# The /chat body is decoded by msgspec rather than FastAPI, so its schema is
+# supplied to OpenAPI explicitly (both structs are flat, so no $refs remain)
+_chat_schemas = msgspec.json.schema_components([ChatRequest, ChatResponse])[1]
+CHAT_OPENAPI_EXTRA = {
+    "requestBody": {
+        "content": {"application/json": {"schema": _chat_schemas["ChatRequest"]}},
+        "required": True
+    }
+}
+CHAT_RESPONSES = {
+    200: {
+        "description": "AI-generated response with sources",
+        "content": {"application/json": {"schema": _chat_schemas["ChatResponse"]}}
+    }
+}
+
 class ConversationHistoryRequest(BaseModel):
     """Conversation history request"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
     conversation_id: str
 
+RerankerWeightName = Literal["similarity", "keyword_match", "recency", "chunk_position", "doc_frequency"]
+
 class RerankerWeightsRequest(BaseModel):
     """Reranker weights update request"""
-    weights: Dict[str, float]
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    # Unknown weight names are rejected with a 422 instead of being merged in
+    weights: Dict[RerankerWeightName, Annotated[float, Field(ge=0, le=1)]]
+    
+    @model_validator(mode="after")
+    def check_weight_sum(self):
+        # Weights should sum to 1.0 approximately
+        weight_sum = math.fsum(self.weights.values())
+        if abs(weight_sum - 1.0) > 0.01:
+            raise ValueError(f"Weights should sum to 1.0, got {weight_sum}")
+        return self
+
+# Futures for chat requests currently being processed, keyed by request hash
+_inflight: Dict[str, asyncio.Future] = {}
+
+def _inflight_key(request: ChatRequest) -> str:
+    """Hash of the normalized message and the options that change the answer"""
+    raw = "|".join([
+        " ".join(request.message.lower().split()),
+        str(request.n_results),
+        str(request.use_reranking),
+        str(request.use_database),
+        str(request.use_web_search)
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+async def _run_once(key: str, factory) -> Dict[str, Any]:
+    """
+    Run factory() unless an identical request is already in flight,
+    in which case wait for that run's result instead (singleflight)
+    
+    Args:
+        key: Request hash
+        factory: Coroutine function producing the chat result
+        
+    Returns:
+        A private copy of the chat result
+    """
+    existing = _inflight.get(key)
+    if existing is not None:
+        logger.info("Joining identical in-flight chat request")
+        return dict(await asyncio.shield(existing))
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await factory()
+        future.set_result(result)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark as retrieved so an unobserved failure is not logged twice
+        future.exception()
+        raise
+    finally:
+        del _inflight[key]
+    
+    return dict(result)
+
+def _assistant_message(content: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Assistant message with its retrieval metadata, as stored in a thread"""
+    return {
+        "role": "assistant",
+        "content": content,
+        "timestamp": now_iso(),
+        "metadata": {
+            "sources": result.get("sources", []),
+            "search_results": result.get("search_results", 0),
+            "processing_time": result.get("processing_time", 0),
+            "used_reranking": result.get("used_reranking", False),
+            "search_type": result.get("search_type", "database")
+        }
+    }
+
+def _save_message_detached(conversation_id: str, message: Dict[str, Any]) -> None:
+    """
+    Append a message to a thread using a session of its own
+    
+    Runs after the response has been sent, when the request-scoped
+    session is already closed.
+    """
+    db = SessionLocal()
+    try:
+        get_conversation_service().add_message(db, conversation_id, message)
+    except Exception as e:
+        logger.error(f"Failed to save assistant message: {e}")
+    finally:
+        db.close()
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, db: Session = Depends(get_db)):
+@router.post("/chat", openapi_extra=CHAT_OPENAPI_EXTRA, responses=CHAT_RESPONSES)
+async def chat(
+    background_tasks: BackgroundTasks,
+    request: ChatRequest = Depends(decode_chat_request),
+    db: Session = Depends(get_db),
+    rag_chat_service: RAGChatService = Depends(get_rag_chat_service),
+    chat_dispatcher: BatchingChatDispatcher = Depends(get_chat_dispatcher),
+    response_cache: Optional[ResponseCache] = Depends(get_response_cache),
+    embedding_batcher: Optional[EmbeddingBatcher] = Depends(get_embedding_batcher)
+):
     """
     RAG-enhanced chat endpoint
     
@@ -83,73 +388,206 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)):
     """
     try:
         # Get service instances
-        rag_chat_service = get_rag_chat_service()
         conversation_service = get_conversation_service()
         
         # Generate conversation ID if not provided
         conversation_id = request.conversation_id or str(uuid.uuid4())
         
-        # Save user message to database
+        # Save user message to database while the answer is being produced
         user_message = {
             "role": "user",
             "content": request.message,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": now_iso()
         }
-        conversation_service.add_message(db, conversation_id, user_message)
-        
-        # Process chat
-        result = await rag_chat_service.chat(
-            query=request.message,
-            conversation_id=conversation_id,
-            n_results=request.n_results,
-            use_reranking=request.use_reranking,
-            use_database=request.use_database,
-            use_web_search=request.use_web_search
+        save_user_message = asyncio.to_thread(conversation_service.add_message, db, conversation_id, user_message)
+        
+        async def produce_result() -> Dict[str, Any]:
+            # Answers inside an existing thread depend on its history, so only
+            # the opening question of a conversation goes through the cache
+            use_cache = (
+                response_cache is not None
+                and request.conversation_id is None
+                and response_cache.is_cacheable(request)
+            )
+            query_embedding = None
+            result = None
+            if use_cache:
+                if embedding_batcher is not None:
+                    try:
+                        query_embedding = response_cache.normalize_embedding(
+                            await embedding_batcher.embed(request.message)
+                        )
+                    except Exception as e:
+                        logger.warning(f"Batched query embedding failed: {e}")
+                else:
+                    query_embedding = await asyncio.to_thread(response_cache.embed_query, request.message)
+                result = await response_cache.get(request, query_embedding)
+            
+            if result is not None:
+                result['conversation_id'] = conversation_id
+                result['processing_time'] = 0.0
+                await asyncio.to_thread(
+                    rag_chat_service.store_exchange, conversation_id, request.message, result.get("response", "")
+                )
+                return result
+            
+            async def run_pipeline() -> Dict[str, Any]:
+                # Process chat (coalesced with concurrent requests)
+                pipeline_result = await chat_dispatcher.submit(
+                    query=request.message,
+                    conversation_id=conversation_id,
+                    n_results=request.n_results,
+                    use_reranking=request.use_reranking,
+                    use_database=request.use_database,
+                    use_web_search=request.use_web_search
+                )
+                if use_cache:
+                    await response_cache.put(request, pipeline_result, query_embedding)
+                return pipeline_result
+            
+            # Follow-up turns depend on their thread's history and are never shared
+            if request.conversation_id is not None:
+                return await run_pipeline()
+            
+            # Identical opening questions already in flight share one pipeline run
+            result = await _run_once(_inflight_key(request), run_pipeline)
+            if result.get("conversation_id") != conversation_id:
+                # Joined another request's run, which only recorded the exchange
+                # in its own conversation's memory
+                await asyncio.to_thread(
+                    rag_chat_service.store_exchange, conversation_id, request.message, result.get("response", "")
+                )
+            return result
+        
+        result, _ = await asyncio.gather(produce_result(), save_user_message)
+        
+        # Save assistant response with metadata once the response has been sent
+        background_tasks.add_task(
+            _save_message_detached,
+            conversation_id,
+            _assistant_message(result.get("response", ""), result)
         )
         
-        # Save assistant response to database with metadata
-        assistant_message = {
-            "role": "assistant",
-            "content": result.get("response", ""),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "metadata": {
-                "sources": result.get("sources", []),
-                "search_results": result.get("search_results", 0),
-                "processing_time": result.get("processing_time", 0),
-                "used_reranking": result.get("used_reranking", False),
-                "search_type": result.get("search_type", "database")
-            }
-        }
-        conversation_service.add_message(db, conversation_id, assistant_message)
-        
         # Add conversation ID to result
         result['conversation_id'] = conversation_id
         
-        return result
+        return Response(
+            content=_json_encoder.encode(msgspec.convert(result, ChatResponse)),
+            media_type="application/json"
+        )
         
     except Exception as e:
         logger.error(f"Chat error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one named Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
 @router.post("/chat/stream")
-async def chat_stream(request: ChatRequest):
+async def chat_stream(
+    request: ChatRequest = Depends(decode_chat_request),
+    db: Session = Depends(get_db),
+    rag_chat_service: RAGChatService = Depends(get_rag_chat_service)
+):
     """
-    Streaming chat endpoint (for future implementation)
+    Streaming RAG chat endpoint (Server-Sent Events)
     
     Args:
-        request: Chat request
+        request: Chat request with message and options
         
     Returns:
-        Streamed response chunks
+        text/event-stream with a "sources" event once retrieval finishes,
+        one "token" event ({"delta": ...}) per generated token and a final
+        "done" event carrying the response metadata
     """
-    # Placeholder for streaming implementation
-    raise HTTPException(
-        status_code=501, 
-        detail="Streaming chat not yet implemented"
+    try:
+        conversation_service = get_conversation_service()
+        
+        conversation_id = request.conversation_id or str(uuid.uuid4())
+        
+        # Save user message before streaming starts
+        user_message = {
+            "role": "user",
+            "content": request.message,
+            "timestamp": now_iso()
+        }
+        await asyncio.to_thread(conversation_service.add_message, db, conversation_id, user_message)
+        
+    except Exception as e:
+        logger.error(f"Chat stream error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def event_stream():
+        parts = []
+        summary = {}
+        try:
+            async for event, data in rag_chat_service.achat_stream(
+                query=request.message,
+                conversation_id=conversation_id,
+                n_results=request.n_results,
+                use_reranking=request.use_reranking,
+                use_database=request.use_database,
+                use_web_search=request.use_web_search
+            ):
+                if event == "token":
+                    parts.append(data)
+                    yield _sse_event("token", {"delta": data})
+                elif event == "sources":
+                    yield _sse_event("sources", data)
+                else:
+                    summary = data
+            
+            summary['conversation_id'] = conversation_id
+            summary['done'] = True
+            yield _sse_event("done", summary)
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield _sse_event("error", {"error": str(e), "done": True})
+        finally:
+            # Also runs when the client disconnects mid-answer, so the partial
+            # answer is kept; not awaited because the generator may be cancelled
+            if parts:
+                asyncio.get_running_loop().run_in_executor(
+                    None,
+                    _save_message_detached,
+                    conversation_id,
+                    _assistant_message("".join(parts), summary)
+                )
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
+@router.get("/source/{source_id}")
+async def get_source(source_id: str, rag_chat_service: RAGChatService = Depends(get_rag_chat_service)):
+    """
+    Get the full text of a chat source chunk
+    
+    Args:
+        source_id: Source ID from a chat response's sources
+        
+    Returns:
+        Chunk text and metadata
+    """
+    try:
+        chunk = await asyncio.to_thread(rag_chat_service.vector_service.get_chunk, source_id)
+        
+        if not chunk:
+            raise HTTPException(status_code=404, detail="Source not found")
+        
+        return chunk
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get source error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/conversation/{conversation_id}")
-async def get_conversation(conversation_id: str):
+async def get_conversation(conversation_id: str, rag_chat_service: RAGChatService = Depends(get_rag_chat_service)):
     """
     Get conversation history
     
@@ -160,8 +598,7 @@ async def get_conversation(conversation_id: str):
         Conversation history
     """
     try:
-        rag_chat_service = get_rag_chat_service()
-        history = rag_chat_service.get_conversation_history(conversation_id)
+        history = await asyncio.to_thread(rag_chat_service.get_conversation_history, conversation_id)
         
         return {
             "conversation_id": conversation_id,
@@ -174,7 +611,7 @@ async def get_conversation(conversation_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/conversation/{conversation_id}")
-async def clear_conversation(conversation_id: str):
+async def clear_conversation(conversation_id: str, rag_chat_service: RAGChatService = Depends(get_rag_chat_service)):
     """
     Clear conversation history
     
@@ -185,8 +622,7 @@ async def clear_conversation(conversation_id: str):
         Success status
     """
     try:
-        rag_chat_service = get_rag_chat_service()
-        success = rag_chat_service.clear_conversation(conversation_id)
+        success = await asyncio.to_thread(rag_chat_service.clear_conversation, conversation_id)
         
         if success:
             return {"success": True, "message": f"Conversation {conversation_id} cleared"}
@@ -207,7 +643,7 @@ async def get_threads(db: Session = Depends(get_db)):
     """
     try:
         conversation_service = get_conversation_service()
-        threads = conversation_service.list_threads(db)
+        threads = await asyncio.to_thread(conversation_service.list_threads, db)
         logger.info(f"API returning {len(threads)} threads")
         return threads
         
@@ -225,7 +661,7 @@ async def create_thread(title: Optional[str] = None, db: Session = Depends(get_d
     """
     try:
         conversation_service = get_conversation_service()
-        thread = conversation_service.create_thread(db, title)
+        thread = await asyncio.to_thread(conversation_service.create_thread, db, title)
         return thread
         
     except Exception as e:
@@ -245,7 +681,7 @@ async def delete_thread(thread_id: str, db: Session = Depends(get_db)):
     """
     try:
         conversation_service = get_conversation_service()
-        success = conversation_service.delete_thread(db, thread_id)
+        success = await asyncio.to_thread(conversation_service.delete_thread, db, thread_id)
         
         if not success:
             raise HTTPException(status_code=404, detail="Thread not found")
@@ -259,7 +695,7 @@ async def delete_thread(thread_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/reranker/weights")
-async def update_reranker_weights(request: RerankerWeightsRequest):
+async def update_reranker_weights(request: RerankerWeightsRequest, rag_chat_service: RAGChatService = Depends(get_rag_chat_service)):
     """
     Update reranker weights for experimentation
     
@@ -270,13 +706,9 @@ async def update_reranker_weights(request: RerankerWeightsRequest):
         Success status
     """
     try:
-        # Validate weights (should sum to 1.0 approximately)
-        weight_sum = sum(request.weights.values())
-        if abs(weight_sum - 1.0) > 0.01:
-            raise ValueError(f"Weights should sum to 1.0, got {weight_sum}")
-        
-        rag_chat_service = get_rag_chat_service()
         rag_chat_service.update_reranker_weights(request.weights)
+        # Cached /health and /stats payloads include the old weights
+        _payload_cache.clear()
         
         return {
             "success": True,
@@ -289,7 +721,10 @@ async def update_reranker_weights(request: RerankerWeightsRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/health")
-async def health_check():
+async def health_check(
+    fresh: bool = Query(False, description="Bypass the short-lived cache"),
+    rag_chat_service: RAGChatService = Depends(get_rag_chat_service)
+):
     """
     Health check for AI chat service
     
@@ -297,30 +732,7 @@ async def health_check():
         Service health status
     """
     try:
-        rag_chat_service = get_rag_chat_service()
-        
-        # Check vector service
-        vector_stats = rag_chat_service.vector_service.get_collection_stats()
-        
-        # Check LLM availability
-        llm_available = rag_chat_service.llm is not None
-        
-        return {
-            "status": "healthy",
-            "vector_db": {
-                "status": "connected",
-                "documents": vector_stats.get("unique_documents", 0),
-                "chunks": vector_stats.get("total_chunks", 0)
-            },
-            "llm": {
-                "status": "available" if llm_available else "unavailable",
-                "model": "gpt-4o-mini" if llm_available else None
-            },
-            "reranker": {
-                "status": "active",
-                "weights": rag_chat_service.reranker.weights
-            }
-        }
+        return await asyncio.to_thread(_memoized, "health", rag_chat_service, _compute_health, fresh)
         
     except Exception as e:
         logger.error(f"Health check error: {e}")
@@ -330,7 +742,10 @@ async def health_check():
         }
 
 @router.get("/stats")
-async def get_stats():
+async def get_stats(
+    fresh: bool = Query(False, description="Bypass the short-lived cache"),
+    rag_chat_service: RAGChatService = Depends(get_rag_chat_service)
+):
     """
     Get chat service statistics
     
@@ -338,18 +753,7 @@ async def get_stats():
         Service statistics
     """
     try:
-        rag_chat_service = get_rag_chat_service()
-        
-        # Get thread statistics from memory service
-        threads = rag_chat_service.memory_service.list_threads()
-        total_messages = sum(t["message_count"] for t in threads)
-        
-        return {
-            "active_threads": len(threads),
-            "total_messages": total_messages,
-            "vector_db_stats": rag_chat_service.vector_service.get_collection_stats(),
-            "reranker_weights": rag_chat_service.reranker.weights
-        }
+        return await asyncio.to_thread(_memoized, "stats", rag_chat_service, _compute_stats, fresh)
         
     except Exception as e:
         logger.error(f"Get stats error: {e}")
@@ -357,7 +761,7 @@ async def get_stats():
 
 # Thread Management Endpoints (removed duplicates - using PostgreSQL-backed endpoints above)
 
-@router.get("/threads/{thread_id}")
+@router.get("/threads/{thread_id}", response_class=ORJSONResponse)
 async def get_thread(thread_id: str, db: Session = Depends(get_db)):
     """
     Get thread information and messages
@@ -370,7 +774,7 @@ async def get_thread(thread_id: str, db: Session = Depends(get_db)):
     """
     try:
         conversation_service = get_conversation_service()
-        thread = conversation_service.get_thread(db, thread_id)
+        thread = await asyncio.to_thread(conversation_service.get_thread, db, thread_id)
         
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
@@ -384,7 +788,12 @@ async def get_thread(thread_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/threads/{thread_id}/summarize")
-async def summarize_thread(thread_id: str, save_as_note: bool = False, db: Session = Depends(get_db)):
+async def summarize_thread(
+    thread_id: str,
+    save_as_note: bool = False,
+    db: Session = Depends(get_db),
+    rag_chat_service: RAGChatService = Depends(get_rag_chat_service)
+):
     """
     Summarize a conversation thread using LLM and optionally save as note
     
@@ -396,18 +805,21 @@ async def summarize_thread(thread_id: str, save_as_note: bool = False, db: Sessi
         Summarized conversation and note info if saved
     """
     try:
-        rag_chat_service = get_rag_chat_service()
         conversation_service = get_conversation_service()
         note_service = get_note_service()
         
-        # Get thread info and messages from PostgreSQL
-        thread_info = conversation_service.get_thread(db, thread_id)
+        # Get thread info and the (role, content) of its recent messages from PostgreSQL
+        thread_info = await asyncio.to_thread(
+            conversation_service.get_thread_transcript, db, thread_id, MAX_HISTORY_MESSAGES
+        )
         if not thread_info:
             raise HTTPException(status_code=404, detail="Thread not found")
         
-        # Build context from messages
-        messages = thread_info.get('messages', [])
-        context = "\n".join([f"{msg['role']}: {msg['content']}" for msg in messages])
+        # Build context from the recent window plus the rolling summary of older messages
+        context = "\n".join(f"{role}: {content}" for role, content in thread_info["transcript"])
+        if thread_info.get("message_count", 0) > MAX_HISTORY_MESSAGES:
+            rolling_summary = await asyncio.to_thread(rag_chat_service.memory_service.get_rolling_summary, thread_id)
+            context = with_rolling_summary(context, rolling_summary)
         
         if not context:
             return {
@@ -416,36 +828,20 @@ async def summarize_thread(thread_id: str, save_as_note: bool = False, db: Sessi
                 "thread_id": thread_id
             }
         
+        # Reuse the last summary while the thread is unchanged
+        memory_service = rag_chat_service.memory_service
+        summary_version = hashlib.md5(
+            f"{thread_info.get('message_count', 0)}:{thread_info.get('updated_at')}".encode()
+        ).hexdigest()[:8]
+        summary = await asyncio.to_thread(memory_service.get_cached_summary, thread_id, summary_version)
+        
         # Generate summary using LLM
-        if rag_chat_service.llm:
-            from langchain.schema import SystemMessage, HumanMessage
-            
-            summary_prompt = f"""以下の会話を要約してください。重要なポイント、質問と回答、結論を含めて、構造化された要約を作成してください。
-
-会話内容:
-{context}
-
-要約形式:
-## 会話の概要
-[会話全体の概要を2-3文で説明]
-
-## 主な質問と回答
-[重要な質問と回答のペアを箇条書きで]
-
-## 重要なポイント
-[会話から得られた重要な情報や洞察を箇条書きで]
-
-## 結論または次のアクション
-[会話の結論や、次に取るべきアクションがあれば記載]"""
-            
-            messages = [
-                SystemMessage(content="あなたは会話を要約する専門家です。明確で簡潔な要約を作成してください。"),
-                HumanMessage(content=summary_prompt)
-            ]
-            
+        if summary is not None:
+            logger.info(f"Using cached summary for thread {thread_id}")
+        elif rag_chat_service.llm:
             try:
-                response = rag_chat_service.llm.invoke(messages)
-                summary = response.content
+                summary = await _summarize_context(rag_chat_service.llm, context)
+                await asyncio.to_thread(memory_service.set_cached_summary, thread_id, summary_version, summary)
             except Exception as e:
                 logger.error(f"LLM summarization error: {e}")
                 # Fallback to simple summary
@@ -468,7 +864,8 @@ async def summarize_thread(thread_id: str, save_as_note: bool = False, db: Sessi
             note_title = f"[会話要約] {thread_info.get('title', '無題の会話')}"
             tags = ["AI会話", "要約", datetime.now().strftime("%Y年%m月%d日")]
             
-            note = note_service.create_note(
+            note = await asyncio.to_thread(
+                note_service.create_note,
                 db=db,
                 title=note_title,
                 content=summary,
@@ -502,7 +899,7 @@ async def clear_all_threads(db: Session = Depends(get_db)):
     """
     try:
         conversation_service = get_conversation_service()
-        success = conversation_service.clear_all_threads(db)
+        success = await asyncio.to_thread(conversation_service.clear_all_threads, db)
         
         return {"success": success, "message": "All threads cleared"}
         
@@ -4,24 +4,23 @@ from datetime import datetime
 import uuid
 
 from app.schemas.chat import ChatRequest, ChatResponse, Message
-from app.services.chat_service import ChatService
-from app.services.vector_search import VectorSearchService
+from app.services.chat_service import ChatService, get_chat_service
+from app.services.vector_search import VectorSearchService, get_vector_search_service
+from app.services.history_writer import history_writer
 from app.core.database import get_mongodb, get_redis
+from app.core.clock import now_iso
 
 router = APIRouter()
 
 @router.post("/", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    mongodb=Depends(get_mongodb),
-    redis_client=Depends(get_redis)
+    redis_client=Depends(get_redis),
+    chat_service: ChatService = Depends(get_chat_service),
+    vector_service: VectorSearchService = Depends(get_vector_search_service)
 ):
     """チャットエンドポイント"""
     try:
-        # サービスの初期化
-        chat_service = ChatService()
-        vector_service = VectorSearchService()
-        
         # 関連ドキュメントの検索
         relevant_docs = await vector_service.search(
             query=request.message,
@@ -40,7 +39,7 @@ async def chat(
             id=str(uuid.uuid4()),
             type="assistant",
             content=response_content,
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso(),
             documents=relevant_docs[:3],  # Top 3 documents
             metadata={
                 "relatedDocsCount": len(relevant_docs),
@@ -48,10 +47,10 @@ async def chat(
             }
         )
         
-        # 履歴の保存
-        await mongodb.chat_history.insert_one({
+        # 履歴の保存（応答を待たせないようバッファに積み、バックグラウンドでまとめて書き込む）
+        history_writer.put_nowait({
             "session_id": request.session_id,
-            "message": message.dict(),
+            "message": message.model_dump(mode="json"),
             "created_at": datetime.now()
         })
         
@@ -71,15 +70,17 @@ async def get_chat_history(
 ):
     """チャット履歴の取得"""
     try:
-        cursor = mongodb.chat_history.find(
-            {"session_id": session_id}
-        ).sort("created_at", -1).limit(limit)
-        
-        messages = []
-        async for doc in cursor:
-            messages.append(Message(**doc["message"]))
+        # 最新N件をサーバー側で時系列順に並べ直し、messageフィールドだけを返す
+        cursor = mongodb.chat_history.aggregate([
+            {"$match": {"session_id": session_id}},
+            {"$sort": {"created_at": -1}},
+            {"$limit": limit},
+            {"$sort": {"created_at": 1}},
+            {"$project": {"message": 1, "_id": 0}}
+        ])
+        docs = await cursor.to_list(length=limit)
         
-        return messages[::-1]  # 時系列順に並び替え
+        return [Message(**doc["message"]) for doc in docs]
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -2,11 +2,21 @@
 ファイル変換APIエンドポイント
 ファイルのアップロードと変換処理を管理
 """
+import io
 import os
-import shutil
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Form
-from fastapi.responses import FileResponse
-from typing import List
+import codecs
+import hashlib
+import itertools
+import uuid
+import asyncio
+import threading
+import mimetypes
+from functools import lru_cache
+import aiofiles
+from datetime import datetime
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Form, Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse
+from typing import Dict, List, Optional, Tuple
 from app.models.data_models import (
     ConversionResult, BatchConversionResult, ConversionStatus
 )
@@ -18,6 +28,7 @@ from app.api.websocket import manager
 from app.services.cancel_manager import cancel_manager
 from app.services.metadata_service import MetadataService
 from app.services.langchain_vectorization_service import LangChainVectorizationService
+from app.services.conversion_cache import ConversionCache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,6 +40,338 @@ api_service = APIService()
 enhanced_service = EnhancedConversionService()
 metadata_service = MetadataService()
 langchain_vectorization_service = LangChainVectorizationService()
+conversion_cache = ConversionCache()
+# 変換サービスが保持するAI変換サービスを共有（リクエストごとに生成しない）
+markitdown_ai_service = conversion_service.markitdown_ai_service
+
+# 強化変換エンドポイントが受け付ける拡張子（mdは対象外）
+ENHANCED_SUPPORTED_FORMATS = conversion_service.supported_formats - {'md'}
+
+# エラーメッセージと/supported-formats応答用に一度だけ整列した形式一覧
+SUPPORTED_FORMATS_LIST = tuple(sorted(conversion_service.supported_formats))
+SUPPORTED_FORMATS_TEXT = ', '.join(SUPPORTED_FORMATS_LIST)
+ENHANCED_SUPPORTED_FORMATS_TEXT = ', '.join(sorted(ENHANCED_SUPPORTED_FORMATS))
+
+# ブラウザでそのまま表示できるMIMEタイプ
+BROWSER_VIEWABLE = frozenset({
+    'application/pdf',
+    'text/plain',
+    'text/html',
+    'text/css',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'text/xml',
+    'image/jpeg',
+    'image/png',
+    'image/gif',
+    'image/svg+xml',
+    'image/webp',
+    'video/mp4',
+    'video/webm',
+    'audio/mpeg',
+    'audio/wav',
+    'audio/webm'
+})
+
+# WebSocket進捗通知の間引き: 最小の進捗差（%）と最小送信間隔（秒）
+PROGRESS_MIN_STEP = 1
+PROGRESS_MIN_INTERVAL = 0.1
+
+# アップロード保存時の読み書き単位（1MiB）と最大サイズ（100MB）
+UPLOAD_CHUNK_SIZE = 1 << 20
+MAX_UPLOAD_SIZE = 100 * 1024 * 1024
+
+# 一括変換時にOpenAI APIへ同時に送るMarkdown強化リクエストの上限
+BATCH_ENHANCE_CONCURRENCY = 8
+
+# URL変換の出力ファイル名: プロセスごとの乱数（再起動後も重複しない）と連番
+_URL_OUTPUT_NONCE = os.urandom(4).hex()
+_url_output_counter = itertools.count()
+
+class UploadTooLargeError(Exception):
+    """アップロードが最大サイズを超えた（保存途中のファイルは削除済み）"""
+
+def _upload_fd(file: UploadFile) -> Optional[int]:
+    """
+    アップロードがディスク上の一時ファイルに書き出されていればそのfdを返す
+    
+    SpooledTemporaryFileはメモリ上にある間fileno()を呼ぶとディスクへ書き出してしまうため、
+    書き出し済み（_rolled）の場合のみfdを取得する。
+    """
+    if not hasattr(os, "sendfile"):
+        return None
+    spooled = file.file
+    if hasattr(spooled, "_rolled") and not spooled._rolled:
+        return None
+    try:
+        return spooled.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+def _upload_hasher():
+    """アップロード内容のハッシュ（変換キャッシュのキー）"""
+    return hashlib.blake2b(digest_size=32)
+
+def _sendfile_copy(src_fd: int, path: str, max_size: int) -> None:
+    """os.sendfileでカーネル内コピー（ユーザー空間のバッファを経由しない）"""
+    size = os.fstat(src_fd).st_size
+    if size > max_size:
+        raise UploadTooLargeError(f"upload is {size} bytes, limit is {max_size}")
+    with open(path, "wb") as dst:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+async def _save_upload(
+    file: UploadFile,
+    path: str,
+    max_size: int = MAX_UPLOAD_SIZE,
+    with_digest: bool = False
+) -> Optional[str]:
+    """
+    アップロードファイルを非同期に保存（イベントループをブロックしない）
+    
+    ハッシュが不要な場合、ディスク上のアップロードはsendfileでコピーする。
+    ハッシュが必要な場合は、内容を読み直さないようチャンク単位のコピーと同時に計算する。
+    
+    Args:
+        file: アップロードファイル
+        path: 保存先のパス
+        max_size: 最大サイズ（超えた時点で保存を中止してUploadTooLargeErrorを送出）
+        with_digest: アップロード内容のハッシュを計算するか
+    
+    Returns:
+        アップロード内容のハッシュ（with_digestがFalseの場合はNone）
+    """
+    if not with_digest:
+        src_fd = _upload_fd(file)
+        if src_fd is not None:
+            try:
+                await asyncio.to_thread(_sendfile_copy, src_fd, path, max_size)
+                return None
+            except OSError as e:
+                logger.warning(f"sendfile copy failed, falling back to chunked copy: {e}")
+    
+    # ハッシュが必要な場合、メモリ上のアップロード、またはsendfileが使えない場合はチャンク単位でコピー
+    await file.seek(0)
+    hasher = _upload_hasher() if with_digest else None
+    written = 0
+    async with aiofiles.open(path, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > max_size:
+                break
+            if hasher:
+                hasher.update(chunk)
+            await buffer.write(chunk)
+    
+    # サイズ超過の場合は書きかけのファイルを残さない
+    if written > max_size:
+        await asyncio.to_thread(os.remove, path)
+        raise UploadTooLargeError(f"upload exceeds {max_size} bytes")
+    
+    return hasher.hexdigest() if hasher else None
+
+async def _stat_or_404(filepath: str, detail: str = "File not found") -> os.stat_result:
+    """
+    ファイルをstatし、存在しなければ404を送出（exists確認とstatを1回のシステムコールで行う）
+    
+    Args:
+        filepath: 対象ファイルのパス
+        detail: 404時のエラーメッセージ
+    
+    Returns:
+        statの結果（FileResponseのstat_resultにそのまま渡せる）
+    """
+    try:
+        return await asyncio.to_thread(os.stat, filepath)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=detail)
+
+async def _apply_enhancement(
+    result: Optional[ConversionResult],
+    output_filename: Optional[str] = None
+) -> bool:
+    """
+    変換済みMarkdownを強化し、1回の非同期書き込みで原子的に保存して結果に反映
+    
+    失敗した場合はログに記録し、変換結果は元のまま返す。
+    
+    Args:
+        result: 変換結果（完了していない場合は何もしない）
+        output_filename: 出力ファイル名（result.output_fileが未設定の場合に使用）
+    
+    Returns:
+        強化した結果を保存できたか
+    """
+    if not result or result.status != ConversionStatus.COMPLETED:
+        return False
+    
+    output_path = os.path.join("./converted", result.output_file or output_filename)
+    try:
+        # メモリ上の変換結果を優先し、未設定の場合のみファイルから読み込む
+        content = result.markdown_content
+        if not content:
+            async with aiofiles.open(output_path, 'r', encoding='utf-8') as f:
+                content = await f.read()
+        
+        enhanced_content = await api_service.enhance_markdown(content)
+        
+        # 一時ファイルに書き込んでから置き換え、読み込み中のファイルが途中で切れないようにする
+        tmp_path = f"{output_path}.tmp"
+        try:
+            async with aiofiles.open(tmp_path, 'w', encoding='utf-8') as f:
+                await f.write(enhanced_content)
+            await asyncio.to_thread(os.replace, tmp_path, output_path)
+        except Exception:
+            try:
+                await asyncio.to_thread(os.remove, tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        
+        result.markdown_content = enhanced_content
+        return True
+    except Exception as e:
+        logger.error(f"Markdown強化エラー: {e}")
+        return False
+
+@lru_cache(maxsize=2048)
+def _guess_mime(ext: str) -> Optional[str]:
+    """
+    拡張子からMIMEタイプを推定（拡張子ごとに結果をキャッシュ）
+    
+    Args:
+        ext: ファイル拡張子（先頭のドットの有無は問わない）
+    
+    Returns:
+        MIMEタイプ（不明な場合はNone）
+    """
+    mime_type, _ = mimetypes.guess_type("x." + ext.lower().lstrip('.'))
+    return mime_type
+
+# 一覧表示用のサイズ単位
+KIB = 1024
+MIB = 1024 * 1024
+
+@lru_cache(maxsize=4096)
+def _size_label(tenths: int, unit: str) -> str:
+    """0.1単位に丸めたサイズの表示文字列（整数演算のみ、結果はキャッシュ）"""
+    return f"{tenths // 10}.{tenths % 10} {unit}"
+
+def _format_size(size: int) -> str:
+    """ファイルサイズを一覧表示用の文字列に整形（1MB未満はKB表記、小数1桁。丸めは"{:.1f}"と同じ偶数丸め）"""
+    unit, label = (KIB, "KB") if size < MIB else (MIB, "MB")
+    tenths, remainder = divmod(size * 10, unit)
+    if remainder * 2 > unit or (remainder * 2 == unit and tenths % 2):
+        tenths += 1
+    return _size_label(tenths, label)
+
+@lru_cache(maxsize=4096)
+def _modified_at(mtime: float) -> datetime:
+    """更新日時をdatetimeに変換（ISO形式への変換はorjsonが行う。同じ更新日時の結果はキャッシュ）"""
+    return datetime.fromtimestamp(mtime)
+
+# ファイル内容取得APIの上限: preview指定時の読み込みバイト数と、JSONで返すテキストの最大サイズ
+PREVIEW_READ_SIZE = 4096
+INLINE_TEXT_LIMIT = 1024 * 1024
+
+# 一覧表示用プレビューのキャッシュ: (パス, mtime_ns, サイズ) -> プレビュー
+PREVIEW_CACHE_SIZE = 512
+_preview_cache: Dict[Tuple[str, int, int], str] = {}
+_preview_cache_lock = threading.Lock()
+
+def _decode_utf8(data: bytes, final: bool = True, errors: str = 'strict') -> str:
+    """
+    UTF-8バイト列をデコード
+    
+    Args:
+        data: デコードするバイト列
+        final: Falseの場合、末尾で途切れたマルチバイト文字は捨てる（先頭部分だけ読んだ場合）
+        errors: 不正なバイト列の扱い（strict / replace）
+    
+    Returns:
+        デコードした文字列
+    """
+    return codecs.getincrementaldecoder('utf-8')(errors=errors).decode(data, final=final)
+
+def _cached_preview(filepath: str, stat: os.stat_result) -> str:
+    """
+    ファイル先頭500文字のプレビューを取得（未変更のファイルは読み直さない）
+    
+    Args:
+        filepath: プレビューを作成するファイルのパス
+        stat: ファイルのstat結果
+    
+    Returns:
+        プレビュー文字列
+    """
+    key = (filepath, stat.st_mtime_ns, stat.st_size)
+    preview = _preview_cache.get(key)
+    if preview is not None:
+        return preview
+    
+    try:
+        # 500文字分（UTF-8で最大4バイト/文字）をバイトで読み、不正なバイトは置換文字にする
+        with open(filepath, 'rb') as f:
+            content = _decode_utf8(f.read(500 * 4), final=False, errors='replace')[:500]
+        preview = content[:497] + "..." if len(content) >= 500 else content
+    except OSError:
+        preview = "プレビューを読み込めません"
+    
+    # 上限を超えたら最も古いエントリから削除（一覧はワーカースレッドで作成されるためロックする）
+    with _preview_cache_lock:
+        if len(_preview_cache) >= PREVIEW_CACHE_SIZE:
+            _preview_cache.pop(next(iter(_preview_cache)), None)
+        _preview_cache[key] = preview
+    return preview
+
+def _make_etag(*parts) -> str:
+    """ETag（強いバリデータ）を構成要素から生成"""
+    digest = hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-MatchヘッダーがETagに一致するか"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+def _converted_files_etag(converted_dir: str) -> str:
+    """
+    ストレージ一覧のETagを計算（プレビューやメタデータを読まずにstatだけで判定）
+    
+    Args:
+        converted_dir: 変換済みファイルのディレクトリ
+    
+    Returns:
+        ファイル数・最新更新時刻・ディレクトリとメタデータファイルの更新時刻から作ったETag
+    """
+    count = 0
+    latest_mtime = 0
+    dir_mtime = 0
+    if os.path.exists(converted_dir):
+        dir_mtime = os.stat(converted_dir).st_mtime_ns
+        with os.scandir(converted_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.md') and not entry.name.startswith('.'):
+                    count += 1
+                    latest_mtime = max(latest_mtime, entry.stat().st_mtime_ns)
+    
+    # ベクトル化状態などの変更はメタデータファイル側に現れる
+    metadata_mtimes = [
+        path.stat().st_mtime_ns if path.exists() else 0
+        for path in (metadata_service.metadata_file, metadata_service.relationships_file)
+    ]
+    return _make_etag(count, latest_mtime, dir_mtime, *metadata_mtimes)
 
 class URLConversionRequest(BaseModel):
     """URL変換リクエストモデル"""
@@ -64,19 +407,20 @@ async def upload_and_convert(
         logger.error(f"Unsupported file format: {file.filename}")
         raise HTTPException(
             status_code=400, 
-            detail=f"サポートされていないファイル形式です。サポート形式: {', '.join(conversion_service.supported_formats)}"
+            detail=f"サポートされていないファイル形式です。サポート形式: {SUPPORTED_FORMATS_TEXT}"
         )
     
     # ファイルサイズの確認（100MB制限）
-    if file.size > 100 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="ファイルサイズが100MBを超えています")
+    if file.size and file.size > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="ファイルサイズが100MBを超えています")
     
     # アップロードディレクトリにファイルを保存
-    os.makedirs("original", exist_ok=True)
+    await asyncio.to_thread(os.makedirs, "original", exist_ok=True)
     upload_path = os.path.join("original", file.filename)
     try:
-        with open(upload_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        digest = await _save_upload(file, upload_path, with_digest=True)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail="ファイルサイズが100MBを超えています")
     except Exception as e:
         logger.error(f"ファイルアップロードエラー: {e}")
         raise HTTPException(status_code=500, detail="ファイルのアップロードに失敗しました")
@@ -85,14 +429,39 @@ async def upload_and_convert(
     output_filename = f"{os.path.splitext(file.filename)[0]}.md"
     
     # Generate conversion ID first
-    import uuid
     conversion_id = str(uuid.uuid4())
     logger.info(f"Starting conversion for file: {file.filename}, conversion_id: {conversion_id}")
     
     # Send initial progress
     await manager.send_progress(conversion_id, 0, "processing", "変換処理を開始中...", file.filename)
     
+    # 同じファイル名・同じ内容を同じオプションで変換済みであれば、その結果を再利用
+    cached = await conversion_cache.get(digest, upload_path, use_ai_mode, use_api_enhancement, conversion_id)
+    if cached:
+        await manager.send_progress(conversion_id, 100, "completed", "変換完了", file.filename)
+        await manager.send_completion(
+            conversion_id,
+            success=True,
+            processing_time=cached.processing_time,
+            output_file=cached.output_file
+        )
+        return cached
+    
+    # 直近に送信した (進捗, 時刻)
+    loop = asyncio.get_running_loop()
+    last_sent = [0, loop.time()]
+    
     async def progress_callback(_conv_id: str, progress: int, status: str, step: str, filename: str):
+        # 処理中の更新は、進捗が1%以上変化したか100ms以上経過した場合のみ送信
+        # （完了・エラー・キャンセルと0%/100%の通知は常に送信）
+        now = loop.time()
+        if (status == "processing"
+                and progress not in (0, 100)
+                and abs(progress - last_sent[0]) < PROGRESS_MIN_STEP
+                and now - last_sent[1] < PROGRESS_MIN_INTERVAL):
+            return
+        last_sent[:] = [progress, now]
+        
         # Use the pre-generated conversion_id for consistency
         try:
             await manager.send_progress(conversion_id, progress, status, step, filename or file.filename)
@@ -118,11 +487,11 @@ async def upload_and_convert(
             
             # Send final progress
             await manager.send_progress(conversion_id, 100, "completed", "変換完了", file.filename)
-            # Send completion message with full result data
+            # Send completion message (the Markdown itself is returned in the HTTP response,
+            # so it is not duplicated into a multi-MB WebSocket frame)
             await manager.send_completion(
                 conversion_id, 
                 success=True,
-                markdown_content=result.markdown_content,
                 processing_time=result.processing_time,
                 output_file=result.output_file
             )
@@ -136,32 +505,12 @@ async def upload_and_convert(
         raise
     
     # API強化が有効な場合
-    if use_api_enhancement and result and result.status == ConversionStatus.COMPLETED:
-        try:
-            output_path = os.path.join("./converted", output_filename)
-            with open(output_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            enhanced_content = await api_service.enhance_markdown(content)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(enhanced_content)
-            
-            # Update result with enhanced content
-            result.markdown_content = enhanced_content
-        except Exception as e:
-            logger.error(f"Markdown強化エラー: {e}")
+    if use_api_enhancement:
+        enhanced = await _apply_enhancement(result, output_filename)
     
-    # Ensure markdown content is loaded if not present
-    if result and result.status == ConversionStatus.COMPLETED and not result.markdown_content:
-        try:
-            output_path = os.path.join("./converted", output_filename)
-            if os.path.exists(output_path):
-                with open(output_path, 'r', encoding='utf-8') as f:
-                    result.markdown_content = f.read()
-                logger.info(f"Loaded markdown content from file: {len(result.markdown_content)} characters")
-        except Exception as e:
-            logger.error(f"Failed to load markdown content from file: {e}")
+    # 出力ファイルが確定した後で変換キャッシュに登録（強化に失敗した結果は登録しない）
+    if not use_api_enhancement or enhanced:
+        await conversion_cache.put(digest, upload_path, use_ai_mode, use_api_enhancement, result)
     
     # バックグラウンドでアップロードファイルを削除
     # Note: We keep the original files in the app/original directory
@@ -188,39 +537,61 @@ async def batch_convert(
     Returns:
         BatchConversionResult: バッチ変換結果
     """
-    upload_paths = []
-    
-    # すべてのファイルをアップロード
-    for file in files:
-        if not conversion_service.is_supported_format(file.filename):
-            continue
-        
+    async def _save(file: UploadFile) -> Tuple[str, str]:
         upload_path = os.path.join("./app/original", file.filename)
-        try:
-            with open(upload_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            upload_paths.append(upload_path)
-        except Exception as e:
-            logger.error(f"ファイルアップロードエラー: {e}")
+        digest = await _save_upload(file, upload_path, with_digest=True)
+        return upload_path, digest
+    
+    # すべてのファイルを並行してアップロード
+    saved = await asyncio.gather(
+        *[_save(file) for file in files if conversion_service.is_supported_format(file.filename)],
+        return_exceptions=True
+    )
+    uploads = []
+    for item in saved:
+        if isinstance(item, Exception):
+            logger.error(f"ファイルアップロードエラー: {item}")
+        else:
+            uploads.append(item)
+    upload_paths = [path for path, _ in uploads]
+    
+    # 同じファイル名・同じ内容を同じオプションで変換済みのファイルは結果を再利用し、残りだけを変換
+    results: List[Optional[ConversionResult]] = list(await asyncio.gather(*[
+        conversion_cache.get(digest, path, use_ai_mode, use_api_enhancement, str(uuid.uuid4()))
+        for path, digest in uploads
+    ]))
+    pending = [i for i, result in enumerate(results) if result is None]
     
     # ファイルを一括変換
-    results = await conversion_service.batch_convert(upload_paths, use_ai_mode=use_ai_mode)
+    if pending:
+        converted = await conversion_service.batch_convert(
+            [upload_paths[i] for i in pending],
+            use_ai_mode=use_ai_mode
+        )
+        for i, result in zip(pending, converted):
+            results[i] = result
     
     # API強化が有効な場合
+    enhanced = {}
     if use_api_enhancement:
-        for result in results:
-            if result.status == ConversionStatus.COMPLETED and result.output_file:
-                try:
-                    output_path = os.path.join("./converted", result.output_file)
-                    with open(output_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    enhanced_content = await api_service.enhance_markdown(content)
-                    
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(enhanced_content)
-                except Exception as e:
-                    logger.error(f"Markdown強化エラー: {e}")
+        # 完了したファイルの強化を同時実行数を制限して並行処理
+        semaphore = asyncio.Semaphore(BATCH_ENHANCE_CONCURRENCY)
+        
+        async def _enhance(i: int) -> None:
+            async with semaphore:
+                enhanced[i] = await _apply_enhancement(results[i])
+        
+        await asyncio.gather(*[
+            _enhance(i) for i in pending
+            if results[i].status == ConversionStatus.COMPLETED and results[i].output_file
+        ])
+    
+    # 新たに変換したファイルを変換キャッシュに登録（強化に失敗した結果は登録しない）
+    await asyncio.gather(*[
+        conversion_cache.put(uploads[i][1], uploads[i][0], use_ai_mode, use_api_enhancement, results[i])
+        for i in pending
+        if not use_api_enhancement or enhanced.get(i)
+    ])
     
     # バックグラウンドでアップロードファイルを削除
     # Note: We keep the original files in the app/original directory
@@ -239,31 +610,39 @@ async def batch_convert(
     )
 
 @router.get("/download/{filename}")
-async def download_converted_file(filename: str):
+async def download_converted_file(request: Request, filename: str):
     """
     変換済みファイルをダウンロード
     
     Args:
+        request: リクエスト（If-None-Matchの確認用）
         filename: ダウンロードするファイル名
     
     Returns:
-        FileResponse: ファイルレスポンス
+        FileResponse: ファイルレスポンス（変更がなければ304）
     """
     file_path = os.path.join("./converted", filename)
     
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="ファイルが見つかりません")
+    stat = await _stat_or_404(file_path, "ファイルが見つかりません")
+    
+    # 内容が変わっていなければ本文を送らない
+    etag = _make_etag(stat.st_mtime_ns, stat.st_size)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
     
     return FileResponse(
         path=file_path,
         filename=filename,
-        media_type="text/markdown"
+        media_type="text/markdown",
+        stat_result=stat,
+        headers=headers
     )
 
 @router.get("/supported-formats")
 async def get_supported_formats():
     """サポートされているファイル形式を取得"""
-    return {"formats": conversion_service.supported_formats}
+    return {"formats": SUPPORTED_FORMATS_LIST}
 
 @router.post("/cancel/{conversion_id}")
 async def cancel_conversion(conversion_id: str):
@@ -302,39 +681,26 @@ async def convert_url(request: URLConversionRequest):
         ConversionResult: 変換結果
     """
     # URL検証
-    if not (request.url.startswith('http://') or request.url.startswith('https://')):
+    if not request.url.startswith(('http://', 'https://')):
         raise HTTPException(status_code=400, detail="有効なURLを指定してください")
     
-    output_filename = f"url_conversion_{os.urandom(8).hex()}.md"
+    output_filename = f"url_conversion_{_URL_OUTPUT_NONCE}_{next(_url_output_counter):08x}.md"
+    is_youtube = enhanced_service.is_youtube_url(request.url)
     
     # YouTubeの場合は特別処理
-    if enhanced_service.is_youtube_url(request.url):
+    if is_youtube:
         result = await conversion_service.convert_file(request.url, output_filename)
     else:
         # 通常のURLは新しい直接変換メソッドを使用
-        from app.services.markitdown_ai_service import MarkItDownAIService
-        ai_service = MarkItDownAIService()
-        result = await ai_service.convert_url(
+        result = await markitdown_ai_service.convert_url(
             request.url, 
             output_filename,
             use_ai_mode=request.use_api_enhancement
         )
     
     # 追加のAPI強化が必要な場合
-    if request.use_api_enhancement and result.status == ConversionStatus.COMPLETED and not enhanced_service.is_youtube_url(request.url):
-        try:
-            output_path = os.path.join("./converted", output_filename)
-            with open(output_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            enhanced_content = await api_service.enhance_markdown(content)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(enhanced_content)
-            
-            result.markdown_content = enhanced_content
-        except Exception as e:
-            logger.error(f"Markdown enhancement error: {e}")
+    if request.use_api_enhancement and not is_youtube:
+        await _apply_enhancement(result, output_filename)
     
     return result
 
@@ -356,24 +722,23 @@ async def upload_and_convert_enhanced(
     """
     # Check file format
     file_ext = os.path.splitext(file.filename)[1].lower()[1:]
-    supported_formats = ['doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'pdf', 'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 
-                        'mp3', 'wav', 'ogg', 'm4a', 'flac', 'csv', 'json', 'xml', 'txt', 'zip']
     
-    if file_ext not in supported_formats:
+    if file_ext not in ENHANCED_SUPPORTED_FORMATS:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported file format. Supported formats: {', '.join(supported_formats)}"
+            detail=f"Unsupported file format. Supported formats: {ENHANCED_SUPPORTED_FORMATS_TEXT}"
         )
     
     # Check file size (100MB limit)
-    if file.size and file.size > 100 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size exceeds 100MB")
+    if file.size and file.size > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File size exceeds 100MB")
     
     # Save uploaded file
     upload_path = os.path.join("./app/original", file.filename)
     try:
-        with open(upload_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await _save_upload(file, upload_path)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail="File size exceeds 100MB")
     except Exception as e:
         logger.error(f"File upload error: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload file")
@@ -409,9 +774,6 @@ async def upload_and_convert_stream(
     Returns:
         ConversionResult: 変換結果
     """
-    from app.services.markitdown_ai_service import MarkItDownAIService
-    ai_service = MarkItDownAIService()
-    
     # ファイル情報を準備
     file_info = {
         'filename': file.filename,
@@ -422,7 +784,7 @@ async def upload_and_convert_stream(
     output_filename = f"{os.path.splitext(file.filename)[0]}.md"
     
     # ストリーム変換を実行
-    result = await ai_service.convert_stream(
+    result = await markitdown_ai_service.convert_stream(
         file.file,
         file_info,
         output_filename,
@@ -450,123 +812,122 @@ async def convert_youtube_enhanced(
     if not enhanced_service.is_youtube_url(url):
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
     
+    # In AI mode the transcript is enhanced inside the conversion and written once
     output_filename = f"youtube_{enhanced_service.extract_youtube_id(url)}.md"
-    result = await enhanced_service.convert_file_enhanced(
+    return await enhanced_service.convert_file_enhanced(
         "",
         output_filename,
         is_url=True,
         url_content=url,
         use_ai_mode=use_ai_mode
     )
-    
-    # Add AI-enhanced metadata if enabled
-    if use_ai_mode and result.status == ConversionStatus.COMPLETED:
-        try:
-            # Enhance with AI analysis
-            enhanced_content = enhanced_service.llm_client.enhance_document_content(
-                result.markdown_content,
-                "youtube_video",
-                []
-            )
-            result.markdown_content = enhanced_content
-            
-            # Save enhanced version
-            output_path = os.path.join("./converted", output_filename)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(enhanced_content)
-        except Exception as e:
-            logger.error(f"AI enhancement error: {e}")
-    
-    return result
+
+def _scan_converted_files(converted_dir: str) -> List[Dict]:
+    """Build the storage listing (blocking filesystem work, run in a worker thread)"""
+    files = []
+    if not os.path.exists(converted_dir):
+        return files
+    
+    with os.scandir(converted_dir) as it:
+        entries = [
+            entry for entry in it
+            if entry.name.endswith('.md') and not entry.name.startswith('.')
+        ]
+    
+    # Get metadata if available (one lookup for all files)
+    bulk = metadata_service.get_bulk([entry.name for entry in entries], "converted")
+    
+    for entry in entries:
+        filename = entry.name
+        filepath = entry.path
+        stat = entry.stat()
+        
+        # Read first 500 characters for preview
+        preview = _cached_preview(filepath, stat)
+        
+        metadata, relationship = bulk.get(filename, (None, None))
+        
+        files.append({
+            "filename": filename,
+            "size": stat.st_size,
+            "modified": _modified_at(stat.st_mtime),
+            "preview": preview,
+            "size_formatted": _format_size(stat.st_size),
+            "original_filename": relationship.original_file.original_filename if relationship else None,
+            "conversion_id": metadata.conversion_id if metadata else None,
+            "is_vectorized": metadata.is_vectorized if metadata else False,
+            "vector_chunks": metadata.vector_chunks if metadata else 0
+        })
+    
+    # Sort by modified date (newest first)
+    files.sort(key=lambda x: x["modified"], reverse=True)
+    return files
 
 @router.get("/storage/list")
-async def list_converted_files():
+async def list_converted_files(request: Request):
     """
     List all converted files in the storage
     
     Returns:
-        List of file information with metadata
+        List of file information with metadata, or 304 if the If-None-Match ETag still matches
     """
-    import os
-    from datetime import datetime
-    
-    converted_dir = "converted"
-    files = []
-    
     try:
-        if os.path.exists(converted_dir):
-            for filename in os.listdir(converted_dir):
-                if filename.endswith('.md') and not filename.startswith('.'):
-                    filepath = os.path.join(converted_dir, filename)
-                    stat = os.stat(filepath)
-                    
-                    # Read first 500 characters for preview
-                    preview = ""
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            content = f.read(500)
-                            preview = content[:497] + "..." if len(content) >= 500 else content
-                    except:
-                        preview = "プレビューを読み込めません"
-                    
-                    # Get metadata if available
-                    metadata = metadata_service.get_file_metadata(filename, "converted")
-                    relationship = metadata_service.get_file_relationship(filename)
-                    
-                    files.append({
-                        "filename": filename,
-                        "size": stat.st_size,
-                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        "preview": preview,
-                        "size_formatted": f"{stat.st_size / 1024:.1f} KB" if stat.st_size < 1024*1024 else f"{stat.st_size / (1024*1024):.1f} MB",
-                        "original_filename": relationship.original_file.original_filename if relationship else None,
-                        "conversion_id": metadata.conversion_id if metadata else None,
-                        "is_vectorized": metadata.is_vectorized if metadata else False,
-                        "vector_chunks": metadata.vector_chunks if metadata else 0
-                    })
-            
-            # Sort by modified date (newest first)
-            files.sort(key=lambda x: x["modified"], reverse=True)
+        etag = await asyncio.to_thread(_converted_files_etag, "converted")
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        files = await asyncio.to_thread(_scan_converted_files, "converted")
     except Exception as e:
         logger.error(f"Error listing files: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     
-    return {"files": files, "total": len(files)}
+    # ORJSONResponseを直接返し、jsonable_encoderによる全件の走査を省く
+    return ORJSONResponse({"files": files, "total": len(files)}, headers={"ETag": etag})
 
 @router.get("/storage/file/{filename}")
-async def get_converted_file_content(filename: str):
+async def get_converted_file_content(request: Request, response: Response, filename: str, preview: bool = False, raw: bool = False):
     """
     Get the content of a specific converted file
     
     Args:
         filename: Name of the file to retrieve
+        preview: Return only the first 4KB of content
+        raw: Stream the file itself instead of a JSON document
     
     Returns:
-        File content and metadata
+        File content and metadata, the file as text/markdown when raw is set,
+        or 304 if the If-None-Match ETag still matches
     """
     import os
-    from datetime import datetime
     
     filepath = os.path.join("converted", filename)
     
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="File not found")
+    stat = await _stat_or_404(filepath)
     
     if not filename.endswith('.md'):
         raise HTTPException(status_code=400, detail="Only markdown files are supported")
     
+    if raw:
+        # Sent straight from the file (sendfile where available)
+        return FileResponse(filepath, media_type="text/markdown", filename=filename, stat_result=stat)
+    
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        etag = _make_etag(stat.st_mtime_ns, stat.st_size, preview)
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        stat = os.stat(filepath)
+        async with aiofiles.open(filepath, 'rb') as f:
+            data = await f.read(PREVIEW_READ_SIZE) if preview else await f.read()
+        content = _decode_utf8(data, final=not preview)
         
+        response.headers["ETag"] = etag
         return {
             "filename": filename,
             "content": content,
             "size": stat.st_size,
-            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            "size_formatted": f"{stat.st_size / 1024:.1f} KB" if stat.st_size < 1024*1024 else f"{stat.st_size / (1024*1024):.1f} MB"
+            "modified": _modified_at(stat.st_mtime),
+            "size_formatted": _format_size(stat.st_size),
+            "truncated": preview and len(data) < stat.st_size
         }
     except Exception as e:
         logger.error(f"Error reading file {filename}: {e}")
@@ -587,19 +948,57 @@ async def delete_converted_file(filename: str):
     
     filepath = os.path.join("converted", filename)
     
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="File not found")
-    
     if not filename.endswith('.md'):
         raise HTTPException(status_code=400, detail="Only markdown files can be deleted")
     
     try:
-        os.remove(filepath)
+        await asyncio.to_thread(os.remove, filepath)
         return {"success": True, "message": f"File {filename} deleted successfully"}
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
     except Exception as e:
         logger.error(f"Error deleting file {filename}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _scan_uploaded_files(original_dir: str) -> List[Dict]:
+    """Build the uploaded files listing (blocking filesystem work, run in a worker thread)"""
+    files = []
+    if not os.path.exists(original_dir):
+        return files
+    
+    with os.scandir(original_dir) as entries:
+        for entry in entries:
+            filename = entry.name
+            if filename.startswith('.'):
+                continue
+            filepath = entry.path
+            stat = entry.stat()
+            
+            # Get file extension and mime type
+            _, ext = os.path.splitext(filename)
+            mime_type = _guess_mime(ext)
+            
+            # Read first 500 characters for preview (only for text files)
+            preview = ""
+            if mime_type and mime_type.startswith('text'):
+                preview = _cached_preview(filepath, stat)
+            else:
+                preview = f"{mime_type or 'unknown'} file"
+            
+            files.append({
+                "filename": filename,
+                "size": stat.st_size,
+                "modified": _modified_at(stat.st_mtime),
+                "preview": preview,
+                "size_formatted": _format_size(stat.st_size),
+                "extension": ext[1:] if ext else "",
+                "mime_type": mime_type or "application/octet-stream"
+            })
+    
+    # Sort by modified date (newest first)
+    files.sort(key=lambda x: x["modified"], reverse=True)
+    return files
+
 @router.get("/uploaded/list")
 async def list_uploaded_files():
     """
@@ -608,103 +1007,63 @@ async def list_uploaded_files():
     Returns:
         List of file information with metadata
     """
-    import os
-    from datetime import datetime
-    import mimetypes
-    
-    original_dir = "original"
-    files = []
-    
     try:
-        if os.path.exists(original_dir):
-            for filename in os.listdir(original_dir):
-                if not filename.startswith('.'):
-                    filepath = os.path.join(original_dir, filename)
-                    stat = os.stat(filepath)
-                    
-                    # Get file extension and mime type
-                    _, ext = os.path.splitext(filename)
-                    mime_type, _ = mimetypes.guess_type(filename)
-                    
-                    # Read first 500 characters for preview (only for text files)
-                    preview = ""
-                    if mime_type and mime_type.startswith('text'):
-                        try:
-                            with open(filepath, 'r', encoding='utf-8') as f:
-                                content = f.read(500)
-                                preview = content[:497] + "..." if len(content) >= 500 else content
-                        except:
-                            preview = "プレビューを読み込めません"
-                    else:
-                        preview = f"{mime_type or 'unknown'} file"
-                    
-                    files.append({
-                        "filename": filename,
-                        "size": stat.st_size,
-                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        "preview": preview,
-                        "size_formatted": f"{stat.st_size / 1024:.1f} KB" if stat.st_size < 1024*1024 else f"{stat.st_size / (1024*1024):.1f} MB",
-                        "extension": ext[1:] if ext else "",
-                        "mime_type": mime_type or "application/octet-stream"
-                    })
-            
-            # Sort by modified date (newest first)
-            files.sort(key=lambda x: x["modified"], reverse=True)
+        files = await asyncio.to_thread(_scan_uploaded_files, "original")
     except Exception as e:
         logger.error(f"Error listing uploaded files: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     
-    return {"files": files, "total": len(files)}
+    return ORJSONResponse({"files": files, "total": len(files)})
 
 @router.get("/uploaded/file/{filename}")
-async def get_uploaded_file_content(filename: str):
+async def get_uploaded_file_content(filename: str, preview: bool = False):
     """
     Get the content or download a specific uploaded file
     
     Args:
         filename: Name of the file to retrieve
+        preview: Return only the first 4KB of a text file
     
     Returns:
-        File content for text files, or file download for binary files
+        File content for small text files, or file download for binary and large files
     """
     import os
-    from datetime import datetime
-    import mimetypes
-    from fastapi.responses import FileResponse
     
     filepath = os.path.join("original", filename)
-    
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="File not found")
+    stat = await _stat_or_404(filepath)
     
     # Get mime type
-    mime_type, _ = mimetypes.guess_type(filename)
-    
-    # For text files, return content
-    if mime_type and (mime_type.startswith('text') or mime_type in ['application/json', 'application/xml']):
+    mime_type = _guess_mime(os.path.splitext(filename)[1])
+    
+    # For text files, return content (large files are streamed below unless previewing)
+    is_text = mime_type and (mime_type.startswith('text') or mime_type in ['application/json', 'application/xml'])
+    if is_text and (preview or stat.st_size <= INLINE_TEXT_LIMIT):
+        # Read bytes once and decode in memory; undecodable files fall through to FileResponse
+        async with aiofiles.open(filepath, 'rb') as f:
+            data = await f.read(PREVIEW_READ_SIZE) if preview else await f.read()
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            stat = os.stat(filepath)
-            
+            content = _decode_utf8(data, final=not preview)
+        except UnicodeDecodeError:
+            # If text file can't be decoded, treat as binary
+            content = None
+        
+        if content is not None:
             return {
                 "filename": filename,
                 "content": content,
                 "size": stat.st_size,
-                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                "size_formatted": f"{stat.st_size / 1024:.1f} KB" if stat.st_size < 1024*1024 else f"{stat.st_size / (1024*1024):.1f} MB",
-                "mime_type": mime_type
+                "modified": _modified_at(stat.st_mtime),
+                "size_formatted": _format_size(stat.st_size),
+                "mime_type": mime_type,
+                "truncated": preview and len(data) < stat.st_size
             }
-        except UnicodeDecodeError:
-            # If text file can't be decoded, treat as binary
-            pass
     
     # For binary files or download, return FileResponse
     return FileResponse(
         path=filepath,
         media_type=mime_type or 'application/octet-stream',
-        filename=filename
+        filename=filename,
+        stat_result=stat
     )
 
 @router.get("/uploaded/preview/{filename}")
@@ -719,43 +1078,17 @@ async def preview_uploaded_file(filename: str):
         FileResponse with inline disposition for browser preview
     """
     import os
-    import mimetypes
     from fastapi.responses import FileResponse
     
     filepath = os.path.join("original", filename)
-    
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="File not found")
+    stat = await _stat_or_404(filepath)
     
     # Get mime type
-    mime_type, _ = mimetypes.guess_type(filename)
+    mime_type = _guess_mime(os.path.splitext(filename)[1])
     mime_type = mime_type or 'application/octet-stream'
     
-    # Files that browsers can display
-    browser_viewable = [
-        'application/pdf',
-        'text/plain',
-        'text/html',
-        'text/css',
-        'text/javascript',
-        'application/javascript',
-        'application/json',
-        'application/xml',
-        'text/xml',
-        'image/jpeg',
-        'image/png',
-        'image/gif',
-        'image/svg+xml',
-        'image/webp',
-        'video/mp4',
-        'video/webm',
-        'audio/mpeg',
-        'audio/wav',
-        'audio/webm'
-    ]
-    
     # Check if file type is viewable in browser
-    is_viewable = mime_type in browser_viewable or mime_type.startswith('text/') or mime_type.startswith('image/')
+    is_viewable = mime_type in BROWSER_VIEWABLE or mime_type.startswith(('text/', 'image/'))
     
     if is_viewable:
         # Return with inline disposition for browser preview
@@ -764,14 +1097,16 @@ async def preview_uploaded_file(filename: str):
             media_type=mime_type,
             headers={
                 "Content-Disposition": f'inline; filename="{filename}"'
-            }
+            },
+            stat_result=stat
         )
     else:
         # For non-viewable files, force download
         return FileResponse(
             path=filepath,
             media_type=mime_type,
-            filename=filename
+            filename=filename,
+            stat_result=stat
         )
 
 @router.delete("/uploaded/file/{filename}")
@@ -789,12 +1124,11 @@ async def delete_uploaded_file(filename: str):
     
     filepath = os.path.join("original", filename)
     
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="File not found")
-    
     try:
-        os.remove(filepath)
+        await asyncio.to_thread(os.remove, filepath)
         return {"success": True, "message": f"File {filename} deleted successfully"}
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
     except Exception as e:
         logger.error(f"Error deleting uploaded file {filename}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -822,7 +1156,7 @@ async def vectorize_files(request: VectorizeRequest):
         
         for filename in request.filenames:
             try:
-                result = langchain_vectorization_service.vectorize_file(filename)
+                result = await asyncio.to_thread(langchain_vectorization_service.vectorize_file, filename)
                 results.append(result)
             except Exception as e:
                 errors.append({
@@ -852,7 +1186,7 @@ async def vectorize_all_files():
         Summary of vectorization process
     """
     try:
-        result = langchain_vectorization_service.vectorize_all_files()
+        result = await asyncio.to_thread(langchain_vectorization_service.vectorize_all_files)
         return {
             "success": True,
             **result
@@ -870,7 +1204,7 @@ async def get_vector_stats():
         Collection statistics
     """
     try:
-        stats = langchain_vectorization_service.get_collection_stats()
+        stats = await asyncio.to_thread(langchain_vectorization_service.get_collection_stats)
         return {
             "success": True,
             **stats
@@ -891,7 +1225,7 @@ async def delete_vectorized_file(filename: str):
         Deletion status
     """
     try:
-        result = langchain_vectorization_service.delete_document(filename)
+        result = await asyncio.to_thread(langchain_vectorization_service.delete_document, filename)
         return {
             "success": True,
             **result
@@ -909,7 +1243,7 @@ async def reset_vector_collection():
         Reset status
     """
     try:
-        result = langchain_vectorization_service.reset_collection()
+        result = await asyncio.to_thread(langchain_vectorization_service.reset_collection)
         return {
             "success": True,
             **result
@@ -935,7 +1269,8 @@ async def search_vectors(request: VectorSearchRequest):
         Search results with relevance scores
     """
     try:
-        results = langchain_vectorization_service.search(
+        results = await asyncio.to_thread(
+            langchain_vectorization_service.search,
             query=request.query,
             n_results=request.n_results
         )
@@ -947,3 +1282,36 @@ async def search_vectors(request: VectorSearchRequest):
         logger.error(f"Vector search error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class BatchVectorSearchRequest(BaseModel):
+    """Batch vector search request model"""
+    queries: List[str]
+    n_results: int = 5
+
+@router.post("/vectorize/search-batch")
+async def search_vectors_batch(request: BatchVectorSearchRequest):
+    """
+    Search in the vector database for several queries at once
+    
+    All queries are embedded in one call and matched in one collection query.
+    
+    Args:
+        request: Search queries and number of results per query
+    
+    Returns:
+        Search results for each query, in request order
+    """
+    try:
+        results = await asyncio.to_thread(
+            langchain_vectorization_service.search_batch,
+            request.queries,
+            request.n_results
+        )
+        return {
+            "success": True,
+            "results": results,
+            "count": len(results)
+        }
+    except Exception as e:
+        logger.error(f"Batch vector search error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
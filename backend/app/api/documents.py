@@ -5,15 +5,30 @@ from datetime import datetime
 
 from app.schemas.document import Document, DocumentUploadResponse
 from app.services.document_service import DocumentService
-from app.services.vector_search import VectorSearchService
+from app.services.vector_search import VectorSearchService, get_vector_search_service
 from app.core.database import get_mongodb
 
 router = APIRouter()
 
+# ドキュメント処理サービス（リクエストごとに生成しない）
+doc_service = DocumentService()
+
+# Documentスキーマに必要なフィールドだけをMongoDBから取得
+DOCUMENT_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "filename": 1,
+    "content_type": 1,
+    "size": 1,
+    "uploaded_at": 1,
+    "status": 1
+}
+
 @router.post("/upload", response_model=DocumentUploadResponse)
 async def upload_document(
     file: UploadFile = File(...),
-    mongodb=Depends(get_mongodb)
+    mongodb=Depends(get_mongodb),
+    vector_service: VectorSearchService = Depends(get_vector_search_service)
 ):
     """ドキュメントのアップロード"""
     try:
@@ -24,10 +39,6 @@ async def upload_document(
                 detail="Unsupported file type. Only PDF, TXT, and DOC files are allowed."
             )
         
-        # サービスの初期化
-        doc_service = DocumentService()
-        vector_service = VectorSearchService()
-        
         # ドキュメントの処理
         document_id = str(uuid.uuid4())
         content = await doc_service.process_document(file)
@@ -72,11 +83,12 @@ async def get_document(
 ):
     """ドキュメントの取得"""
     try:
-        document = await mongodb.documents.find_one({"id": document_id})
+        document = await mongodb.documents.find_one({"id": document_id}, DOCUMENT_PROJECTION)
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        return Document(**document)
+        # 自前で書き込んだデータのため検証を省略（response_modelでの検証は行われる）
+        return Document.model_construct(**document)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -89,13 +101,16 @@ async def list_documents(
 ):
     """ドキュメント一覧の取得"""
     try:
-        cursor = mongodb.documents.find().skip(skip).limit(limit).sort("uploaded_at", -1)
-        
-        documents = []
-        async for doc in cursor:
-            documents.append(Document(**doc))
+        docs = await (
+            mongodb.documents.find({}, DOCUMENT_PROJECTION)
+            .sort("uploaded_at", -1)
+            .skip(skip)
+            .limit(limit)
+            .to_list(limit)
+        )
         
-        return documents
+        # 自前で書き込んだデータのため検証を省略（response_modelでの検証は行われる）
+        return [Document.model_construct(**doc) for doc in docs]
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -4,10 +4,14 @@ FAQデータベースのベクトル検索を提供
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional, Dict, Any
+import asyncio
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 import logging
+import threading
+import time
 from app.services.qa_vector_service import QAVectorService
+from app.services.query_batcher import QueryBatcher
 from app.core.config import settings
 import os
 
@@ -52,35 +56,89 @@ class QAIndexStats(BaseModel):
 
 
 # QAVectorServiceのシングルトンインスタンス
+# （初期化で埋め込みモデルとChromaDBを読み込むため、同時アクセスでも1回だけ行う）
 _qa_service: Optional[QAVectorService] = None
+_qa_service_lock = threading.Lock()
+
+
+def _build_qa_service() -> QAVectorService:
+    """QAVectorServiceを生成して初期化"""
+    qa_service = QAVectorService()
+    supabase_url = os.getenv('SUPABASE_URL', settings.SUPABASE_URL)
+    supabase_key = os.getenv('SUPABASE_KEY', settings.SUPABASE_KEY)
+    
+    if not supabase_url or not supabase_key:
+        logger.warning("Supabase credentials not configured")
+        # Supabase未設定でも動作するように（ローカルインデックスのみ使用）
+        qa_service.initialize(
+            persist_directory=settings.CHROMA_PERSIST_DIR,
+            collection_name=settings.QA_CHROMA_COLLECTION_NAME
+        )
+    else:
+        qa_service.initialize(
+            persist_directory=settings.CHROMA_PERSIST_DIR,
+            collection_name=settings.QA_CHROMA_COLLECTION_NAME,
+            supabase_url=supabase_url,
+            supabase_key=supabase_key
+        )
+    return qa_service
 
 
 def get_qa_service() -> QAVectorService:
     """QAVectorServiceのインスタンスを取得"""
     global _qa_service
     if _qa_service is None:
-        _qa_service = QAVectorService()
-        # 初期化
-        supabase_url = os.getenv('SUPABASE_URL', settings.SUPABASE_URL)
-        supabase_key = os.getenv('SUPABASE_KEY', settings.SUPABASE_KEY)
-        
-        if not supabase_url or not supabase_key:
-            logger.warning("Supabase credentials not configured")
-            # Supabase未設定でも動作するように（ローカルインデックスのみ使用）
-            _qa_service.initialize(
-                persist_directory=settings.CHROMA_PERSIST_DIR,
-                collection_name=settings.QA_CHROMA_COLLECTION_NAME
-            )
-        else:
-            _qa_service.initialize(
-                persist_directory=settings.CHROMA_PERSIST_DIR,
-                collection_name=settings.QA_CHROMA_COLLECTION_NAME,
-                supabase_url=supabase_url,
-                supabase_key=supabase_key
-            )
+        with _qa_service_lock:
+            # 初期化が終わってから公開し、他のスレッドに初期化途中の状態を見せない
+            if _qa_service is None:
+                _qa_service = _build_qa_service()
     return _qa_service
 
 
+# 同時に届いた検索をまとめ、埋め込み生成とChromaDB検索を1回で処理する
+qa_search_batcher = QueryBatcher(
+    lambda requests: get_qa_service().search_similar_faqs_batch(requests)
+)
+
+
+# インデックス統計のキャッシュ（カテゴリ選択などで頻繁に呼ばれるため。インデックス更新時は無効化）
+STATS_CACHE_TTL = 30
+_stats_cache: Dict[str, Any] = {"ts": 0.0, "value": None, "categories": []}
+
+
+async def _get_cached_stats(qa_service: QAVectorService, ttl: int = STATS_CACHE_TTL) -> Dict[str, Any]:
+    """コレクションの統計情報を取得（TTL内はキャッシュを返す）"""
+    now = time.monotonic()
+    if _stats_cache["value"] is None or now - _stats_cache["ts"] > ttl:
+        stats = await asyncio.to_thread(qa_service.get_collection_stats)
+        if not stats:
+            # 取得失敗時の空の結果はキャッシュしない
+            return stats
+        _stats_cache["ts"] = now
+        _stats_cache["value"] = stats
+        _stats_cache["categories"] = sorted(stats.get('category_distribution', {}))
+    return _stats_cache["value"]
+
+
+def _invalidate_stats_cache() -> None:
+    """統計情報のキャッシュを破棄（インデックスを更新した時に呼ぶ）"""
+    _stats_cache["value"] = None
+
+
+def _parse_faq_document(document: str) -> Tuple[str, str]:
+    """ベクトル化したテキストから質問内容と回答内容を抽出（メタデータに持たない旧インデックス用）"""
+    question_content = ""
+    answer_content = ""
+    
+    for line in document.split('\n'):
+        if '質問内容:' in line:
+            question_content = line.replace('質問内容:', '').strip()
+        elif '回答内容:' in line:
+            answer_content = line.replace('回答内容:', '').strip()
+    
+    return question_content, answer_content
+
+
 @router.post("/search", response_model=QASearchResponse)
 async def search_faqs(
     request: QASearchRequest,
@@ -98,29 +156,25 @@ async def search_faqs(
         logger.info(f"QA search request: query='{request.query}', n_results={request.n_results}")
         
         # 類似FAQ検索
-        results = qa_service.search_similar_faqs(
-            query=request.query,
-            n_results=request.n_results,
-            category_filter=request.category_filter,
-            status_filter=request.status_filter
-        )
+        results = await qa_search_batcher.submit((
+            request.query,
+            request.n_results,
+            request.category_filter,
+            request.status_filter
+        ))
         
         # 結果の整形
         search_results = []
         for result in results:
             metadata = result.get('metadata', {})
-            document = result.get('document', '')
-            
-            # ドキュメントから質問と回答を抽出
-            lines = document.split('\n')
-            question_content = ""
-            answer_content = ""
             
-            for i, line in enumerate(lines):
-                if '質問内容:' in line:
-                    question_content = line.replace('質問内容:', '').strip()
-                elif '回答内容:' in line:
-                    answer_content = line.replace('回答内容:', '').strip()
+            # 質問と回答はインデックス時にメタデータへ保存済み
+            if 'question_content' in metadata:
+                question_content = metadata.get('question_content', '')
+                answer_content = metadata.get('answer_content', '')
+            else:
+                # 旧形式のインデックスはドキュメントから抽出
+                question_content, answer_content = _parse_faq_document(result.get('document', ''))
             
             search_results.append(QASearchResult(
                 faq_id=metadata.get('faq_id', ''),
@@ -161,7 +215,7 @@ async def get_index_stats(
     インデックスの統計情報を取得
     """
     try:
-        stats = qa_service.get_collection_stats()
+        stats = await _get_cached_stats(qa_service)
         
         return QAIndexStats(
             total_faqs=stats.get('total_faqs', 0),
@@ -187,10 +241,11 @@ async def rebuild_index(
     try:
         logger.info("Starting index rebuild...")
         
-        success = qa_service.rebuild_index()
+        success = await asyncio.to_thread(qa_service.rebuild_index)
+        _invalidate_stats_cache()
         
         if success:
-            stats = qa_service.get_collection_stats()
+            stats = await _get_cached_stats(qa_service)
             logger.info(f"Index rebuilt successfully with {stats.get('total_faqs', 0)} FAQs")
             
             return {
@@ -219,7 +274,8 @@ async def update_faq_in_index(
     - **faq_data**: 更新するFAQデータ
     """
     try:
-        success = qa_service.update_faq_in_index(faq_id, faq_data)
+        success = await asyncio.to_thread(qa_service.update_faq_in_index, faq_id, faq_data)
+        _invalidate_stats_cache()
         
         if success:
             return {
@@ -245,7 +301,8 @@ async def delete_faq_from_index(
     - **faq_id**: 削除するFAQ ID
     """
     try:
-        success = qa_service.delete_faq_from_index(faq_id)
+        success = await asyncio.to_thread(qa_service.delete_faq_from_index, faq_id)
+        _invalidate_stats_cache()
         
         if success:
             return {
@@ -268,8 +325,8 @@ async def get_categories(
     利用可能なカテゴリ一覧を取得
     """
     try:
-        stats = qa_service.get_collection_stats()
-        categories = list(stats.get('category_distribution', {}).keys())
+        # 件数は使わないため、キャッシュ済みのソート済みカテゴリ名だけを返す
+        categories = _stats_cache["categories"] if await _get_cached_stats(qa_service) else []
         
         return {
             "categories": categories,
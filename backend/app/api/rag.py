@@ -3,8 +3,10 @@ API endpoints for RAG (Retrieval-Augmented Generation) operations
 """
 from fastapi import APIRouter, HTTPException, Query, Body
 from typing import Optional, Dict, Any
+import asyncio
 import logging
 from app.services.rag_service import RAGService
+from app.services.query_batcher import QueryBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +19,9 @@ router = APIRouter(
 # Initialize RAG service
 rag_service = RAGService()
 
+# Concurrent searches are coalesced into one embedding pass and one index query
+search_batcher = QueryBatcher(rag_service.vector_service.search_batch)
+
 @router.post("/query")
 async def query_rag(
     query: str = Body(..., description="Query to search and generate response"),
@@ -40,9 +45,11 @@ async def query_rag(
         raise HTTPException(status_code=400, detail="Query cannot be empty")
     
     try:
-        result = rag_service.query(
+        search_results = await search_batcher.submit((query, n_results))
+        result = await asyncio.to_thread(
+            rag_service.answer,
             query=query,
-            n_results=n_results,
+            search_results=search_results,
             use_llm=use_llm,
             return_sources=return_sources
         )
@@ -71,9 +78,10 @@ async def search_only(
     
     try:
         # Use RAG service with LLM disabled
-        result = rag_service.query(
+        search_results = await search_batcher.submit((query, n_results))
+        result = rag_service.answer(
             query=query,
-            n_results=n_results,
+            search_results=search_results,
             use_llm=False,
             return_sources=True
         )
@@ -91,7 +99,7 @@ async def get_rag_stats() -> Dict[str, Any]:
         Service statistics including vector database info
     """
     try:
-        stats = rag_service.get_stats()
+        stats = await asyncio.to_thread(rag_service.get_stats)
         return stats
     except Exception as e:
         logger.error(f"Stats error: {e}")
@@ -119,7 +127,7 @@ async def build_context(
     
     try:
         # Get vector search results
-        search_results = rag_service.vector_service.search(query, n_results)
+        search_results = await search_batcher.submit((query, n_results))
         
         if not search_results.get("results"):
             return {
@@ -1,30 +1,43 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import Response
 from typing import List, Optional
+import hashlib
+import orjson
 
 from app.schemas.search import SearchRequest, SearchResponse, SearchResult
-from app.services.vector_search import VectorSearchService
+from app.services.vector_search import VectorSearchService, get_vector_search_service
+from app.services.search_suggestions import COUNTS_COLLECTION
 from app.core.database import get_mongodb, get_redis
 
 router = APIRouter()
 
+# 検索結果の表示に使うドキュメントのフィールド
+SEARCH_META_PROJECTION = {"_id": 0, "id": 1, "filename": 1, "uploaded_at": 1, "content_type": 1}
+
+def _search_cache_key(request: SearchRequest) -> str:
+    """検索条件からキャッシュキーを作成（ハッシュ化してキー長を一定にする）"""
+    criteria = orjson.dumps(
+        {"query": request.query, "filters": request.filters, "limit": request.limit},
+        option=orjson.OPT_SORT_KEYS
+    )
+    return "search:" + hashlib.blake2b(criteria, digest_size=16).hexdigest()
+
 @router.post("/", response_model=SearchResponse)
 async def search(
     request: SearchRequest,
     mongodb=Depends(get_mongodb),
-    redis_client=Depends(get_redis)
+    redis_client=Depends(get_redis),
+    vector_service: VectorSearchService = Depends(get_vector_search_service)
 ):
     """ドキュメント検索エンドポイント"""
     try:
         # キャッシュチェック
-        cache_key = f"search:{request.query}:{request.filters}"
+        cache_key = _search_cache_key(request)
         cached_result = await redis_client.get(cache_key)
         
         if cached_result:
-            import json
-            return SearchResponse(**json.loads(cached_result))
-        
-        # ベクトル検索サービスの初期化
-        vector_service = VectorSearchService()
+            # キャッシュ済みのJSONをそのまま返す（モデルへの復元と再エンコードを省く）
+            return Response(content=cached_result, media_type="application/json")
         
         # 検索実行
         results = await vector_service.search(
@@ -33,11 +46,17 @@ async def search(
             top_k=request.limit
         )
         
+        # ドキュメントメタデータを1回のクエリでまとめて取得
+        ids = [doc["id"] for doc in results]
+        metas = {
+            meta["id"]: meta
+            async for meta in mongodb.documents.find({"id": {"$in": ids}}, SEARCH_META_PROJECTION)
+        } if ids else {}
+        
         # 検索結果の作成
         search_results = []
         for doc in results:
-            # ドキュメントメタデータの取得
-            doc_meta = await mongodb.documents.find_one({"id": doc["id"]})
+            doc_meta = metas.get(doc["id"], {})
             
             search_results.append(SearchResult(
                 document_id=doc["id"],
@@ -57,14 +76,15 @@ async def search(
             filters=request.filters
         )
         
-        # 結果をキャッシュ（5分間）
+        # 結果をキャッシュ（5分間）。同じJSONをレスポンスとしても返す
+        payload = orjson.dumps(response.model_dump())
         await redis_client.setex(
             cache_key,
             300,
-            response.json()
+            payload
         )
         
-        return response
+        return Response(content=payload, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -77,30 +97,14 @@ async def get_search_suggestions(
 ):
     """検索サジェスションの取得"""
     try:
-        # 検索履歴から類似クエリを取得
-        pipeline = [
-            {
-                "$match": {
-                    "query": {"$regex": f"^{query}", "$options": "i"}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$query",
-                    "count": {"$sum": 1}
-                }
-            },
-            {
-                "$sort": {"count": -1}
-            },
-            {
-                "$limit": limit
-            }
-        ]
+        # 集計済みの検索回数から前方一致するクエリを取得（query_lowerのインデックスで範囲検索）
+        prefix = query.lower()
+        cursor = mongodb[COUNTS_COLLECTION].find(
+            {"query_lower": {"$gte": prefix, "$lt": prefix + "\uffff"}},
+            {"_id": 0, "query": 1}
+        ).sort("count", -1).limit(limit)
         
-        suggestions = []
-        async for doc in mongodb.search_history.aggregate(pipeline):
-            suggestions.append(doc["_id"])
+        suggestions = [doc["query"] async for doc in cursor]
         
         return {"suggestions": suggestions}
         
@@ -1,7 +1,13 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, ORJSONResponse
 from pathlib import Path
 from typing import List, Dict
-import json
+import asyncio
+import os
+import re
+import orjson
+from stat import S_ISREG
+from operator import itemgetter
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -13,6 +19,58 @@ class VectorDBAddRequest(BaseModel):
 CONVERTED_DIR = Path("converted")
 METADATA_FILE = Path("metadata/file_metadata.json")
 
+# 変換済みファイル名に付くタイムスタンプ（_YYYYMMDD_HHMMSS）
+_TIMESTAMP_SUFFIX = re.compile(r'_\d{8}_\d{6}$')
+
+# パース済みメタデータのキャッシュ（ファイルの更新日時・サイズが変わった時だけ読み直す）
+_METADATA_CACHE: Dict = {"stamp": None, "data": {}}
+
+
+def _load_metadata() -> Dict:
+    """メタデータを取得（キャッシュを共有するため、変更した場合は_save_metadataで保存する）"""
+    try:
+        stat = METADATA_FILE.stat()
+    except FileNotFoundError:
+        _METADATA_CACHE["stamp"] = None
+        _METADATA_CACHE["data"] = {}
+        return _METADATA_CACHE["data"]
+    
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if _METADATA_CACHE["stamp"] != stamp:
+        _METADATA_CACHE["data"] = orjson.loads(METADATA_FILE.read_bytes())
+        _METADATA_CACHE["stamp"] = stamp
+    return _METADATA_CACHE["data"]
+
+
+def _save_metadata(metadata: Dict) -> None:
+    """メタデータを保存（一時ファイルから置き換え、読み込み側に書きかけの内容を見せない）"""
+    METADATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = METADATA_FILE.with_name(METADATA_FILE.name + ".tmp")
+    try:
+        tmp_path.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_path, METADATA_FILE)
+    except Exception:
+        # 書き込みに失敗した場合は次回ファイルから読み直す
+        _METADATA_CACHE["stamp"] = None
+        tmp_path.unlink(missing_ok=True)
+        raise
+    
+    stat = METADATA_FILE.stat()
+    _METADATA_CACHE["stamp"] = (stat.st_mtime_ns, stat.st_size)
+    _METADATA_CACHE["data"] = metadata
+
+# LangChainVectorizationServiceのシングルトンインスタンス（埋め込みモデルの読み込みは初回のみ）
+_vectorization_service = None
+
+
+def get_vectorization_service():
+    """LangChainVectorizationServiceのインスタンスを取得"""
+    global _vectorization_service
+    if _vectorization_service is None:
+        from app.services.langchain_vectorization_service import LangChainVectorizationService
+        _vectorization_service = LangChainVectorizationService()
+    return _vectorization_service
+
 @router.get("/files")
 async def get_converted_files() -> List[Dict]:
     """convertedディレクトリ内のファイル一覧を取得"""
@@ -21,106 +79,149 @@ async def get_converted_files() -> List[Dict]:
             return []
         
         # メタデータを読み込む
-        metadata = {}
-        if METADATA_FILE.exists():
-            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+        metadata = _load_metadata()
+        
+        # 1回のディレクトリ走査で名前・サイズ・更新日時を取得（statはエントリごとに1回）
+        with os.scandir(CONVERTED_DIR) as it:
+            entries = []
+            for entry in it:
+                if entry.name.endswith(".md") and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_size, stat.st_mtime_ns))
+        
+        # 更新日時でソート（新しい順）
+        entries.sort(key=itemgetter(2), reverse=True)
         
         files = []
-        for file_path in CONVERTED_DIR.glob("*.md"):
+        for name, size, mtime_ns in entries:
             file_info = {
-                "name": file_path.name,
-                "path": str(file_path),
-                "size": file_path.stat().st_size,
-                "modified": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat(),
+                "name": name,
+                "path": str(CONVERTED_DIR / name),
+                "size": size,
+                "modified": datetime.fromtimestamp(mtime_ns / 1e9).isoformat(),
             }
             
             # メタデータから元のファイル名を取得
-            file_key = file_path.stem
+            file_key = name[:-3]
             if file_key in metadata:
-                file_info["original_name"] = metadata[file_key].get("original_filename", file_path.name)
+                file_info["original_name"] = metadata[file_key].get("original_filename", name)
                 file_info["file_type"] = metadata[file_key].get("file_type", "unknown")
                 file_info["in_vectordb"] = metadata[file_key].get("in_vectordb", False)
             else:
-                file_info["original_name"] = file_path.name
+                file_info["original_name"] = name
                 file_info["file_type"] = "markdown"
                 file_info["in_vectordb"] = False
             
             files.append(file_info)
         
-        # 更新日時でソート（新しい順）
-        files.sort(key=lambda x: x["modified"], reverse=True)
         return files
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _read_converted(file_path: Path):
+    """変換済みファイルのstat・内容・メタデータを取得（存在しない場合はHTTPException 404）"""
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    stat = file_path.stat()
+    content = file_path.read_bytes().decode("utf-8")
+    metadata = _load_metadata().get(file_path.stem, {})
+    return stat, content, metadata
+
 @router.get("/files/{filename}")
-async def get_file_content(filename: str) -> Dict:
+async def get_file_content(filename: str):
     """特定のファイルの内容を取得"""
     try:
         file_path = CONVERTED_DIR / filename
         
-        if not file_path.exists() or not file_path.is_file():
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # メタデータを取得
-        metadata = {}
-        if METADATA_FILE.exists():
-            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-                all_metadata = json.load(f)
-                file_key = file_path.stem
-                if file_key in all_metadata:
-                    metadata = all_metadata[file_key]
+        # ファイルの読み込みとメタデータの取得はイベントループの外で行う
+        stat, content, metadata = await asyncio.to_thread(_read_converted, file_path)
         
-        return {
+        # ORJSONResponseを直接返し、jsonable_encoderによる走査を省く
+        return ORJSONResponse({
             "filename": filename,
             "content": content,
             "metadata": metadata,
-            "modified": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
-        }
+            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
+        })
         
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/files/{filename}/raw")
+async def get_file_raw(filename: str):
+    """ファイルの内容だけをそのまま返す（メモリに読み込まずsendfileで送信）"""
+    file_path = CONVERTED_DIR / filename
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not S_ISREG(stat.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return FileResponse(file_path, media_type="text/markdown", stat_result=stat)
+
+@router.get("/files/{filename}/meta")
+async def get_file_meta(filename: str) -> Dict:
+    """ファイルのメタデータと更新日時だけを取得（内容は/rawで取得する）"""
+    file_path = CONVERTED_DIR / filename
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not S_ISREG(stat.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    try:
+        metadata = _load_metadata().get(file_path.stem, {})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "filename": filename,
+        "size": stat.st_size,
+        "metadata": metadata,
+        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
+    }
+
+def _unlink_converted(filename: str) -> Path:
+    """変換済みファイルを削除（存在しない場合はFileNotFoundError）"""
+    file_path = CONVERTED_DIR / filename
+    file_path.unlink()
+    return file_path
+
+def _clear_conversion_metadata(metadata: Dict, file_path: Path) -> None:
+    """削除したファイルの変換情報をメタデータから消す（保存は呼び出し側で行う）"""
+    # ファイル名からステムを取得
+    file_stem = file_path.stem
+    # タイムスタンプ付きのファイル名から元のステムを抽出
+    original_stem = _TIMESTAMP_SUFFIX.sub('', file_stem)
+    
+    # メタデータから変換情報を削除
+    for key in [file_stem, original_stem]:
+        if key in metadata:
+            metadata[key]['has_converted'] = False
+            metadata[key].pop('converted_filename', None)
+            metadata[key].pop('converted_at', None)
+            metadata[key].pop('converted_size', None)
+
 @router.delete("/files/{filename}")
 async def delete_file(filename: str) -> Dict:
     """変換済みファイルを削除"""
     try:
-        file_path = CONVERTED_DIR / filename
-        
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="File not found")
-        
         # ファイルを削除
-        file_path.unlink()
+        file_path = _unlink_converted(filename)
         
         # メタデータを更新
         if METADATA_FILE.exists():
-            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-            
-            # ファイル名からステムを取得
-            file_stem = file_path.stem
-            # タイムスタンプ付きのファイル名から元のステムを抽出
-            import re
-            original_stem = re.sub(r'_\d{8}_\d{6}$', '', file_stem)
-            
-            # メタデータから変換情報を削除
-            for key in [file_stem, original_stem]:
-                if key in metadata:
-                    metadata[key]['has_converted'] = False
-                    metadata[key].pop('converted_filename', None)
-                    metadata[key].pop('converted_at', None)
-                    metadata[key].pop('converted_size', None)
-            
-            with open(METADATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            metadata = _load_metadata()
+            _clear_conversion_metadata(metadata, file_path)
+            _save_metadata(metadata)
         
         return {"message": f"File {filename} deleted successfully"}
         
@@ -135,13 +236,29 @@ async def batch_delete_files(filenames: List[str]) -> Dict:
     try:
         deleted = []
         errors = []
+        deleted_paths = []
+        
+        # ファイルの削除はワーカースレッドで並行して行う
+        results = await asyncio.gather(
+            *[asyncio.to_thread(_unlink_converted, filename) for filename in filenames],
+            return_exceptions=True
+        )
         
-        for filename in filenames:
-            try:
-                await delete_file(filename)
+        for filename, result in zip(filenames, results):
+            if isinstance(result, FileNotFoundError):
+                errors.append({"filename": filename, "error": "File not found"})
+            elif isinstance(result, BaseException):
+                errors.append({"filename": filename, "error": str(result)})
+            else:
                 deleted.append(filename)
-            except Exception as e:
-                errors.append({"filename": filename, "error": str(e)})
+                deleted_paths.append(result)
+        
+        # メタデータの読み込みと保存は全ファイル分まとめて1回だけ行う
+        if deleted_paths and METADATA_FILE.exists():
+            metadata = _load_metadata()
+            for file_path in deleted_paths:
+                _clear_conversion_metadata(metadata, file_path)
+            _save_metadata(metadata)
         
         return {
             "deleted": deleted,
@@ -157,46 +274,35 @@ async def batch_delete_files(filenames: List[str]) -> Dict:
 async def add_to_vectordb(request: VectorDBAddRequest) -> Dict:
     """選択したファイルをベクトルデータベースに追加"""
     try:
-        from app.services.langchain_vectorization_service import LangChainVectorizationService
-        
-        # サービスのインスタンスを作成
-        vectorization_service = LangChainVectorizationService()
+        vectorization_service = await asyncio.to_thread(get_vectorization_service)
         
         added = []
         errors = []
-        updated_metadata = {}
         
         # メタデータファイルを読み込む
-        if METADATA_FILE.exists():
-            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-                updated_metadata = json.load(f)
+        updated_metadata = _load_metadata()
         
-        for filename in request.filenames:
-            try:
-                # ベクトルDBに追加（filenameはそのまま使用）
-                result = vectorization_service.vectorize_file(filename)
-                
-                # メタデータ用のキーは.mdを除去
-                file_key = filename.replace('.md', '') if filename.endswith('.md') else filename
-                
-                if result.get("status") == "success":
-                    # メタデータを更新
-                    if file_key not in updated_metadata:
-                        updated_metadata[file_key] = {}
-                    updated_metadata[file_key]["in_vectordb"] = True
-                    updated_metadata[file_key]["vectordb_added_at"] = datetime.now().isoformat()
-                    
-                    added.append(filename)
-                else:
-                    errors.append({"filename": filename, "error": result.get("message", "Unknown error")})
+        # 全ファイルのチャンクをまとめて埋め込み・登録する
+        results = await asyncio.to_thread(vectorization_service.vectorize_files_batch, request.filenames)
+        
+        vectorized_at = datetime.now().isoformat()
+        for filename, result in zip(request.filenames, results):
+            # メタデータ用のキーは.mdを除去
+            file_key = filename.replace('.md', '') if filename.endswith('.md') else filename
+            
+            if result.get("status") == "success":
+                # メタデータを更新
+                if file_key not in updated_metadata:
+                    updated_metadata[file_key] = {}
+                updated_metadata[file_key]["in_vectordb"] = True
+                updated_metadata[file_key]["vectordb_added_at"] = vectorized_at
                 
-            except Exception as e:
-                errors.append({"filename": filename, "error": str(e)})
+                added.append(filename)
+            else:
+                errors.append({"filename": filename, "error": result.get("message", "Unknown error")})
         
         # メタデータを保存
-        METADATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(METADATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(updated_metadata, f, ensure_ascii=False, indent=2)
+        _save_metadata(updated_metadata)
         
         return {
             "added": added,
@@ -3,6 +3,7 @@ API endpoints for vector database operations
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional, Dict, Any
+import asyncio
 import logging
 from app.services.vectorization_service import VectorizationService
 
@@ -29,7 +30,7 @@ async def vectorize_file(filename: str) -> Dict[str, Any]:
         Vectorization status and statistics
     """
     try:
-        result = vector_service.vectorize_file(filename)
+        result = await asyncio.to_thread(vector_service.vectorize_file, filename)
         return result
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -48,7 +49,7 @@ async def vectorize_all_files() -> Dict[str, Any]:
         Summary of vectorization process
     """
     try:
-        result = vector_service.vectorize_all_files()
+        result = await asyncio.to_thread(vector_service.vectorize_all_files)
         return result
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -75,7 +76,7 @@ async def search_vectors(
         raise HTTPException(status_code=400, detail="Query cannot be empty")
     
     try:
-        results = vector_service.search(query, n_results)
+        results = await asyncio.to_thread(vector_service.search, query, n_results)
         return results
     except Exception as e:
         logger.error(f"Search error: {e}")
@@ -90,7 +91,7 @@ async def get_collection_stats() -> Dict[str, Any]:
         Collection statistics including document count and chunk count
     """
     try:
-        stats = vector_service.get_collection_stats()
+        stats = await asyncio.to_thread(vector_service.get_collection_stats)
         return stats
     except Exception as e:
         logger.error(f"Stats error: {e}")
@@ -108,7 +109,7 @@ async def delete_document_vectors(filename: str) -> Dict[str, Any]:
         Deletion status
     """
     try:
-        result = vector_service.delete_document(filename)
+        result = await asyncio.to_thread(vector_service.delete_document, filename)
         if result["status"] == "not_found":
             raise HTTPException(status_code=404, detail=result["message"])
         return result
@@ -128,7 +129,7 @@ async def reset_vector_collection() -> Dict[str, Any]:
         Reset status
     """
     try:
-        result = vector_service.reset_collection()
+        result = await asyncio.to_thread(vector_service.reset_collection)
         return result
     except Exception as e:
         logger.error(f"Reset error: {e}")
@@ -143,7 +144,7 @@ async def list_vectorized_documents() -> Dict[str, Any]:
         List of vectorized documents
     """
     try:
-        stats = vector_service.get_collection_stats()
+        stats = await asyncio.to_thread(vector_service.get_collection_stats)
         return {
             "documents": stats["documents"],
             "total": stats["unique_documents"],
@@ -2,34 +2,126 @@
 WebSocket endpoint for real-time progress updates
 """
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set
+from typing import Dict, List, Set
 import asyncio
 import json
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of queued messages folded into one WebSocket frame
+MAX_FRAME_BATCH = 128
+# Maximum number of messages queued per connection before a slow client is dropped
+MAX_QUEUED_MESSAGES = 1024
+
+def _collapse_progress(messages: List[Dict]) -> List[Dict]:
+    """Keep only the latest progress message per (conversion_id, status); other messages are kept as-is"""
+    latest = {}
+    for i, message in enumerate(messages):
+        if message.get("type") == "progress":
+            latest[(message["conversion_id"], message["status"])] = i
+    return [
+        message for i, message in enumerate(messages)
+        if message.get("type") != "progress" or latest[(message["conversion_id"], message["status"])] == i
+    ]
+
 class ConnectionManager:
     """Manages WebSocket connections"""
     
     def __init__(self):
         self.active_connections: Set[WebSocket] = set()
         self.progress_data: Dict[str, Dict] = {}
+        # Per-connection outgoing queue and the task draining it
+        self._queues: Dict[WebSocket, asyncio.Queue] = {}
+        self._flushers: Dict[WebSocket, asyncio.Task] = {}
+        # Pending closes of dropped clients (the loop only keeps weak references to tasks)
+        self._closing: Set[asyncio.Task] = set()
     
     async def connect(self, websocket: WebSocket):
         """Accept and store a new WebSocket connection"""
         await websocket.accept()
         self.active_connections.add(websocket)
+        queue = asyncio.Queue(maxsize=MAX_QUEUED_MESSAGES)
+        self._queues[websocket] = queue
+        self._flushers[websocket] = asyncio.create_task(self._flusher(websocket, queue))
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
     
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection"""
         self.active_connections.discard(websocket)
+        self._queues.pop(websocket, None)
+        flusher = self._flushers.pop(websocket, None)
+        if flusher is not None and flusher is not asyncio.current_task():
+            flusher.cancel()
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
     
+    def _broadcast(self, message: Dict) -> int:
+        """Queue a message for every connected client; returns the number of clients"""
+        for websocket, queue in list(self._queues.items()):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._enqueue_overflow(websocket, queue, message)
+        return len(self._queues)
+    
+    def _enqueue_overflow(self, websocket: WebSocket, queue: asyncio.Queue, message: Dict):
+        """
+        Make room in a full queue by dropping superseded progress messages
+        
+        If the client is so far behind that the queue is still full afterwards,
+        it is disconnected instead of buffering without limit.
+        """
+        pending = []
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+        pending = _collapse_progress(pending + [message])
+        
+        if len(pending) > queue.maxsize:
+            logger.warning("WebSocket client is not keeping up with updates; disconnecting")
+            self.disconnect(websocket)
+            task = asyncio.create_task(self._close(websocket))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+            return
+        
+        for queued in pending:
+            queue.put_nowait(queued)
+    
+    async def _close(self, websocket: WebSocket):
+        """Close a connection that was dropped by the server"""
+        try:
+            await websocket.close(code=1008)
+        except Exception:
+            pass
+    
+    async def _flusher(self, websocket: WebSocket, queue: asyncio.Queue):
+        """
+        Send queued messages for one connection
+        
+        Waits for the first message, then drains whatever else is already queued
+        and sends it as a single frame: one message is sent as-is, several are
+        sent as {"type": "batch", "messages": [...]}.
+        """
+        try:
+            while True:
+                messages = [await queue.get()]
+                while len(messages) < MAX_FRAME_BATCH and not queue.empty():
+                    messages.append(queue.get_nowait())
+                
+                messages = _collapse_progress(messages)
+                payload = messages[0] if len(messages) == 1 else {"type": "batch", "messages": messages}
+                # Serialize with orjson; keep text frames since the client JSON.parses event.data
+                await websocket.send_text(orjson.dumps(payload).decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending WebSocket message: {e}")
+            self.disconnect(websocket)
+    
     async def send_progress(self, conversion_id: str, progress: int, status: str = "processing", 
                            current_step: str = "", file_name: str = ""):
-        """Send progress update to all connected clients"""
+        """Queue a progress update for all connected clients"""
         message = {
             "type": "progress",
             "conversion_id": conversion_id,
@@ -39,53 +131,30 @@ class ConnectionManager:
             "file_name": file_name
         }
         
-        logger.info(f"Sending progress: conversion_id={conversion_id}, progress={progress}, status={status}, step={current_step}")
-        logger.info(f"Active connections: {len(self.active_connections)}")
-        
         # Store progress data
         self.progress_data[conversion_id] = message
         
-        # Send to all connected clients
-        disconnected = set()
-        sent_count = 0
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-                sent_count += 1
-                logger.debug(f"✅ Progress sent to WebSocket client #{sent_count}")
-            except Exception as e:
-                logger.error(f"Error sending progress update: {e}")
-                disconnected.add(connection)
-        
-        # Remove disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn)
-        
-        logger.info(f"Progress sent to {sent_count} clients")
+        # Queue for all connected clients (sent by each connection's flusher)
+        sent_count = self._broadcast(message)
+        logger.debug(
+            "Progress queued for %d clients: conversion_id=%s, progress=%s, status=%s, step=%s",
+            sent_count, conversion_id, progress, status, current_step
+        )
     
     async def send_batch_progress(self, batch_id: str, file_progress: Dict[str, Dict]):
-        """Send batch conversion progress update"""
+        """Queue a batch conversion progress update"""
         message = {
             "type": "batch_progress",
             "batch_id": batch_id,
             "files": file_progress
         }
         
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending batch progress: {e}")
-                disconnected.add(connection)
-        
-        for conn in disconnected:
-            self.disconnect(conn)
+        self._broadcast(message)
     
     async def send_completion(self, conversion_id: str, success: bool = True, 
                             error_message: str = None, markdown_content: str = None,
                             processing_time: float = None, output_file: str = None):
-        """Send completion notification"""
+        """Queue a completion notification"""
         message = {
             "type": "completion",
             "conversion_id": conversion_id,
@@ -97,18 +166,8 @@ class ConnectionManager:
         }
         
         logger.info(f"Sending completion: conversion_id={conversion_id}, success={success}, content_length={len(markdown_content) if markdown_content else 0}")
-        logger.info(f"Message details: {message}")
-        
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending completion: {e}")
-                disconnected.add(connection)
         
-        for conn in disconnected:
-            self.disconnect(conn)
+        self._broadcast(message)
         
         # Clear progress data for completed conversion
         self.progress_data.pop(conversion_id, None)
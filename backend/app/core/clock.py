@@ -0,0 +1,25 @@
+"""
+Cheap wall-clock timestamps for message records
+"""
+import time
+from datetime import datetime, timezone
+from typing import Tuple
+
+# (millisecond tick, ISO string for that tick)
+_last_iso: Tuple[int, str] = (-1, "")
+
+
+def now_iso() -> str:
+    """
+    Current UTC time as an ISO 8601 string, at millisecond resolution
+    
+    The formatted string is reused for every call within the same millisecond,
+    so busy request handlers do not pay for tz-aware formatting each time.
+    """
+    global _last_iso
+    tick = time.time_ns() // 1_000_000
+    cached_tick, cached_iso = _last_iso
+    if tick != cached_tick:
+        cached_iso = datetime.fromtimestamp(tick / 1000, tz=timezone.utc).isoformat(timespec="milliseconds")
+        _last_iso = (tick, cached_iso)
+    return cached_iso
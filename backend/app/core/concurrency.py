@@ -0,0 +1,27 @@
+"""
+Process-wide limits on concurrent calls to the LLM provider
+
+Bursts of chat traffic are queued here instead of being fanned out to OpenAI,
+where they would come back as 429s and be retried with exponential backoff.
+"""
+import os
+import asyncio
+
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "16"))
+
+llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+
+
+async def limited_ainvoke(llm, messages):
+    """
+    llm.ainvoke(messages) while holding one LLM concurrency slot
+    
+    Args:
+        llm: Chat model
+        messages: Prompt messages
+    
+    Returns:
+        The model's response message
+    """
+    async with llm_semaphore:
+        return await llm.ainvoke(messages)
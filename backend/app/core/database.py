@@ -4,9 +4,12 @@ from sqlalchemy.orm import sessionmaker
 from motor.motor_asyncio import AsyncIOMotorClient
 import redis.asyncio as redis
 from typing import Optional
+import logging
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # PostgreSQL
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -30,6 +33,17 @@ async def init_db():
     # Redis
     redis_client = await redis.from_url(settings.REDIS_URL, decode_responses=True)
 
+async def ensure_indexes():
+    """Create MongoDB indexes used by hot queries"""
+    try:
+        # /chat/history/{session_id}: match on session, newest first
+        await mongodb_database.chat_history.create_index([("session_id", 1), ("created_at", -1)])
+        # /documents: newest first listing, lookup by document id
+        await mongodb_database.documents.create_index([("uploaded_at", -1)])
+        await mongodb_database.documents.create_index("id", unique=True)
+    except Exception as e:
+        logger.warning(f"Failed to create MongoDB indexes: {e}")
+
 async def close_db():
     """Close database connections"""
     global mongodb_client, redis_client
@@ -0,0 +1,73 @@
+"""
+Shared outbound HTTP clients
+
+Every service that talks to OpenAI goes through the same pair of connection
+pools, so requests reuse warm keep-alive (HTTP/2) connections instead of each
+service holding a pool of its own.
+"""
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import openai
+
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+_sync_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_clients_lock = threading.Lock()
+
+
+def _http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Get or create the process-wide httpx clients"""
+    global _sync_http_client, _async_http_client
+    if _sync_http_client is None:
+        with _clients_lock:
+            if _sync_http_client is None:
+                _async_http_client = httpx.AsyncClient(http2=True, limits=HTTP_LIMITS)
+                _sync_http_client = httpx.Client(http2=True, limits=HTTP_LIMITS)
+    return _sync_http_client, _async_http_client
+
+
+def openai_client_kwargs(api_key: str, **options) -> Dict[str, Any]:
+    """
+    client/async_client arguments for ChatOpenAI backed by the shared pools
+    
+    Args:
+        api_key: OpenAI API key
+        **options: Per-caller client options such as timeout and max_retries
+    
+    Returns:
+        Keyword arguments to pass to ChatOpenAI
+    """
+    sync_http, async_http = _http_clients()
+    return {
+        "client": openai.OpenAI(api_key=api_key, http_client=sync_http, **options).chat.completions,
+        "async_client": openai.AsyncOpenAI(api_key=api_key, http_client=async_http, **options).chat.completions
+    }
+
+
+def async_openai_client(api_key: str, **options) -> openai.AsyncOpenAI:
+    """
+    AsyncOpenAI client backed by the shared async pool
+    
+    Args:
+        api_key: OpenAI API key
+        **options: Per-caller client options such as timeout and max_retries
+    
+    Returns:
+        AsyncOpenAI client
+    """
+    _, async_http = _http_clients()
+    return openai.AsyncOpenAI(api_key=api_key, http_client=async_http, **options)
+
+
+async def close_http_clients() -> None:
+    """Close the shared clients (application shutdown)"""
+    global _sync_http_client, _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+    if _sync_http_client is not None:
+        _sync_http_client.close()
+    _sync_http_client = None
+    _async_http_client = None
@@ -12,7 +12,20 @@ POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-engine = create_engine(DATABASE_URL)
+# コネクションプール設定
+# DB呼び出しはスレッドプール（asyncio.to_thread）から行われるため、
+# 同時実行数に見合うだけの接続を確保し、リクエスト毎の接続確立を避ける
+POOL_SIZE = int(os.getenv("POSTGRES_POOL_SIZE", "20"))
+MAX_OVERFLOW = int(os.getenv("POSTGRES_MAX_OVERFLOW", "40"))
+POOL_RECYCLE = int(os.getenv("POSTGRES_POOL_RECYCLE", "1800"))
+
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_pre_ping=True,  # 切断された接続を使う前に検出する
+    pool_recycle=POOL_RECYCLE
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
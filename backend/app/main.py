@@ -1,6 +1,8 @@
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import os
 import logging
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -12,9 +14,16 @@ load_dotenv()
 
 from app.api import chat, documents, search, conversion, settings as api_settings, storage, uploaded
 from app.api.websocket import websocket_endpoint
+from app.api.qa_chat import get_qa_service
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import init_db, ensure_indexes
+from app.core.http_clients import close_http_clients
 from app.services.conversion_service import ConversionService
+from app.services.rag_chat_service import RAGChatService
+from app.services.chat_dispatcher import BatchingChatDispatcher, EmbeddingBatcher
+from app.services.response_cache import ResponseCache
+from app.services.history_writer import history_writer
+from app.services.search_suggestions import run_refresh_loop as refresh_search_suggestions
 
 # Set up logging
 logging.basicConfig(
@@ -30,21 +39,111 @@ conversion_service = ConversionService()
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    # MongoDBが未起動でも起動を遅らせないよう、インデックス作成はバックグラウンドで行う
+    app.state.index_task = asyncio.create_task(ensure_indexes())
+    # 検索サジェスト用の集計はリクエストの外で定期的に更新する
+    app.state.suggestions_task = asyncio.create_task(refresh_search_suggestions())
     
     # MarkitDown用のディレクトリ作成
     os.makedirs("original", exist_ok=True)
     os.makedirs("converted", exist_ok=True)
     
+    # AIチャットサービスの初期化（初回リクエストでのコールドスタートを避ける）
+    app.state.rag_chat_service = None
+    app.state.chat_dispatcher = None
+    app.state.embedding_batcher = None
+    app.state.response_cache = None
+    try:
+        rag_chat_service = await asyncio.to_thread(RAGChatService)
+        app.state.rag_chat_service = rag_chat_service
+        app.state.chat_dispatcher = BatchingChatDispatcher(rag_chat_service)
+        # 同時に届いたクエリの埋め込みを1回のモデル呼び出しにまとめる
+        app.state.embedding_batcher = EmbeddingBatcher(rag_chat_service.vector_service)
+        app.state.response_cache = ResponseCache(
+            embed_fn=rag_chat_service.vector_service.embed_query,
+            # LLM未設定時のフォールバック応答をLLMの応答と混同しない
+            model=getattr(rag_chat_service.llm, "model_name", None) or "no-llm"
+        )
+        logger.info("RAG chat service initialized at startup")
+    except Exception as e:
+        logger.error(f"Failed to initialize RAG chat service: {e}")
+    
+    if app.state.rag_chat_service is not None:
+        # 埋め込みモデルとベクトルインデックスのウォームアップ
+        # （クエリ埋め込み→Chroma検索を1回通し、モデルの重みとHNSWインデックスを読み込んでおく）
+        # 失敗してもサービス自体は使えるため、ログに残すだけにする
+        try:
+            await asyncio.to_thread(app.state.rag_chat_service.vector_service.search_batch, ["warmup"], 1)
+        except Exception as e:
+            logger.warning(f"RAG chat service warm-up failed: {e}")
+    
+    # QAChat用ベクトル検索サービスの初期化とウォームアップ
+    try:
+        qa_service = await asyncio.to_thread(get_qa_service)
+        await asyncio.to_thread(qa_service.search_similar_faqs, "warmup", 1)
+        logger.info("QA vector service initialized at startup")
+    except Exception as e:
+        logger.error(f"Failed to initialize QA vector service: {e}")
+    
     yield
     # Shutdown
-    pass
+    # 未完了のバックグラウンドタスク（MongoDB接続待ちのインデックス作成など）を止めてから終了する
+    background_tasks = (app.state.index_task, app.state.suggestions_task)
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    # バッファ中のチャット履歴を書き出してから終了する
+    await history_writer.close()
+    await close_http_clients()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     lifespan=lifespan,
-    # 100MBまでのファイルアップロードを許可
-    max_request_size=100 * 1024 * 1024
+    # orjsonでレスポンスのJSONエンコードを高速化
+    default_response_class=ORJSONResponse
+)
+
+# アップロードサイズ制限ミドルウェア（CORSの内側に置き、413にもCORSヘッダーを付ける）
+class UploadSizeLimitMiddleware:
+    """
+    Content-Lengthが上限を超える単一ファイルのアップロードを、本文を受信する前に413で拒否
+    
+    FastAPIはハンドラーを呼ぶ前にmultipart本文を一時ファイルへ書き出すため、
+    ハンドラー内のサイズ確認では最大100MBの受信と書き込みを避けられない。
+    Content-Lengthのないリクエストは、保存時のサイズ確認（_save_upload）で打ち切る。
+    """
+    # multipartの境界やフォーム項目の分の余裕
+    MULTIPART_OVERHEAD = 64 * 1024
+    
+    def __init__(self, app, paths, max_size: int):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_content_length = max_size + self.MULTIPART_OVERHEAD
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in self.paths:
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_content_length:
+                        response = ORJSONResponse(
+                            status_code=413,
+                            content={"detail": "ファイルサイズが100MBを超えています"},
+                            headers={"Connection": "close"}
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=[
+        "/api/v1/conversion/upload",
+        "/api/v1/conversion/upload-enhanced",
+        "/api/v1/conversion/upload-stream"
+    ],
+    max_size=conversion.MAX_UPLOAD_SIZE
 )
 
 # CORS設定
@@ -128,4 +227,8 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+# 同一ルートの二重登録を検出（ルーターを重複してincludeした場合など）
+_route_keys = [(route.path, tuple(sorted(getattr(route, "methods", None) or ()))) for route in app.routes]
+assert len(set(_route_keys)) == len(_route_keys), "Duplicate route registration detected"
@@ -27,4 +27,16 @@ class Conversation(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "message_count": self.message_count
+        }
+
+    def to_summary_dict(self):
+        """スレッド一覧用（メッセージ本文を含まない）"""
+        return {
+            "id": str(self.id),
+            "thread_id": str(self.thread_id),
+            "title": self.title,
+            "is_active": self.is_active,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "message_count": self.message_count
         }
\ No newline at end of file
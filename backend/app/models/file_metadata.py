@@ -41,11 +41,6 @@ class FileMetadata(BaseModel):
     is_vectorized: bool = False
     vectorization_date: Optional[datetime] = None
     vector_chunks: int = 0
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 class FileRelationship(BaseModel):
     """Track relationships between original and converted files"""
@@ -54,8 +49,3 @@ class FileRelationship(BaseModel):
     converted_file: Optional[FileMetadata] = None
     relationship_type: str = "conversion"  # conversion, version, derivative
     created_at: datetime = datetime.now()
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
@@ -38,6 +38,16 @@ class ThreadResponse(BaseModel):
     message_count: int
 
 
+class ThreadSummaryResponse(BaseModel):
+    id: str
+    thread_id: str
+    title: str
+    is_active: bool
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    message_count: int
+
+
 @router.post("/threads", response_model=ThreadResponse)
 async def create_thread(
     request: CreateThreadRequest = CreateThreadRequest(),
@@ -52,7 +62,7 @@ async def create_thread(
         raise HTTPException(status_code=500, detail="Failed to create thread")
 
 
-@router.get("/threads", response_model=List[ThreadResponse])
+@router.get("/threads", response_model=List[ThreadSummaryResponse])
 async def list_threads(
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
@@ -1,6 +1,7 @@
 """
 Note management API endpoints
 """
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
@@ -74,7 +75,8 @@ async def create_note(
         # Convert string to enum
         note_type = NoteType(request.note_type) if request.note_type else NoteType.USER_NOTE
         
-        note = note_service.create_note(
+        note = await asyncio.to_thread(
+            note_service.create_note,
             db=db,
             title=request.title,
             content=request.content,
@@ -110,7 +112,8 @@ async def list_notes(
         status_enum = NoteStatus(status) if status else NoteStatus.PUBLISHED
         tag_list = tags.split(",") if tags else None
         
-        notes = note_service.list_notes(
+        notes = await asyncio.to_thread(
+            note_service.list_notes,
             db=db,
             note_type=note_type_enum,
             status=status_enum,
@@ -135,7 +138,7 @@ async def get_note(
 ):
     """Get a specific note"""
     try:
-        note = note_service.get_note(db, note_id)
+        note = await asyncio.to_thread(note_service.get_note, db, note_id)
         
         if not note:
             raise HTTPException(status_code=404, detail="Note not found")
@@ -160,7 +163,8 @@ async def update_note(
         # Convert status string to enum if provided
         status_enum = NoteStatus(request.status) if request.status else None
         
-        note = note_service.update_note(
+        note = await asyncio.to_thread(
+            note_service.update_note,
             db=db,
             note_id=note_id,
             title=request.title,
@@ -190,7 +194,7 @@ async def delete_note(
 ):
     """Delete a note (soft delete)"""
     try:
-        success = note_service.delete_note(db, note_id)
+        success = await asyncio.to_thread(note_service.delete_note, db, note_id)
         
         if not success:
             raise HTTPException(status_code=404, detail="Note not found")
@@ -211,7 +215,7 @@ async def toggle_pin(
 ):
     """Toggle pin status of a note"""
     try:
-        note = note_service.toggle_pin(db, note_id)
+        note = await asyncio.to_thread(note_service.toggle_pin, db, note_id)
         
         if not note:
             raise HTTPException(status_code=404, detail="Note not found")
@@ -232,7 +236,7 @@ async def toggle_favorite(
 ):
     """Toggle favorite status of a note"""
     try:
-        note = note_service.toggle_favorite(db, note_id)
+        note = await asyncio.to_thread(note_service.toggle_favorite, db, note_id)
         
         if not note:
             raise HTTPException(status_code=404, detail="Note not found")
@@ -252,7 +256,7 @@ async def get_all_tags(
 ):
     """Get all unique tags with counts"""
     try:
-        tags = note_service.get_tags(db)
+        tags = await asyncio.to_thread(note_service.get_tags, db)
         return {"tags": tags}
         
     except Exception as e:
@@ -270,7 +274,7 @@ async def generate_business_report(
         # Get all selected notes
         notes_data = []
         for note_id in request.note_ids:
-            note = note_service.get_note(db, note_id)
+            note = await asyncio.to_thread(note_service.get_note, db, note_id)
             if note:
                 notes_data.append(note)
         
@@ -282,7 +286,7 @@ async def generate_business_report(
         from app.services.rag_chat_service import RAGChatService
         from langchain.schema import SystemMessage, HumanMessage
         
-        rag_service = RAGChatService()
+        rag_service = await asyncio.to_thread(RAGChatService)
         
         # Build content from all notes
         notes_content = "\n\n".join([
@@ -337,7 +341,7 @@ async def generate_business_report(
             ]
             
             try:
-                response = rag_service.llm.invoke(messages)
+                response = await asyncio.to_thread(rag_service.llm.invoke, messages)
                 report_content = response.content
             except Exception as e:
                 logger.error(f"LLM report generation error: {e}")
@@ -358,7 +362,8 @@ async def generate_business_report(
                 all_tags.update(note['tags'])
         report_tags.extend(list(all_tags)[:5])  # Add up to 5 tags from source notes
         
-        report = note_service.create_note(
+        report = await asyncio.to_thread(
+            note_service.create_note,
             db=db,
             title=report_title,
             content=report_content,
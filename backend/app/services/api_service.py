@@ -4,10 +4,11 @@ Markdown変換結果の強化処理を実行
 """
 import os
 from typing import Optional
-from openai import OpenAI
 from dotenv import load_dotenv
 import logging
 
+from app.core.http_clients import async_openai_client
+
 logger = logging.getLogger(__name__)
 load_dotenv()
 
@@ -23,7 +24,8 @@ class APIService:
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
             try:
-                self.client = OpenAI(api_key=api_key)
+                # 共有の接続プール（HTTP/2・keep-alive）を使う非同期クライアント
+                self.client = async_openai_client(api_key, timeout=60.0)
             except Exception as e:
                 logger.error(f"OpenAI APIクライアント初期化エラー: {e}")
                 self.client = None
@@ -43,7 +45,7 @@ class APIService:
             return content
         
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -79,9 +81,9 @@ class APIService:
             (有効性, エラーメッセージ)
         """
         try:
-            test_client = OpenAI(api_key=api_key)
+            test_client = async_openai_client(api_key)
             # 簡単なAPIコールでキーの有効性を確認
-            test_client.models.list()
+            await test_client.models.list()
             return True, None
         except Exception as e:
             error_message = str(e)
@@ -0,0 +1,198 @@
+"""
+Micro-batching for RAG chat requests and query embeddings
+
+Work items arriving while an earlier batch is still being processed are
+collected and processed with a single call, so concurrent requests share one
+embedding call and one vector search instead of paying for their own.
+"""
+import os
+import abc
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BATCH_WAIT_MS = int(os.getenv("CHAT_BATCH_WAIT_MS", "10"))
+MAX_BATCH = int(os.getenv("CHAT_MAX_BATCH", "16"))
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "32"))
+
+
+class MicroBatcher(abc.ABC):
+    """Collects queued items into batches and resolves one future per item"""
+    
+    def __init__(self, batch_wait_ms: int = BATCH_WAIT_MS, max_batch: int = MAX_BATCH):
+        """
+        Initialize batcher
+        
+        Args:
+            batch_wait_ms: How long to wait for more items after the first one
+                while another batch is still being processed
+            max_batch: Maximum number of items per batch
+        """
+        self.batch_wait = batch_wait_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+    
+    def _ensure_worker(self) -> None:
+        """Start the background batching task on the running event loop"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+    
+    async def _submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+    
+    @abc.abstractmethod
+    async def _process(self, items: List[Any]) -> List[Any]:
+        """Process one batch; returns one result per item, in order"""
+    
+    async def _collect_batch(self) -> List[Tuple[Any, asyncio.Future]]:
+        """
+        Wait for one item, then gather more until the window closes or the batch is full
+        
+        When nothing is being processed and no other item is queued, the item
+        is dispatched right away, so a lone request never pays the window.
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        if not self._in_flight and self._queue.empty():
+            return batch
+        
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _run(self) -> None:
+        """Background loop handing batches to _dispatch()"""
+        while True:
+            batch = await self._collect_batch()
+            # Items whose caller already went away need no answer
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            
+            # Dispatch without waiting so the next batch can form meanwhile
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+    
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Run _process() for one batch and resolve each waiter's future"""
+        if len(batch) > 1:
+            logger.info(f"{type(self).__name__}: dispatching batch of {len(batch)}")
+        
+        try:
+            results = await self._process([item for item, _ in batch])
+        except Exception as e:
+            logger.error(f"{type(self).__name__} batch error: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class BatchingChatDispatcher(MicroBatcher):
+    """
+    Coalesces the vector search of concurrent chat requests into micro-batches
+    
+    Only the embedding and vector-search stage is batched. Reranking, LLM
+    generation and memory updates run per request outside the batcher, so a
+    slow answer never holds up the retrieval of requests that arrive after it.
+    """
+    
+    def __init__(self, chat_service, batch_wait_ms: int = BATCH_WAIT_MS, max_batch: int = MAX_BATCH):
+        """
+        Initialize dispatcher
+        
+        Args:
+            chat_service: RAGChatService instance providing chat() and vector_service
+            batch_wait_ms: How long to wait for more requests after the first one
+            max_batch: Maximum number of requests per batch
+        """
+        super().__init__(batch_wait_ms, max_batch)
+        self.chat_service = chat_service
+    
+    async def submit(self, **chat_kwargs) -> Dict[str, Any]:
+        """
+        Run a chat request, sharing its vector search with concurrent requests
+        
+        Args:
+            **chat_kwargs: Keyword arguments for RAGChatService.chat()
+        
+        Returns:
+            Chat result for this request
+        """
+        search_results = None
+        if chat_kwargs.get('use_database', True) and not chat_kwargs.get('use_web_search', False):
+            n_results = chat_kwargs.get('n_results', 10)
+            search_n = n_results * 2 if chat_kwargs.get('use_reranking', True) else n_results
+            try:
+                search_results = await self._submit((chat_kwargs['query'], search_n))
+            except Exception as e:
+                # chat() searches on its own when no results are passed in
+                logger.warning(f"Batched vector search failed, searching per request: {e}")
+        
+        return await self.chat_service.chat(**chat_kwargs, search_results=search_results)
+    
+    async def _process(self, items: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+        # Fetch enough candidates for the largest request; each result is trimmed below
+        search_n = max(n for _, n in items)
+        results = await asyncio.to_thread(
+            self.chat_service.vector_service.search_batch,
+            [query for query, _ in items],
+            search_n
+        )
+        for (_, n), result in zip(items, results):
+            result['results'] = result['results'][:n]
+        return results
+
+
+class EmbeddingBatcher(MicroBatcher):
+    """Coalesces concurrent query embedding requests into one model call"""
+    
+    def __init__(self, vector_service, batch_wait_ms: int = BATCH_WAIT_MS, max_batch: int = EMBEDDING_MAX_BATCH):
+        """
+        Initialize embedding batcher
+        
+        Args:
+            vector_service: LangChainVectorizationService providing embed_queries()
+            batch_wait_ms: How long to wait for more queries after the first one
+            max_batch: Maximum number of queries per embedding call
+        """
+        super().__init__(batch_wait_ms, max_batch)
+        self.vector_service = vector_service
+    
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed a query, batched with other concurrent queries
+        
+        Args:
+            text: Query text
+        
+        Returns:
+            Query embedding
+        """
+        return await self._submit(text)
+    
+    async def _process(self, items: List[str]) -> List[List[float]]:
+        # embed_queries() serves cached vectors and embeds the rest in one call
+        return await asyncio.to_thread(self.vector_service.embed_queries, items)
@@ -1,9 +1,11 @@
+import threading
 from typing import List, Optional
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage, AIMessage
 from langchain.prompts import ChatPromptTemplate
 
 from app.core.config import settings
+from app.core.http_clients import openai_client_kwargs
 from app.schemas.chat import Message, Document
 
 class ChatService:
@@ -11,7 +13,8 @@ class ChatService:
         self.llm = ChatOpenAI(
             model="gpt-3.5-turbo",
             temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            **openai_client_kwargs(settings.OPENAI_API_KEY)
         )
         
         self.system_prompt = """あなたは医療機関向けのナレッジ検索アシスタントです。
@@ -71,4 +74,17 @@ class ChatService:
                 f"   内容: {doc.get('text', '')[:500]}..."
             )
         
-        return "\n\n".join(context_parts)
\ No newline at end of file
+        return "\n\n".join(context_parts)
+
+# Singleton instance
+_chat_service: Optional[ChatService] = None
+_chat_service_lock = threading.Lock()
+
+def get_chat_service() -> ChatService:
+    """Get or create the singleton chat service"""
+    global _chat_service
+    if _chat_service is None:
+        with _chat_service_lock:
+            if _chat_service is None:
+                _chat_service = ChatService()
+    return _chat_service
@@ -4,6 +4,7 @@ Conversation Memory Service using LangChain
 import os
 import json
 import logging
+import threading
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from pathlib import Path
@@ -14,6 +15,14 @@ from langchain_community.chat_models import ChatOpenAI
 from langchain.schema import BaseMessage, HumanMessage, AIMessage
 from langchain.prompts import PromptTemplate
 
+from app.services.history_window import (
+    MAX_HISTORY_MESSAGES,
+    summary_executor,
+    fold_into_summary,
+    with_rolling_summary
+)
+from app.core.http_clients import openai_client_kwargs
+
 logger = logging.getLogger(__name__)
 
 class ConversationMemoryService:
@@ -32,13 +41,20 @@ class ConversationMemoryService:
         # Store active conversations in memory
         self.conversations: Dict[str, Dict[str, Any]] = {}
         
+        # Cached thread summaries: thread_id -> {"version": ..., "summary": ...}
+        self.summary_cache: Dict[str, Dict[str, str]] = {}
+        
+        # Rolling summaries are saved from a background thread
+        self._save_lock = threading.Lock()
+        
         # Initialize LLM for conversation chains
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
             self.llm = ChatOpenAI(
                 model="gpt-4o-mini",
                 temperature=0.3,
-                openai_api_key=api_key
+                openai_api_key=api_key,
+                **openai_client_kwargs(api_key)
             )
             logger.info("Conversation memory service initialized with OpenAI")
         else:
@@ -95,7 +111,8 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
             "message_count": 0,
             "memory": memory,
             "chain": chain,
-            "messages": []
+            "messages": [],
+            "rolling_summary": ""
         }
         
         # Save to disk
@@ -148,11 +165,45 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
         thread["message_count"] += 1
         thread["updated_at"] = datetime.now().isoformat()
         
+        # Keep only the most recent messages; older ones go into the rolling summary
+        if len(thread["messages"]) > MAX_HISTORY_MESSAGES:
+            evicted = thread["messages"][:-MAX_HISTORY_MESSAGES]
+            thread["messages"] = thread["messages"][-MAX_HISTORY_MESSAGES:]
+            chat_memory = thread["memory"].chat_memory
+            chat_memory.messages = chat_memory.messages[-MAX_HISTORY_MESSAGES:]
+            summary_executor.submit(self._fold_evicted, thread_id, evicted)
+        
         # Save to disk
         self._save_thread(thread_id)
         
         return True
     
+    def _fold_evicted(self, thread_id: str, evicted: List[Dict[str, Any]]) -> None:
+        """Merge evicted messages into the thread's rolling summary"""
+        thread = self.conversations.get(thread_id)
+        if thread is None:
+            return
+        try:
+            thread["rolling_summary"] = fold_into_summary(self.llm, thread.get("rolling_summary", ""), evicted)
+            self._save_thread(thread_id)
+        except Exception as e:
+            logger.error(f"Failed to update rolling summary for {thread_id}: {e}")
+    
+    def get_rolling_summary(self, thread_id: str) -> str:
+        """
+        Get the summary of messages evicted from the thread window
+        
+        Args:
+            thread_id: Thread identifier
+            
+        Returns:
+            Rolling summary (empty if nothing was evicted yet)
+        """
+        if thread_id not in self.conversations:
+            if not self._load_thread(thread_id):
+                return ""
+        return self.conversations[thread_id].get("rolling_summary", "")
+    
     def get_memory(self, thread_id: str) -> Optional[ConversationBufferMemory]:
         """
         Get the memory object for a thread
@@ -209,7 +260,7 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
             role_label = "人間" if msg["role"] == "human" else "アシスタント"
             context_parts.append(f"{role_label}: {msg['content']}")
         
-        return "\n\n".join(context_parts)
+        return with_rolling_summary("\n\n".join(context_parts), thread.get("rolling_summary", ""))
     
     def get_thread_info(self, thread_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -270,6 +321,7 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
         # Remove from memory
         if thread_id in self.conversations:
             del self.conversations[thread_id]
+        self.summary_cache.pop(thread_id, None)
         
         # Remove from disk
         thread_file = self.storage_path / f"{thread_id}.json"
@@ -291,6 +343,7 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
         
         # Clear from memory
         self.conversations.clear()
+        self.summary_cache.clear()
         
         # Clear from disk
         for thread_file in self.storage_path.glob("*.json"):
@@ -300,6 +353,34 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
         logger.info(f"Cleared {count} threads")
         return count
     
+    def get_cached_summary(self, thread_id: str, version: str) -> Optional[str]:
+        """
+        Get a cached thread summary
+        
+        Args:
+            thread_id: Thread identifier
+            version: Thread version the summary must have been built from
+            
+        Returns:
+            Cached summary or None if missing or outdated
+        """
+        cached = self.summary_cache.get(thread_id)
+        if not cached or cached["version"] != version:
+            return None
+        return cached["summary"]
+    
+    def set_cached_summary(self, thread_id: str, version: str, summary: str, ttl: int = 3600) -> None:
+        """
+        Cache a thread summary
+        
+        Args:
+            thread_id: Thread identifier
+            version: Thread version the summary was built from
+            summary: Summary text
+            ttl: Unused; entries are replaced when the thread version changes
+        """
+        self.summary_cache[thread_id] = {"version": version, "summary": summary}
+    
     def _save_thread(self, thread_id: str) -> bool:
         """
         Save thread to disk
@@ -322,13 +403,14 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
             "created_at": thread["created_at"],
             "updated_at": thread["updated_at"],
             "message_count": thread["message_count"],
-            "messages": thread["messages"]
+            "messages": thread["messages"],
+            "rolling_summary": thread.get("rolling_summary", "")
         }
         
         # Save to file
         thread_file = self.storage_path / f"{thread_id}.json"
         try:
-            with open(thread_file, "w", encoding="utf-8") as f:
+            with self._save_lock, open(thread_file, "w", encoding="utf-8") as f:
                 json.dump(save_data, f, ensure_ascii=False, indent=2)
             return True
         except Exception as e:
@@ -395,7 +477,8 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
                 "message_count": data["message_count"],
                 "memory": memory,
                 "chain": chain,
-                "messages": data.get("messages", [])
+                "messages": data.get("messages", []),
+                "rolling_summary": data.get("rolling_summary", "")
             }
             
             return True
@@ -2,8 +2,8 @@ from typing import List, Optional, Dict, Any
 import uuid
 import json
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import desc, text
 import redis
 from app.models.conversation import Conversation
 from app.database import get_db
@@ -11,6 +11,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# JSON列から直近メッセージのroleとcontentだけを取り出す（メタデータは転送しない）
+_TRANSCRIPT_SQL = text("""
+    SELECT m.value->>'role' AS role, m.value->>'content' AS content
+    FROM conversations c
+    CROSS JOIN LATERAL json_array_elements(c.messages) WITH ORDINALITY AS m(value, idx)
+    WHERE c.id = :conversation_id
+      AND m.idx > json_array_length(c.messages) - :max_messages
+    ORDER BY m.idx
+""")
+
 
 class ConversationService:
     def __init__(self):
@@ -70,10 +80,12 @@ class ConversationService:
             return None
     
     def list_threads(self, db: Session, limit: int = 20) -> List[Dict[str, Any]]:
-        """アクティブなスレッド一覧を取得"""
+        """アクティブなスレッド一覧を取得（メッセージ本文は読み込まない）"""
         try:
-            # シンプルにアクティブなスレッドを取得
-            conversations = db.query(Conversation).filter(
+            # 一覧表示にはメッセージ本文が不要なため、JSON列の読み込みを遅延させる
+            conversations = db.query(Conversation).options(
+                defer(Conversation.messages)
+            ).filter(
                 Conversation.is_active == True
             ).order_by(
                 desc(Conversation.updated_at)
@@ -85,43 +97,77 @@ class ConversationService:
             for conv in conversations:
                 if conv.thread_id not in seen_threads:
                     seen_threads.add(conv.thread_id)
-                    unique_conversations.append(conv.to_dict())
+                    unique_conversations.append(conv.to_summary_dict())
             
             return unique_conversations
         except Exception as e:
             logger.error(f"Failed to list threads: {e}")
             return []
     
+    def get_thread_transcript(self, db: Session, thread_id: str, max_messages: int) -> Optional[Dict[str, Any]]:
+        """スレッドのメタデータと直近メッセージの(role, content)のみを取得"""
+        try:
+            conversation = db.query(Conversation).options(
+                defer(Conversation.messages)
+            ).filter(
+                Conversation.thread_id == uuid.UUID(thread_id),
+                Conversation.is_active == True
+            ).order_by(desc(Conversation.updated_at)).first()
+            
+            if not conversation:
+                return None
+            
+            data = conversation.to_summary_dict()
+            data["transcript"] = []
+            # メッセージがなければJSON列には触れない
+            if conversation.message_count:
+                rows = db.execute(
+                    _TRANSCRIPT_SQL,
+                    {"conversation_id": conversation.id, "max_messages": max_messages}
+                ).all()
+                data["transcript"] = [(role, content) for role, content in rows]
+            
+            return data
+        except Exception as e:
+            logger.error(f"Failed to get thread transcript: {e}")
+            return None
+    
     def add_message(self, db: Session, thread_id: str, message: Dict[str, Any]) -> Dict[str, Any]:
         """メッセージを追加"""
+        return self.add_messages(db, thread_id, [message])
+    
+    def add_messages(self, db: Session, thread_id: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """複数のメッセージを1回の読み込み・更新で追加"""
         try:
+            # 同じスレッドへの並行した追加で更新が失われないよう行をロックする
             conversation = db.query(Conversation).filter(
                 Conversation.thread_id == uuid.UUID(thread_id)
-            ).first()
+            ).with_for_update().first()
             
             if not conversation:
                 # 新規作成
                 conversation = Conversation(
                     thread_id=uuid.UUID(thread_id),
-                    title=self._generate_title_from_message(message),
-                    messages=[message],
-                    message_count=1
+                    title=self._generate_title_from_message(messages[0]),
+                    messages=list(messages),
+                    message_count=len(messages)
                 )
                 db.add(conversation)
             else:
                 # 既存に追加 - JSON列の更新のため新しいリストを作成
-                messages = list(conversation.messages or [])
-                messages.append(message)
+                existing = list(conversation.messages or [])
+                was_empty = not existing
+                existing.extend(messages)
                 # SQLAlchemyのJSONフィールド更新を確実にするため、新しいオブジェクトを設定
                 from sqlalchemy.orm.attributes import flag_modified
-                conversation.messages = messages
+                conversation.messages = existing
                 flag_modified(conversation, 'messages')
-                conversation.message_count = len(messages)
+                conversation.message_count = len(existing)
                 conversation.updated_at = datetime.now(timezone.utc)
                 
                 # 最初のユーザーメッセージでタイトルを更新
-                if conversation.message_count == 1 and message.get("role") == "user":
-                    conversation.title = self._generate_title_from_message(message)
+                if was_empty and messages[0].get("role") == "user":
+                    conversation.title = self._generate_title_from_message(messages[0])
             
             db.commit()
             db.refresh(conversation)
@@ -0,0 +1,141 @@
+"""
+Content-addressed cache of finished conversions
+
+Uploads are hashed while they are written to disk. An upload whose saved path,
+bytes and conversion options match an earlier one reuses that conversion's
+Markdown instead of being converted again. The path is part of the key so that
+a hit always refers to an upload whose metadata relationship already points at
+the cached output; the same bytes under another name are converted normally.
+Entries live in Redis and point at a file in the converted directory; if that
+file has since changed or been deleted, the entry is treated as a miss.
+"""
+import os
+import json
+import hashlib
+import time
+import logging
+from typing import Any, Dict, Optional
+
+import aiofiles
+
+from app.core.database import get_redis
+from app.models.data_models import ConversionResult, ConversionStatus
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = int(os.getenv("CONVERSION_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+class ConversionCache:
+    """Redis-backed map from upload path + digest + options to a converted file"""
+    
+    def __init__(self, output_dir: str = "./converted", ttl: int = CACHE_TTL):
+        """
+        Initialize conversion cache
+        
+        Args:
+            output_dir: Directory holding converted Markdown files
+            ttl: Seconds a cache entry stays valid
+        """
+        self.output_dir = output_dir
+        self.ttl = ttl
+    
+    @staticmethod
+    def make_key(digest: str, upload_path: str, use_ai_mode: bool, use_api_enhancement: bool) -> str:
+        """Build the cache key; the upload path and options that change the Markdown are part of it"""
+        path_hash = hashlib.blake2b(os.path.normpath(upload_path).encode("utf-8"), digest_size=8).hexdigest()
+        return f"conversion_cache:{digest}:{path_hash}:{int(use_ai_mode)}{int(use_api_enhancement)}"
+    
+    async def get(
+        self,
+        digest: str,
+        upload_path: str,
+        use_ai_mode: bool,
+        use_api_enhancement: bool,
+        conversion_id: str
+    ) -> Optional[ConversionResult]:
+        """
+        Look up a previous conversion of the same content
+        
+        Args:
+            digest: Hex digest of the uploaded bytes
+            upload_path: Path the upload was saved to
+            use_ai_mode: Whether AI mode was requested
+            use_api_enhancement: Whether API enhancement was requested
+            conversion_id: ID to give the returned result
+        
+        Returns:
+            Completed ConversionResult built from the cached output, or None
+        """
+        start_time = time.time()
+        try:
+            redis_client = await get_redis()
+            if not redis_client:
+                return None
+            cached = await redis_client.get(self.make_key(digest, upload_path, use_ai_mode, use_api_enhancement))
+            if not cached:
+                return None
+            entry: Dict[str, Any] = json.loads(cached)
+            
+            output_path = os.path.join(self.output_dir, entry["output_file"])
+            stat = os.stat(output_path)
+            if (stat.st_mtime_ns, stat.st_size) != (entry["mtime_ns"], entry["size"]):
+                return None
+            
+            async with aiofiles.open(output_path, 'r', encoding='utf-8') as f:
+                markdown_content = await f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Conversion cache lookup failed: {e}")
+            return None
+        
+        input_file = os.path.basename(upload_path)
+        logger.info(f"Conversion cache hit: {input_file} -> {entry['output_file']}")
+        return ConversionResult(
+            id=conversion_id,
+            input_file=input_file,
+            output_file=entry["output_file"],
+            status=ConversionStatus.COMPLETED,
+            processing_time=time.time() - start_time,
+            markdown_content=markdown_content
+        )
+    
+    async def put(
+        self,
+        digest: str,
+        upload_path: str,
+        use_ai_mode: bool,
+        use_api_enhancement: bool,
+        result: Optional[ConversionResult]
+    ) -> None:
+        """
+        Remember a successful conversion (call after the output file is final)
+        
+        Args:
+            digest: Hex digest of the uploaded bytes
+            upload_path: Path the upload was saved to
+            use_ai_mode: Whether AI mode was used
+            use_api_enhancement: Whether API enhancement was applied
+            result: Conversion result; anything but a completed result is ignored
+        """
+        if not result or result.status != ConversionStatus.COMPLETED or not result.output_file:
+            return
+        
+        try:
+            redis_client = await get_redis()
+            if not redis_client:
+                return
+            stat = os.stat(os.path.join(self.output_dir, result.output_file))
+            entry = {
+                "output_file": result.output_file,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size
+            }
+            await redis_client.setex(
+                self.make_key(digest, upload_path, use_ai_mode, use_api_enhancement),
+                self.ttl,
+                json.dumps(entry)
+            )
+        except Exception as e:
+            logger.warning(f"Conversion cache store failed: {e}")
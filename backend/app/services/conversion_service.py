@@ -23,7 +23,7 @@ class ConversionService:
     """ファイル変換を管理するサービスクラス"""
     
     def __init__(self):
-        self.supported_formats = [f.value for f in FileFormat]
+        self.supported_formats = frozenset(f.value for f in FileFormat)
         self.upload_dir = "original"
         self.output_dir = "converted"
         self.md = MarkItDown()
@@ -39,9 +39,11 @@ class ConversionService:
         # Metadata service for file tracking
         self.metadata_service = MetadataService()
         
-    def is_supported_format(self, filename: str) -> bool:
-        """ファイル形式がサポートされているか確認"""
-        ext = filename.split('.')[-1].lower()
+    def is_supported_format(self, filename: Optional[str]) -> bool:
+        """ファイル形式がサポートされているか確認（拡張子1回の切り出しとfrozensetの参照のみ）"""
+        if not filename:
+            return False
+        ext = os.path.splitext(filename)[1].lower().lstrip('.')
         return ext in self.supported_formats
     
     def initialize_databases(self, firebase_config: Optional[Dict] = None, vector_db_path: str = "./chroma_db"):
@@ -79,7 +81,7 @@ class ConversionService:
         logger.info(f"convert_file called - input_path: {input_path}, output_filename: {output_filename}, use_ai_mode: {use_ai_mode}")
         
         # Check if it's a URL (YouTube)
-        if input_path.startswith('http://') or input_path.startswith('https://'):
+        if input_path.startswith(('http://', 'https://')):
             if self.enhanced_service.is_youtube_url(input_path):
                 return await self.enhanced_service.convert_file_enhanced(
                     input_path="",
@@ -298,17 +300,13 @@ class ConversionService:
         
         # バッチ処理を効率化するため、MarkItDownインスタンスを再利用
         if use_ai_mode:
-            # AI modeの場合はMarkItDown AI Serviceを使用
-            from app.services.markitdown_ai_service import MarkItDownAIService
-            ai_service = MarkItDownAIService()
-            
-            # 並列処理でバッチ変換
+            # AI modeの場合はMarkItDown AI Serviceを使用（並列処理でバッチ変換）
             tasks = []
             for file_path in file_paths:
                 base_name = os.path.splitext(os.path.basename(file_path))[0]
                 output_filename = f"{base_name}.md"
                 
-                task = ai_service.convert_with_ai(
+                task = self.markitdown_ai_service.convert_with_ai(
                     file_path, 
                     output_filename, 
                     use_ai_mode=True
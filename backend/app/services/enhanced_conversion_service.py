@@ -8,6 +8,7 @@ Enhanced file conversion service with support for:
 """
 import os
 import time
+import asyncio
 import uuid
 import json
 import csv
@@ -50,6 +51,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# youtube.com/... and youtu.be/... (watch?v= and short links are covered by the prefix)
+YOUTUBE_URL_PATTERN = re.compile(r'(https?://)?(www\.)?(youtube\.com|youtu\.be)/')
+
 class EnhancedConversionService:
     """Enhanced file conversion service with support for various formats"""
     
@@ -106,12 +110,7 @@ class EnhancedConversionService:
         
     def is_youtube_url(self, text: str) -> bool:
         """Check if the text is a YouTube URL"""
-        youtube_patterns = [
-            r'(https?://)?(www\.)?(youtube\.com|youtu\.be)/',
-            r'(https?://)?(www\.)?youtube\.com/watch\?v=',
-            r'(https?://)?(www\.)?youtu\.be/'
-        ]
-        return any(re.match(pattern, text) for pattern in youtube_patterns)
+        return YOUTUBE_URL_PATTERN.match(text) is not None
     
     def extract_youtube_id(self, url: str) -> Optional[str]:
         """Extract YouTube video ID from URL"""
@@ -466,6 +465,19 @@ class EnhancedConversionService:
             # Handle YouTube URLs
             if is_url and url_content:
                 markdown_content = await self.convert_youtube_url(url_content)
+                
+                # In AI mode, enhance the transcript before the single write below
+                if use_ai_mode:
+                    try:
+                        markdown_content = await asyncio.to_thread(
+                            self.llm_client.enhance_document_content,
+                            markdown_content,
+                            "youtube_video",
+                            []
+                        )
+                    except Exception as e:
+                        logger.error(f"Error enhancing YouTube content: {e}")
+                        # Keep original markdown if enhancement fails
             else:
                 # Determine file type and use appropriate conversion
                 file_ext = os.path.splitext(input_path)[1].lower()[1:]
@@ -0,0 +1,77 @@
+"""
+Sliding-window helpers for conversation memory
+
+Threads keep at most MAX_HISTORY_MESSAGES recent messages. Older messages are
+folded into a rolling summary in the background so prompt size and stored
+history stay bounded however long a thread runs.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+from langchain.schema import HumanMessage, SystemMessage
+
+logger = logging.getLogger(__name__)
+
+MAX_HISTORY_MESSAGES = 40
+MAX_ROLLING_SUMMARY_CHARS = 2000
+
+# Single worker: folds for the same thread never run concurrently
+summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-fold")
+
+_FOLD_SYSTEM_MESSAGE = SystemMessage(content="あなたは会話を要約する専門家です。後続の会話で参照できるよう、事実と決定事項を簡潔にまとめてください。")
+_FOLD_PROMPT_TEMPLATE = """これまでの会話の要約と、その後に続いた会話があります。両方を統合した要約を{max_chars}文字以内で作成してください。
+
+これまでの要約:
+{previous_summary}
+
+続きの会話:
+{messages}"""
+
+
+def format_messages(messages: List[Dict[str, str]]) -> str:
+    """Format {"role", "content"} messages as plain text"""
+    lines = []
+    for msg in messages:
+        role_label = "人間" if msg["role"] in ("human", "user") else "アシスタント"
+        lines.append(f"{role_label}: {msg['content']}")
+    return "\n".join(lines)
+
+
+def fold_into_summary(llm, previous_summary: str, evicted: List[Dict[str, str]]) -> str:
+    """
+    Merge evicted messages into the rolling summary
+    
+    Args:
+        llm: Chat model used for summarization, or None
+        previous_summary: Current rolling summary
+        evicted: Messages dropped from the window, oldest first
+    
+    Returns:
+        Updated rolling summary (at most MAX_ROLLING_SUMMARY_CHARS characters)
+    """
+    if llm:
+        try:
+            prompt = _FOLD_PROMPT_TEMPLATE.format(
+                max_chars=MAX_ROLLING_SUMMARY_CHARS,
+                previous_summary=previous_summary or "（なし）",
+                messages=format_messages(evicted)
+            )
+            response = llm.invoke([_FOLD_SYSTEM_MESSAGE, HumanMessage(content=prompt)])
+            return response.content[:MAX_ROLLING_SUMMARY_CHARS]
+        except Exception as e:
+            logger.warning(f"Rolling summary generation failed, using excerpt: {e}")
+    
+    # Fallback: keep a short excerpt of each evicted message, newest text wins
+    excerpt = format_messages([
+        {"role": msg["role"], "content": msg["content"][:100]} for msg in evicted
+    ])
+    combined = f"{previous_summary}\n{excerpt}" if previous_summary else excerpt
+    return combined[-MAX_ROLLING_SUMMARY_CHARS:]
+
+
+def with_rolling_summary(context: str, rolling_summary: Optional[str]) -> str:
+    """Prepend the rolling summary to a formatted conversation context"""
+    if not rolling_summary:
+        return context
+    return f"（これまでの会話の要約）\n{rolling_summary}\n\n{context}"
@@ -0,0 +1,107 @@
+"""
+Buffered MongoDB writer for chat history
+
+Chat endpoints enqueue history documents and return immediately; a background
+task writes them with one insert_many per flush interval instead of one
+awaited insert_one per request.
+"""
+import os
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from pymongo import WriteConcern
+
+from app.core.database import get_mongodb
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_MS = int(os.getenv("HISTORY_FLUSH_INTERVAL_MS", "100"))
+MAX_BATCH = int(os.getenv("HISTORY_MAX_BATCH", "64"))
+
+# Queued by close() to tell the worker to flush what it has and stop
+_STOP = object()
+
+
+class HistoryWriter:
+    """Collects chat history documents and inserts them in batches"""
+    
+    def __init__(self, collection_name: str = "chat_history", flush_interval_ms: int = FLUSH_INTERVAL_MS, max_batch: int = MAX_BATCH):
+        """
+        Initialize history writer
+        
+        Args:
+            collection_name: MongoDB collection receiving the documents
+            flush_interval_ms: How long to wait for more documents after the first one
+            max_batch: Maximum number of documents per insert_many
+        """
+        self.collection_name = collection_name
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    def put_nowait(self, document: Dict[str, Any]) -> None:
+        """
+        Queue a document for insertion without waiting for the write
+        
+        Args:
+            document: Chat history document
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        self._queue.put_nowait(document)
+    
+    async def _collect_batch(self) -> List[Any]:
+        """Wait for one document, then gather more until the interval closes or the batch is full"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+        
+        while len(batch) < self.max_batch and batch[-1] is not _STOP:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _run(self) -> None:
+        """Background loop flushing batches until close() is called"""
+        while True:
+            batch = await self._collect_batch()
+            stopping = batch[-1] is _STOP
+            documents = [doc for doc in batch if doc is not _STOP]
+            if documents:
+                await self._flush(documents)
+            if stopping:
+                return
+    
+    async def _flush(self, documents: List[Dict[str, Any]]) -> None:
+        """Insert one batch; failures are logged, never raised to callers"""
+        mongodb = await get_mongodb()
+        if mongodb is None:
+            logger.warning(f"MongoDB unavailable, dropping {len(documents)} chat history documents")
+            return
+        
+        try:
+            # Unacknowledged writes: the response never waits on history
+            collection = mongodb[self.collection_name].with_options(write_concern=WriteConcern(w=0))
+            await collection.insert_many(documents, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to write chat history: {e}")
+    
+    async def close(self) -> None:
+        """Flush queued documents and stop the background task"""
+        if self._worker is None or self._worker.done():
+            return
+        self._queue.put_nowait(_STOP)
+        await self._worker
+
+
+# Singleton instance
+history_writer = HistoryWriter()
@@ -4,7 +4,10 @@ LangChain-based Vector Database Service with Semantic Chunking
 import os
 import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 # LangChain imports
@@ -20,6 +23,22 @@ from app.services.metadata_service import MetadataService
 
 logger = logging.getLogger(__name__)
 
+# Number of query embeddings kept for repeated queries
+QUERY_EMBEDDING_CACHE_SIZE = 2048
+
+# Chunks embedded and upserted per call when vectorizing several files
+# (kept below Chroma's maximum batch size)
+VECTORIZE_BATCH_SIZE = 1000
+
+# HNSW graph parameters for the Chroma collection (defaults match Chroma's own).
+# They only take effect when the collection is created; search_ef trades recall for latency.
+HNSW_METADATA = {
+    "hnsw:space": "l2",  # search() maps L2 distance of unit vectors to similarity
+    "hnsw:M": int(os.getenv("CHROMA_HNSW_M", "16")),
+    "hnsw:construction_ef": int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "100")),
+    "hnsw:search_ef": int(os.getenv("CHROMA_HNSW_SEARCH_EF", "10"))
+}
+
 class SemanticTextSplitter:
     """Custom semantic text splitter with sliding window and overlap"""
     
@@ -131,6 +150,12 @@ class LangChainVectorizationService:
         # Initialize or load Chroma vector store
         self.vector_store = self._initialize_vector_store()
         
+        # LRU cache of query embeddings keyed by normalized query text.
+        # Vectors are kept as packed float32 (the model's own precision, so the
+        # round trip is exact) instead of tuples of boxed Python floats.
+        self._query_embedding_cache: "OrderedDict[str, array]" = OrderedDict()
+        self._query_embedding_lock = threading.Lock()
+        
         logger.info("LangChain vectorization service initialized")
     
     def _initialize_vector_store(self) -> Chroma:
@@ -144,7 +169,8 @@ class LangChainVectorizationService:
             vector_store = Chroma(
                 collection_name="converted_documents_langchain",
                 embedding_function=self.embeddings,
-                persist_directory=chroma_path
+                persist_directory=chroma_path,
+                collection_metadata=HNSW_METADATA
             )
             
             logger.info(f"Initialized Chroma vector store at {chroma_path}")
@@ -158,6 +184,42 @@ class LangChainVectorizationService:
         """Generate a unique ID for a document"""
         return hashlib.md5(filename.encode()).hexdigest()
     
+    def _split_file(self, filename: str) -> Tuple[Dict[str, Any], List[Document]]:
+        """
+        Read a converted file and split it into chunks carrying the document metadata
+        
+        Args:
+            filename: Name of the file in converted directory
+            
+        Returns:
+            Document-level metadata and the chunk documents
+        """
+        filepath = os.path.join(self.converted_dir, filename)
+        
+        # Read file content
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Get metadata from metadata service
+        file_metadata = self.metadata_service.get_file_metadata(filename, "converted")
+        relationship = self.metadata_service.get_file_relationship(filename)
+        
+        # Prepare metadata for chunks (ensure no None values)
+        doc_metadata = {
+            "source_filename": filename,
+            "doc_id": self.generate_doc_id(filename),
+            "original_filename": relationship.original_file.original_filename if relationship else filename,
+            "conversion_id": file_metadata.conversion_id if file_metadata else "",
+            "file_size": os.path.getsize(filepath),
+            "vectorization_date": datetime.now().isoformat()
+        }
+        
+        # Remove any None values from metadata
+        doc_metadata = {k: v if v is not None else "" for k, v in doc_metadata.items()}
+        
+        # Split text into semantic chunks
+        return doc_metadata, self.text_splitter.split_text(content, doc_metadata)
+    
     def vectorize_file(self, filename: str) -> Dict[str, Any]:
         """
         Vectorize a single converted file with semantic chunking
@@ -177,26 +239,7 @@ class LangChainVectorizationService:
             raise ValueError(f"Only markdown files are supported: {filename}")
         
         try:
-            # Read file content
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Get metadata from metadata service
-            file_metadata = self.metadata_service.get_file_metadata(filename, "converted")
-            relationship = self.metadata_service.get_file_relationship(filename)
-            
-            # Prepare metadata for chunks (ensure no None values)
-            doc_metadata = {
-                "source_filename": filename,
-                "doc_id": self.generate_doc_id(filename),
-                "original_filename": relationship.original_file.original_filename if relationship else filename,
-                "conversion_id": file_metadata.conversion_id if file_metadata else "",
-                "file_size": os.path.getsize(filepath),
-                "vectorization_date": datetime.now().isoformat()
-            }
-            
-            # Remove any None values from metadata
-            doc_metadata = {k: v if v is not None else "" for k, v in doc_metadata.items()}
+            doc_metadata, documents = self._split_file(filename)
             
             # Check if document already exists
             existing_docs = self.vector_store.similarity_search(
@@ -212,9 +255,6 @@ class LangChainVectorizationService:
                 # so we'll overwrite by adding new docs with same ID
                 logger.info(f"Document {filename} already exists, will be updated")
             
-            # Split text into semantic chunks
-            documents = self.text_splitter.split_text(content, doc_metadata)
-            
             if not documents:
                 return {
                     "status": "skipped",
@@ -260,6 +300,90 @@ class LangChainVectorizationService:
             logger.error(f"Error vectorizing {filename}: {e}")
             raise
     
+    def vectorize_files_batch(self, filenames: List[str]) -> List[Dict[str, Any]]:
+        """
+        Vectorize several converted files with batched embedding and upserts
+        
+        Chunks of all files are embedded and written together, VECTORIZE_BATCH_SIZE
+        chunks per call, instead of one embedding pass and one upsert per file.
+        Chunk IDs are deterministic, so re-vectorized files overwrite their chunks.
+        
+        Args:
+            filenames: Names of files in converted directory
+            
+        Returns:
+            One result per filename, in order, with status success, skipped or error
+        """
+        # A repeated filename would put duplicate chunk IDs into one upsert
+        if len(set(filenames)) != len(filenames):
+            unique = list(dict.fromkeys(filenames))
+            by_name = dict(zip(unique, self.vectorize_files_batch(unique)))
+            return [by_name[filename] for filename in filenames]
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(filenames)
+        texts, metadatas, ids = [], [], []
+        prepared = []
+        
+        for index, filename in enumerate(filenames):
+            if not filename.endswith('.md'):
+                results[index] = {"status": "error", "filename": filename, "message": f"Only markdown files are supported: {filename}"}
+                continue
+            try:
+                doc_metadata, documents = self._split_file(filename)
+            except FileNotFoundError:
+                results[index] = {"status": "error", "filename": filename, "message": f"File not found: {filename}"}
+                continue
+            except Exception as e:
+                logger.error(f"Error vectorizing {filename}: {e}")
+                results[index] = {"status": "error", "filename": filename, "message": str(e)}
+                continue
+            
+            if not documents:
+                results[index] = {"status": "skipped", "message": "No content to vectorize", "filename": filename}
+                continue
+            
+            texts.extend(doc.page_content for doc in documents)
+            metadatas.extend(doc.metadata for doc in documents)
+            ids.extend(f"{doc_metadata['doc_id']}_{i}" for i in range(len(documents)))
+            prepared.append((index, filename, doc_metadata["doc_id"], len(documents)))
+        
+        if not prepared:
+            return results
+        
+        try:
+            for start in range(0, len(texts), VECTORIZE_BATCH_SIZE):
+                end = start + VECTORIZE_BATCH_SIZE
+                self.vector_store.add_texts(
+                    texts=texts[start:end],
+                    metadatas=metadatas[start:end],
+                    ids=ids[start:end]
+                )
+        except Exception as e:
+            logger.error(f"Error vectorizing batch of {len(prepared)} files: {e}")
+            for index, filename, _, _ in prepared:
+                results[index] = {"status": "error", "filename": filename, "message": str(e)}
+            return results
+        
+        # Update metadata service (one metadata write for the whole batch)
+        self.metadata_service.update_vectorization_statuses(
+            {filename: chunks for _, filename, _, chunks in prepared}
+        )
+        
+        timestamp = datetime.now().isoformat()
+        for index, filename, doc_id, chunks in prepared:
+            results[index] = {
+                "status": "success",
+                "filename": filename,
+                "chunks_created": chunks,
+                "doc_id": doc_id,
+                "chunk_size": self.text_splitter.chunk_size,
+                "overlap_percentage": 15,
+                "timestamp": timestamp
+            }
+        
+        logger.info(f"Vectorized {len(prepared)} files: {len(texts)} chunks with 15% overlap")
+        return results
+    
     def vectorize_all_files(self) -> Dict[str, Any]:
         """
         Vectorize all markdown files in the converted directory
@@ -297,6 +421,67 @@ class LangChainVectorizationService:
             "timestamp": datetime.now().isoformat()
         }
     
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Normalize query text for embedding cache lookups (the embedding model is uncased)"""
+        return query.strip().lower()
+    
+    def _cache_query_embedding(self, key: str, embedding: List[float]) -> None:
+        """Store a query embedding, evicting the least recently used entry when full"""
+        with self._query_embedding_lock:
+            self._query_embedding_cache[key] = array('f', embedding)
+            self._query_embedding_cache.move_to_end(key)
+            if len(self._query_embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embedding_cache.popitem(last=False)
+    
+    def _cached_query_embedding(self, key: str) -> Optional[List[float]]:
+        """Get a cached query embedding and mark it as recently used"""
+        with self._query_embedding_lock:
+            embedding = self._query_embedding_cache.get(key)
+            if embedding is None:
+                return None
+            self._query_embedding_cache.move_to_end(key)
+            return embedding.tolist()
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a search query, reusing the vector for repeated queries
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Query embedding
+        """
+        key = self._normalize_query(query)
+        embedding = self._cached_query_embedding(key)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(key)
+            self._cache_query_embedding(key, embedding)
+        return embedding
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed several search queries with one model call for the uncached ones
+        
+        Args:
+            queries: Search queries
+            
+        Returns:
+            Query embeddings in the same order as queries
+        """
+        keys = [self._normalize_query(query) for query in queries]
+        embeddings = [self._cached_query_embedding(key) for key in keys]
+        
+        missing = list(dict.fromkeys(key for key, emb in zip(keys, embeddings) if emb is None))
+        if missing:
+            computed = dict(zip(missing, self.embeddings.embed_documents(missing)))
+            for key, embedding in computed.items():
+                self._cache_query_embedding(key, embedding)
+            embeddings = [emb if emb is not None else computed[key] for key, emb in zip(keys, embeddings)]
+        
+        return embeddings
+    
     def search(self, query: str, n_results: int = 5, filter: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Search for similar content using LangChain vector store
@@ -310,9 +495,9 @@ class LangChainVectorizationService:
             Search results with metadata
         """
         try:
-            # Perform similarity search with scores
-            results_with_scores = self.vector_store.similarity_search_with_score(
-                query,
+            # Perform similarity search with scores (query embedding is cached)
+            results_with_scores = self.vector_store.similarity_search_by_vector_with_relevance_scores(
+                self.embed_query(query),
                 k=n_results,
                 filter=filter
             )
@@ -341,6 +526,96 @@ class LangChainVectorizationService:
             logger.error(f"Search error: {e}")
             raise
     
+    def search_batch(self, queries: List[str], n_results: int = 5, filter: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Search for several queries with one embedding call and one Chroma query
+        
+        Args:
+            queries: Search queries
+            n_results: Number of results to return per query
+            filter: Metadata filter for search
+        
+        Returns:
+            One search result dict per query, in the same format as search()
+        """
+        if not queries:
+            return []
+        
+        try:
+            query_embeddings = self.embed_queries(queries)
+            
+            raw = self.vector_store._collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=filter,
+                include=["documents", "metadatas", "distances"]
+            )
+            
+            timestamp = datetime.now().isoformat()
+            batch_results = []
+            for i, query in enumerate(queries):
+                formatted_results = []
+                for text, metadata, score in zip(raw["documents"][i], raw["metadatas"][i], raw["distances"][i]):
+                    similarity = 1 - (score / 2)
+                    formatted_results.append({
+                        "text": text,
+                        "metadata": metadata or {},
+                        "distance": score,
+                        "similarity": max(0, min(1, similarity))
+                    })
+                
+                batch_results.append({
+                    "query": query,
+                    "results": formatted_results,
+                    "count": len(formatted_results),
+                    "timestamp": timestamp
+                })
+            
+            return batch_results
+        
+        except Exception as e:
+            logger.error(f"Batch search error: {e}")
+            raise
+    
+    def get_chunk(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a single chunk by its ID
+        
+        Args:
+            chunk_id: Chunk ID ("{doc_id}_{chunk_index}")
+            
+        Returns:
+            Chunk text and metadata, or None if not found
+        """
+        result = self.vector_store._collection.get(
+            ids=[chunk_id],
+            include=["documents", "metadatas"]
+        )
+        if not result.get("ids"):
+            return None
+        
+        return {
+            "source_id": chunk_id,
+            "text": result["documents"][0],
+            "metadata": result["metadatas"][0] or {}
+        }
+    
+    def get_index_info(self) -> Dict[str, Any]:
+        """
+        Describe the ANN index backing the collection
+        
+        Returns:
+            Index type, distance space and vector encoding
+        """
+        metadata = self.vector_store._collection.metadata or {}
+        return {
+            "type": "hnsw",
+            "space": metadata.get("hnsw:space", "l2"),
+            # Chroma stores and searches full-precision vectors; it has no quantized index
+            "quantization": "none",
+            "dtype": "float32"
+        }
+    
     def get_collection_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the vector collection
@@ -355,16 +630,13 @@ class LangChainVectorizationService:
             # Count documents
             doc_count = collection.count()
             
-            # Get unique source files
+            # Get unique source files from chunk metadata only
+            # (no query embedding, no index traversal, no document text)
             unique_files = set()
-            
-            # Get ALL documents to ensure accurate count
-            # Use a higher k value to get all documents
             if doc_count > 0:
-                sample_results = self.vector_store.similarity_search("", k=doc_count)
-                for doc in sample_results:
-                    if doc.metadata and 'source_filename' in doc.metadata:
-                        unique_files.add(doc.metadata['source_filename'])
+                for metadata in collection.get(include=["metadatas"])["metadatas"]:
+                    if metadata and 'source_filename' in metadata:
+                        unique_files.add(metadata['source_filename'])
             
             return {
                 "collection_name": "converted_documents_langchain",
@@ -375,6 +647,7 @@ class LangChainVectorizationService:
                 "chunk_size": self.text_splitter.chunk_size,
                 "overlap_percentage": 15,
                 "embedding_model": "all-MiniLM-L6-v2",
+                "index": self.get_index_info(),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -4,7 +4,7 @@ Metadata Service for managing file metadata and relationships
 import os
 import json
 import hashlib
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 import logging
@@ -69,7 +69,7 @@ class MetadataService:
     def _save_metadata(self):
         """Save metadata to storage"""
         try:
-            data = {k: v.dict() for k, v in self.metadata_cache.items()}
+            data = {k: v.model_dump(mode="json") for k, v in self.metadata_cache.items()}
             with open(self.metadata_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, default=str)
         except Exception as e:
@@ -78,7 +78,7 @@ class MetadataService:
     def _save_relationships(self):
         """Save relationships to storage"""
         try:
-            data = [rel.dict() for rel in self.relationships_cache]
+            data = [rel.model_dump(mode="json") for rel in self.relationships_cache]
             with open(self.relationships_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, default=str)
         except Exception as e:
@@ -269,6 +269,40 @@ class MetadataService:
                 return rel
         return None
     
+    def get_bulk(
+        self,
+        filenames: List[str],
+        file_type: str = "original"
+    ) -> Dict[str, Tuple[Optional[FileMetadata], Optional[FileRelationship]]]:
+        """
+        Get metadata and relationships for many files in one pass
+        
+        Equivalent to calling get_file_metadata and get_file_relationship for
+        each name, but scans the relationships once instead of once per file.
+        
+        Args:
+            filenames: Names of the files
+            file_type: Type of file (original or converted)
+            
+        Returns:
+            Dict mapping each filename to (FileMetadata or None, FileRelationship or None)
+        """
+        wanted = set(filenames)
+        relationships: Dict[str, FileRelationship] = {}
+        for rel in self.relationships_cache:
+            # First matching relationship wins, as in get_file_relationship
+            names = [rel.original_file.original_filename]
+            if rel.converted_file:
+                names.append(rel.converted_file.converted_filename)
+            for name in names:
+                if name in wanted:
+                    relationships.setdefault(name, rel)
+        
+        return {
+            filename: (self.metadata_cache.get(f"{file_type}_{filename}"), relationships.get(filename))
+            for filename in filenames
+        }
+    
     def list_all_metadata(self, file_type: Optional[str] = None) -> List[FileMetadata]:
         """
         List all metadata
@@ -313,6 +347,25 @@ class MetadataService:
             self.metadata_cache[cache_key].vector_chunks = chunks
             self._save_metadata()
     
+    def update_vectorization_statuses(self, chunks_by_file: Dict[str, int]):
+        """
+        Mark several converted files as vectorized with one metadata write
+        
+        Args:
+            chunks_by_file: Number of vector chunks created per converted filename
+        """
+        now = datetime.now()
+        updated = False
+        for converted_filename, chunks in chunks_by_file.items():
+            cache_key = f"converted_{converted_filename}"
+            if cache_key in self.metadata_cache:
+                self.metadata_cache[cache_key].is_vectorized = True
+                self.metadata_cache[cache_key].vectorization_date = now
+                self.metadata_cache[cache_key].vector_chunks = chunks
+                updated = True
+        if updated:
+            self._save_metadata()
+    
     def get_conversion_history(self, original_filename: str) -> List[Dict[str, Any]]:
         """
         Get conversion history for a file
@@ -327,8 +380,8 @@ class MetadataService:
         for rel in self.relationships_cache:
             if rel.original_file.original_filename == original_filename:
                 entry = {
-                    "original": rel.original_file.dict(),
-                    "converted": rel.converted_file.dict() if rel.converted_file else None,
+                    "original": rel.original_file.model_dump(),
+                    "converted": rel.converted_file.model_dump() if rel.converted_file else None,
                     "relationship_type": rel.relationship_type,
                     "created_at": rel.created_at.isoformat()
                 }
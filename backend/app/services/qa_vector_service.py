@@ -1,7 +1,7 @@
 import os
 import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
@@ -9,6 +9,8 @@ from supabase import create_client, Client
 import numpy as np
 from datetime import datetime
 
+from app.services.semantic_cache import SemanticCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +33,8 @@ class QAVectorService:
             self.collection = None
             self.embedding_model = None
             self.supabase_client: Optional[Client] = None
+            # 類似クエリの検索結果キャッシュ（インデックス更新時にクリア）
+            self._search_cache = SemanticCache()
             self._initialized = True
     
     def initialize(
@@ -66,6 +70,7 @@ class QAVectorService:
                     metadata={"hnsw:space": "cosine", "type": "qa_faq"}
                 )
                 logger.info(f"Created new QA collection: {collection_name}")
+            self._search_cache.clear()
             
             # Supabaseクライアントの初期化
             if supabase_url and supabase_key:
@@ -175,6 +180,9 @@ class QAVectorService:
                     'status': faq['status'],
                     'priority': faq['priority'],
                     'question_title': faq['question_title'][:200],  # タイトルの最初の200文字
+                    # 検索結果の表示用（ドキュメント本文を解析せずに取り出せるようにする）
+                    'question_content': faq['question_content'] or '',
+                    'answer_content': faq['answer_content'] or '',
                     'created_at': faq['created_at'],
                     'updated_at': faq['updated_at']
                 }
@@ -191,6 +199,7 @@ class QAVectorService:
                     metadatas=[metadata]
                 )
             
+            self._search_cache.clear()
             logger.info(f"Successfully indexed {len(faqs)} FAQ records")
             return True
             
@@ -206,50 +215,81 @@ class QAVectorService:
         status_filter: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """類似するFAQを検索"""
+        return self.search_similar_faqs_batch([(query, n_results, category_filter, status_filter)])[0]
+    
+    def search_similar_faqs_batch(
+        self,
+        requests: List[Tuple[str, int, Optional[str], Optional[str]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """複数の類似FAQ検索をまとめて実行
+        
+        requestsの各要素は (query, n_results, category_filter, status_filter)。
+        埋め込みは全クエリで1回、ChromaDBへの検索は検索条件ごとに1回だけ行う。
+        """
+        all_results: List[List[Dict[str, Any]]] = [[] for _ in requests]
         try:
             if not self.collection:
                 logger.error("QA vector collection not initialized")
-                return []
-            
-            # クエリの埋め込みベクトルを生成
-            query_embedding = self.generate_embedding(query)
-            
-            if not query_embedding:
-                logger.error("Failed to generate query embedding")
-                return []
-            
-            # フィルター条件の構築
-            where_clause = {}
-            if category_filter:
-                where_clause['category_code'] = category_filter
-            if status_filter:
-                where_clause['status'] = status_filter
-            
-            # 類似検索の実行
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=n_results,
-                where=where_clause if where_clause else None
-            )
+                return all_results
             
-            # 結果の整形
-            formatted_results = []
-            if results['ids'] and len(results['ids'][0]) > 0:
-                for i in range(len(results['ids'][0])):
-                    result = {
-                        'id': results['ids'][0][i],
-                        'document': results['documents'][0][i] if results['documents'] else '',
-                        'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
-                        'distance': results['distances'][0][i] if results['distances'] else 0,
-                        'similarity_score': 1 - (results['distances'][0][i] if results['distances'] else 0)
-                    }
-                    formatted_results.append(result)
-            
-            return formatted_results
+            if not self.embedding_model:
+                logger.error("Embedding model not initialized")
+                return all_results
+            
+            # 全クエリの埋め込みベクトルを一括生成
+            query_embeddings = self.embedding_model.encode([request[0] for request in requests]).tolist()
+            
+            # ほぼ同じ意味のクエリを同じ条件で検索済みであればその結果を使い、
+            # 残りは検索条件ごとにまとめる
+            pending: Dict[Tuple[int, Optional[str], Optional[str]], List[int]] = {}
+            for i, (_, n_results, category_filter, status_filter) in enumerate(requests):
+                cache_options = (n_results, category_filter, status_filter)
+                cached = self._search_cache.get(query_embeddings[i], cache_options)
+                if cached is not None:
+                    logger.debug("QA search cache hit")
+                    all_results[i] = list(cached)
+                else:
+                    pending.setdefault(cache_options, []).append(i)
+            
+            for cache_options, indices in pending.items():
+                n_results, category_filter, status_filter = cache_options
+                
+                # フィルター条件の構築
+                where_clause = {}
+                if category_filter:
+                    where_clause['category_code'] = category_filter
+                if status_filter:
+                    where_clause['status'] = status_filter
+                
+                # 類似検索の実行（同じ条件のクエリをまとめて1回で検索）
+                results = self.collection.query(
+                    query_embeddings=[query_embeddings[i] for i in indices],
+                    n_results=n_results,
+                    where=where_clause if where_clause else None
+                )
+                
+                # 結果の整形
+                for row, i in enumerate(indices):
+                    formatted_results = []
+                    if results['ids'] and len(results['ids'][row]) > 0:
+                        for j in range(len(results['ids'][row])):
+                            distance = results['distances'][row][j] if results['distances'] else 0
+                            formatted_results.append({
+                                'id': results['ids'][row][j],
+                                'document': results['documents'][row][j] if results['documents'] else '',
+                                'metadata': results['metadatas'][row][j] if results['metadatas'] else {},
+                                'distance': distance,
+                                'similarity_score': 1 - distance
+                            })
+                    
+                    self._search_cache.put(query_embeddings[i], cache_options, tuple(formatted_results))
+                    all_results[i] = formatted_results
+            
+            return all_results
             
         except Exception as e:
             logger.error(f"Failed to search similar FAQs: {str(e)}")
-            return []
+            return all_results
     
     def update_faq_in_index(self, faq_id: str, faq_data: Dict[str, Any]) -> bool:
         """特定のFAQをインデックスで更新"""
@@ -282,6 +322,8 @@ class QAVectorService:
                 'status': faq_data.get('status', 'resolved'),
                 'priority': faq_data.get('priority', 'medium'),
                 'question_title': faq_data['question_title'][:200],
+                'question_content': faq_data.get('question_content') or '',
+                'answer_content': faq_data.get('answer_content') or '',
                 'updated_at': datetime.now().isoformat()
             }
             
@@ -293,6 +335,7 @@ class QAVectorService:
                 metadatas=[metadata]
             )
             
+            self._search_cache.clear()
             logger.info(f"Successfully updated FAQ {faq_id} in index")
             return True
             
@@ -308,6 +351,7 @@ class QAVectorService:
                 return False
             
             self.collection.delete(ids=[f"faq_{faq_id}"])
+            self._search_cache.clear()
             logger.info(f"Successfully deleted FAQ {faq_id} from index")
             return True
             
@@ -357,6 +401,7 @@ class QAVectorService:
             
             # 既存のデータをクリア
             self.collection.delete(where={})
+            self._search_cache.clear()
             
             # FAQデータを再取得してインデックス化
             return self.index_faq_data()
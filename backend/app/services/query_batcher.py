@@ -0,0 +1,54 @@
+"""
+Micro-batching of concurrent vector searches
+
+Search requests that arrive while an earlier batch is still running are
+collected and handed to a batch function in a single call, so one encoder
+forward pass and one vector-store query serve many concurrent users. Each
+caller awaits its own future and gets back only its own result.
+"""
+import os
+import asyncio
+from typing import Any, Callable, List, Sequence
+
+from app.services.chat_dispatcher import MicroBatcher
+
+BATCH_WAIT_MS = int(os.getenv("SEARCH_BATCH_WINDOW_MS", "5"))
+MAX_BATCH = int(os.getenv("SEARCH_MAX_BATCH", "32"))
+
+
+class QueryBatcher(MicroBatcher):
+    """Coalesces concurrent requests into calls to a synchronous batch function"""
+    
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Sequence[Any]],
+        batch_wait_ms: int = BATCH_WAIT_MS,
+        max_batch: int = MAX_BATCH
+    ):
+        """
+        Initialize query batcher
+        
+        Args:
+            batch_fn: Blocking function mapping a list of requests to a list of
+                results in the same order; it runs in a worker thread
+            batch_wait_ms: How long to wait for more requests after the first one
+                while another batch is still being processed
+            max_batch: Maximum number of requests per batch call
+        """
+        super().__init__(batch_wait_ms, max_batch)
+        self.batch_fn = batch_fn
+    
+    async def submit(self, request: Any) -> Any:
+        """
+        Queue a request and wait for its result
+        
+        Args:
+            request: One entry of the list passed to batch_fn
+        
+        Returns:
+            The batch function's result for this request
+        """
+        return await self._submit(request)
+    
+    async def _process(self, items: List[Any]) -> List[Any]:
+        return list(await asyncio.to_thread(self.batch_fn, items))
@@ -2,8 +2,9 @@
 Enhanced RAG Chat Service with Reranking
 """
 import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from datetime import datetime
 from collections import defaultdict
 from dotenv import load_dotenv
@@ -20,6 +21,8 @@ from langchain_community.callbacks.manager import get_openai_callback
 from app.services.langchain_vectorization_service import LangChainVectorizationService
 from app.services.web_search_service import WebSearchService
 from app.prompts.prompt_loader import get_prompt_loader
+from app.core.http_clients import openai_client_kwargs
+from app.core.concurrency import llm_semaphore, limited_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -176,7 +179,8 @@ class RAGChatService:
                 max_tokens=500,
                 openai_api_key=api_key,
                 request_timeout=15.0,  # Reasonable timeout
-                max_retries=2
+                max_retries=2,
+                **openai_client_kwargs(api_key, timeout=15.0, max_retries=2)
             )
             logger.info("RAG chat service initialized with OpenAI gpt-4o-mini")
         else:
@@ -224,15 +228,18 @@ class RAGChatService:
             
             context_parts.append(f"[{i}] {filename} {chunk_info}:\n{text}")
             
-            # Add to sources
+            # Add to sources (full chunk text is served by GET /source/{source_id})
+            doc_id = metadata.get('doc_id')
             sources.append({
                 'index': i,
+                'source_id': f"{doc_id}_{metadata.get('chunk_index', 0)}" if doc_id else None,
                 'filename': filename,
                 'chunk_index': metadata.get('chunk_index', 0),
                 'total_chunks': metadata.get('total_chunks', 1),
                 'similarity': result.get('similarity', 0),
                 'reranking_score': result.get('reranking_scores', {}).get('combined', 0),
-                'excerpt': text[:200] + '...' if len(text) > 200 else text
+                'excerpt': text[:200] + '...' if len(text) > 200 else text,
+                'text_len': len(text)
             })
             
             current_length += len(text)
@@ -241,22 +248,19 @@ class RAGChatService:
         
         return '\n\n'.join(context_parts), sources
     
-    def generate_response(self, query: str, context: str, conversation_id: Optional[str] = None, search_type: str = "database") -> str:
+    def _build_messages(self, query: str, context: str, conversation_id: Optional[str] = None, search_type: str = "database") -> List[Any]:
         """
-        Generate response using LLM with conversation memory
-        
+        Build the LLM message list for a query, including conversation memory
+
         Args:
             query: User query
             context: Retrieved context
             conversation_id: Optional conversation ID for memory
             search_type: Type of search ("database" or "web")
-            
+
         Returns:
-            Generated response
+            System and user messages for the LLM
         """
-        if not self.llm:
-            return self._generate_fallback_response(query, context)
-        
         # Get conversation history if thread exists
         conversation_context = ""
         if conversation_id and self.memory_service.get_thread_info(conversation_id):
@@ -278,11 +282,28 @@ class RAGChatService:
 ## 新しい質問
 {user_prompt}"""
         
-        # Build messages
-        messages = [
+        return [
             SystemMessage(content=self.get_system_prompt()),
             HumanMessage(content=user_prompt)
         ]
+    
+    def generate_response(self, query: str, context: str, conversation_id: Optional[str] = None, search_type: str = "database") -> str:
+        """
+        Generate response using LLM with conversation memory
+        
+        Args:
+            query: User query
+            context: Retrieved context
+            conversation_id: Optional conversation ID for memory
+            search_type: Type of search ("database" or "web")
+            
+        Returns:
+            Generated response
+        """
+        if not self.llm:
+            return self._generate_fallback_response(query, context)
+        
+        messages = self._build_messages(query, context, conversation_id, search_type)
         
         try:
             # Generate response with token tracking
@@ -297,6 +318,33 @@ class RAGChatService:
             logger.error(f"LLM generation error: {e}")
             return self._generate_fallback_response(query, context)
     
+    async def agenerate_response(self, query: str, context: str, conversation_id: Optional[str] = None, search_type: str = "database") -> str:
+        """
+        Async variant of generate_response() that waits for an LLM concurrency slot
+        
+        Args:
+            query: User query
+            context: Retrieved context
+            conversation_id: Optional conversation ID for memory
+            search_type: Type of search ("database" or "web")
+            
+        Returns:
+            Generated response
+        """
+        if not self.llm:
+            return self._generate_fallback_response(query, context)
+        
+        messages = await asyncio.to_thread(self._build_messages, query, context, conversation_id, search_type)
+        
+        try:
+            with get_openai_callback() as cb:
+                response = await limited_ainvoke(self.llm, messages)
+                logger.info(f"Token usage - Total: {cb.total_tokens}, Prompt: {cb.prompt_tokens}, Completion: {cb.completion_tokens}")
+                return response.content
+        except Exception as e:
+            logger.error(f"LLM generation error: {e}")
+            return self._generate_fallback_response(query, context)
+    
     def _generate_fallback_response(self, query: str, context: str) -> str:
         """Generate fallback response when LLM is unavailable"""
         if not context:
@@ -312,6 +360,162 @@ class RAGChatService:
 
 ※ AI応答が一時的に利用できないため、検索結果の抜粋を表示しています。"""
     
+    def _retrieve_context(
+        self,
+        query: str,
+        n_results: int = 10,
+        use_reranking: bool = True,
+        use_database: bool = True,
+        use_web_search: bool = False,
+        search_results: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the search stage of the RAG pipeline
+        
+        Args:
+            query: User query
+            n_results: Number of search results to retrieve
+            use_reranking: Whether to use reranking
+            use_database: Whether to use vector database search
+            use_web_search: Whether to use web search
+            search_results: Vector search results already fetched by BatchingChatDispatcher
+            
+        Returns:
+            Dict with search_type, context, sources and search_results.
+            When there is nothing to answer from, 'response' holds the
+            message to return instead of calling the LLM.
+        """
+        if use_web_search:
+            # Web search mode
+            logger.info(f"Starting web search for query: {query}")
+            
+            # 詳細検索を使用
+            web_results = self.web_search_service.search_web_detailed(query, max_results=n_results)
+            logger.info(f"Web search returned {len(web_results) if web_results else 0} results")
+            
+            if not web_results:
+                logger.warning(f"No web search results found for query: {query}")
+                return {
+                    'search_type': 'web',
+                    'context': '',
+                    'sources': [],
+                    'search_results': 0,
+                    'response': 'Web検索で情報が見つかりませんでした。別のキーワードでお試しください。'
+                }
+            
+            # Build context from web results
+            context, sources = self.web_search_service.build_web_context(web_results, max_sources=3)
+            logger.info(f"Built context with {len(sources)} sources, context length: {len(context)}")
+            
+            if not context:
+                logger.warning("Empty context from web search results")
+                return {
+                    'search_type': 'web',
+                    'context': '',
+                    'sources': [],
+                    'search_results': len(web_results),
+                    'response': 'Web検索結果からコンテキストを構築できませんでした。'
+                }
+            
+            return {
+                'search_type': 'web',
+                'context': context,
+                'sources': sources,
+                'search_results': len(web_results)
+            }
+        
+        if use_database:
+            # 1. Vector search (retrieve more results for reranking)
+            if search_results is None:
+                search_n = n_results * 2 if use_reranking else n_results
+                search_results = self.vector_service.search(query, n_results=search_n)
+            
+            if not search_results.get('results'):
+                return {
+                    'search_type': 'database',
+                    'context': '',
+                    'sources': [],
+                    'search_results': 0,
+                    'response': 'お探しの情報が見つかりませんでした。別のキーワードでお試しください。'
+                }
+            
+            # 2. Rerank results
+            if use_reranking:
+                ranked_results = self.reranker.rerank(query, search_results['results'])
+                # Take top N after reranking
+                ranked_results = ranked_results[:n_results]
+            else:
+                ranked_results = search_results['results']
+            
+            # 3. Build context
+            context, sources = self.build_context(ranked_results)
+            
+            return {
+                'search_type': 'database',
+                'context': context,
+                'sources': sources,
+                'search_results': len(ranked_results)
+            }
+        
+        # Neither database nor web search enabled
+        return {
+            'search_type': 'none',
+            'context': '',
+            'sources': [],
+            'search_results': 0,
+            'response': '検索ソースが選択されていません。データベースまたはWeb検索を有効にしてください。'
+        }
+    
+    async def _aretrieve_context(
+        self,
+        query: str,
+        n_results: int = 10,
+        use_reranking: bool = True,
+        use_database: bool = True,
+        use_web_search: bool = False,
+        search_results: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run _retrieve_context() off the event loop
+        
+        When both web and database search are enabled, the two searches run
+        concurrently. Web results keep precedence; the database results are
+        used when the web search yields no usable context.
+        """
+        if not (use_web_search and use_database):
+            return await asyncio.to_thread(
+                self._retrieve_context,
+                query, n_results, use_reranking, use_database, use_web_search, search_results
+            )
+        
+        web, database = await asyncio.gather(
+            asyncio.to_thread(self._retrieve_context, query, n_results, use_reranking, False, True),
+            asyncio.to_thread(self._retrieve_context, query, n_results, use_reranking, True, False, search_results),
+            return_exceptions=True
+        )
+        
+        if isinstance(web, dict) and 'response' not in web:
+            return web
+        if isinstance(database, dict) and 'response' not in database:
+            logger.info("Web search gave no usable context, answering from the database")
+            return database
+        if isinstance(web, BaseException):
+            raise web
+        return web
+    
+    def store_exchange(self, conversation_id: Optional[str], query: str, response: str) -> None:
+        """Store a question/answer pair in conversation memory"""
+        if not conversation_id:
+            return
+        
+        # Create thread if it doesn't exist
+        if not self.memory_service.get_thread_info(conversation_id):
+            self.memory_service.create_thread(conversation_id, title=query[:50])
+        
+        # Add messages to memory
+        self.memory_service.add_message(conversation_id, "human", query)
+        self.memory_service.add_message(conversation_id, "ai", response)
+    
     async def chat(
         self, 
         query: str, 
@@ -319,7 +523,8 @@ class RAGChatService:
         n_results: int = 10,
         use_reranking: bool = True,
         use_database: bool = True,
-        use_web_search: bool = False
+        use_web_search: bool = False,
+        search_results: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Main chat endpoint with RAG
@@ -331,6 +536,7 @@ class RAGChatService:
             use_reranking: Whether to use reranking
             use_database: Whether to use vector database search
             use_web_search: Whether to use web search
+            search_results: Vector search results already fetched by BatchingChatDispatcher
             
         Returns:
             Chat response with sources and metadata
@@ -338,151 +544,66 @@ class RAGChatService:
         start_time = datetime.now()
         
         try:
-            # Determine search mode
-            if use_web_search:
-                # Web search mode
-                logger.info(f"Starting web search for query: {query}")
-                
-                try:
-                    # 詳細検索を使用
-                    web_results = self.web_search_service.search_web_detailed(query, max_results=n_results)
-                    logger.info(f"Web search returned {len(web_results) if web_results else 0} results")
-                    
-                    if not web_results:
-                        logger.warning(f"No web search results found for query: {query}")
-                        return {
-                            'query': query,
-                            'response': 'Web検索で情報が見つかりませんでした。別のキーワードでお試しください。',
-                            'sources': [],
-                            'search_results': 0,
-                            'search_type': 'web',
-                            'conversation_id': conversation_id,
-                            'processing_time': (datetime.now() - start_time).total_seconds()
-                        }
-                    
-                    # Build context from web results
-                    context, sources = self.web_search_service.build_web_context(web_results, max_sources=3)
-                    logger.info(f"Built context with {len(sources)} sources, context length: {len(context)}")
-                    
-                    if not context:
-                        logger.warning("Empty context from web search results")
-                        return {
-                            'query': query,
-                            'response': 'Web検索結果からコンテキストを構築できませんでした。',
-                            'sources': [],
-                            'search_results': len(web_results),
-                            'search_type': 'web',
-                            'conversation_id': conversation_id,
-                            'processing_time': (datetime.now() - start_time).total_seconds()
-                        }
-                    
-                    # Generate response
-                    response = self.generate_response(query, context, conversation_id, search_type="web")
-                    logger.info(f"Generated response length: {len(response) if response else 0}")
-                    
-                    if not response:
-                        logger.error("Empty response from generate_response")
-                        response = "申し訳ございません。応答の生成に失敗しました。"
-                    
-                except Exception as web_error:
-                    logger.error(f"Web search error: {web_error}", exc_info=True)
-                    return {
-                        'query': query,
-                        'response': f'Web検索中にエラーが発生しました: {str(web_error)}',
-                        'sources': [],
-                        'search_results': 0,
-                        'search_type': 'web',
-                        'error': str(web_error),
-                        'processing_time': (datetime.now() - start_time).total_seconds()
-                    }
-                
-                # Store in conversation memory using memory service
-                if conversation_id:
-                    # Create thread if it doesn't exist
-                    if not self.memory_service.get_thread_info(conversation_id):
-                        self.memory_service.create_thread(conversation_id, title=query[:50])
-                    
-                    # Add messages to memory
-                    self.memory_service.add_message(conversation_id, "human", query)
-                    self.memory_service.add_message(conversation_id, "ai", response)
-                
-                # Return web search response
+            try:
+                retrieval = await self._aretrieve_context(
+                    query, n_results, use_reranking, use_database, use_web_search, search_results
+                )
+            except Exception as web_error:
+                if not use_web_search:
+                    raise
+                logger.error(f"Web search error: {web_error}", exc_info=True)
                 return {
                     'query': query,
-                    'response': response,
-                    'sources': sources,
-                    'search_results': len(web_results),
+                    'response': f'Web検索中にエラーが発生しました: {str(web_error)}',
+                    'sources': [],
+                    'search_results': 0,
                     'search_type': 'web',
-                    'conversation_id': conversation_id,
-                    'processing_time': (datetime.now() - start_time).total_seconds(),
-                    'timestamp': datetime.now().isoformat()
+                    'error': str(web_error),
+                    'processing_time': (datetime.now() - start_time).total_seconds()
                 }
-                
-            elif use_database:
-                # Database search mode (existing implementation)
-                # 1. Vector search (retrieve more results for reranking)
-                search_n = n_results * 2 if use_reranking else n_results
-                search_results = self.vector_service.search(query, n_results=search_n)
             
-                if not search_results.get('results'):
-                    return {
-                        'query': query,
-                        'response': 'お探しの情報が見つかりませんでした。別のキーワードでお試しください。',
-                        'sources': [],
-                        'search_results': 0,
-                        'search_type': 'database',
-                        'conversation_id': conversation_id,
-                        'processing_time': (datetime.now() - start_time).total_seconds()
-                    }
-                
-                # 2. Rerank results
-                if use_reranking:
-                    ranked_results = self.reranker.rerank(query, search_results['results'])
-                    # Take top N after reranking
-                    ranked_results = ranked_results[:n_results]
-                else:
-                    ranked_results = search_results['results']
-                
-                # 3. Build context
-                context, sources = self.build_context(ranked_results)
-                
-                # 4. Generate response
-                response = self.generate_response(query, context, conversation_id)
-                
-                # 5. Store in conversation memory using memory service
-                if conversation_id:
-                    # Create thread if it doesn't exist
-                    if not self.memory_service.get_thread_info(conversation_id):
-                        self.memory_service.create_thread(conversation_id, title=query[:50])
-                    
-                    # Add messages to memory
-                    self.memory_service.add_message(conversation_id, "human", query)
-                    self.memory_service.add_message(conversation_id, "ai", response)
-                
-                # 6. Return structured response
-                return {
-                    'query': query,
-                    'response': response,
-                    'sources': sources,
-                    'search_results': len(ranked_results),
-                    'search_type': 'database',
-                    'used_reranking': use_reranking,
-                    'conversation_id': conversation_id,
-                    'processing_time': (datetime.now() - start_time).total_seconds(),
-                    'timestamp': datetime.now().isoformat()
-                }
-            else:
-                # Neither database nor web search enabled
+            search_type = retrieval['search_type']
+            
+            if 'response' in retrieval:
                 return {
                     'query': query,
-                    'response': '検索ソースが選択されていません。データベースまたはWeb検索を有効にしてください。',
+                    'response': retrieval['response'],
                     'sources': [],
-                    'search_results': 0,
-                    'search_type': 'none',
+                    'search_results': retrieval['search_results'],
+                    'search_type': search_type,
                     'conversation_id': conversation_id,
                     'processing_time': (datetime.now() - start_time).total_seconds()
                 }
             
+            # 4. Generate response
+            response = await self.agenerate_response(
+                query, retrieval['context'], conversation_id, search_type
+            )
+            
+            if search_type == 'web':
+                logger.info(f"Generated response length: {len(response) if response else 0}")
+                if not response:
+                    logger.error("Empty response from generate_response")
+                    response = "申し訳ございません。応答の生成に失敗しました。"
+            
+            # 5. Store in conversation memory using memory service
+            await asyncio.to_thread(self.store_exchange, conversation_id, query, response)
+            
+            # 6. Return structured response
+            result = {
+                'query': query,
+                'response': response,
+                'sources': retrieval['sources'],
+                'search_results': retrieval['search_results'],
+                'search_type': search_type,
+                'conversation_id': conversation_id,
+                'processing_time': (datetime.now() - start_time).total_seconds(),
+                'timestamp': datetime.now().isoformat()
+            }
+            if search_type == 'database':
+                result['used_reranking'] = use_reranking
+            return result
+            
         except Exception as e:
             logger.error(f"Chat processing error: {e}")
             return {
@@ -495,6 +616,100 @@ class RAGChatService:
                 'conversation_id': conversation_id
             }
     
+    async def achat_stream(
+        self,
+        query: str,
+        conversation_id: Optional[str] = None,
+        n_results: int = 10,
+        use_reranking: bool = True,
+        use_database: bool = True,
+        use_web_search: bool = False
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of chat()
+        
+        Yields (event, data) pairs: one ("sources", {...}) as soon as retrieval
+        finishes, ("token", delta_text) for every generated token, and a final
+        ("done", summary) where summary carries the same metadata chat() returns.
+        
+        Args:
+            query: User query
+            conversation_id: Optional conversation ID
+            n_results: Number of search results to retrieve
+            use_reranking: Whether to use reranking
+            use_database: Whether to use vector database search
+            use_web_search: Whether to use web search
+        """
+        start_time = datetime.now()
+        
+        try:
+            retrieval = await self._aretrieve_context(
+                query, n_results, use_reranking, use_database, use_web_search
+            )
+        except Exception as e:
+            logger.error(f"Chat processing error: {e}", exc_info=True)
+            retrieval = {
+                'search_type': 'web' if use_web_search else 'database',
+                'context': '',
+                'sources': [],
+                'search_results': 0,
+                'response': f'エラーが発生しました: {str(e)}',
+                'error': str(e)
+            }
+        
+        search_type = retrieval['search_type']
+        summary = {
+            'query': query,
+            'sources': retrieval['sources'],
+            'search_results': retrieval['search_results'],
+            'search_type': search_type,
+            'conversation_id': conversation_id
+        }
+        if search_type == 'database':
+            summary['used_reranking'] = use_reranking
+        if 'error' in retrieval:
+            summary['error'] = retrieval['error']
+        
+        # Sources are known before generation starts; send them right away
+        yield "sources", {
+            'sources': retrieval['sources'],
+            'search_results': retrieval['search_results'],
+            'search_type': search_type
+        }
+        
+        if 'response' in retrieval:
+            yield "token", retrieval['response']
+            summary['processing_time'] = (datetime.now() - start_time).total_seconds()
+            yield "done", summary
+            return
+        
+        context = retrieval['context']
+        parts: List[str] = []
+        
+        if self.llm:
+            messages = await asyncio.to_thread(self._build_messages, query, context, conversation_id, search_type)
+            try:
+                # The slot is held for the whole stream: it is one in-flight request
+                async with llm_semaphore:
+                    async for chunk in self.llm.astream(messages):
+                        if chunk.content:
+                            parts.append(chunk.content)
+                            yield "token", chunk.content
+            except Exception as e:
+                logger.error(f"LLM streaming error: {e}")
+        
+        if not parts:
+            # LLM unavailable or failed before the first token
+            fallback = self._generate_fallback_response(query, context)
+            parts.append(fallback)
+            yield "token", fallback
+        
+        await asyncio.to_thread(self.store_exchange, conversation_id, query, ''.join(parts))
+        
+        summary['processing_time'] = (datetime.now() - start_time).total_seconds()
+        summary['timestamp'] = datetime.now().isoformat()
+        yield "done", summary
+    
     def get_conversation_history(self, conversation_id: str) -> List[Dict[str, Any]]:
         """Get conversation history"""
         return self.conversations.get(conversation_id, [])
@@ -130,10 +130,30 @@ class RAGService:
         Returns:
             RAG response with sources
         """
-        try:
-            # Perform vector search
-            search_results = self.vector_service.search(query, n_results)
+        # Perform vector search
+        search_results = self.vector_service.search(query, n_results)
+        return self.answer(query, search_results, use_llm, return_sources)
+    
+    def answer(
+        self,
+        query: str,
+        search_results: Dict[str, Any],
+        use_llm: bool = True,
+        return_sources: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Build the RAG response from vector search results
+        
+        Args:
+            query: User query
+            search_results: Result of VectorizationService.search for the query
+            use_llm: Whether to use LLM for response generation
+            return_sources: Whether to return source documents
             
+        Returns:
+            RAG response with sources
+        """
+        try:
             if not search_results.get("results"):
                 return {
                     "query": query,
@@ -16,6 +16,14 @@ from langchain_community.chat_models import ChatOpenAI
 from langchain.schema import BaseMessage, HumanMessage, AIMessage
 from langchain.prompts import PromptTemplate
 
+from app.services.history_window import (
+    MAX_HISTORY_MESSAGES,
+    summary_executor,
+    fold_into_summary,
+    with_rolling_summary
+)
+from app.core.http_clients import openai_client_kwargs
+
 logger = logging.getLogger(__name__)
 
 class RedisMemoryService:
@@ -53,7 +61,8 @@ class RedisMemoryService:
             self.llm = ChatOpenAI(
                 model="gpt-4o-mini",
                 temperature=0.3,
-                openai_api_key=api_key
+                openai_api_key=api_key,
+                **openai_client_kwargs(api_key)
             )
             logger.info("Redis memory service initialized with OpenAI")
         else:
@@ -184,8 +193,62 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
             title = content[:50] + "..." if len(content) > 50 else content
             self.redis_client.hset(f"thread:{thread_id}:metadata", "title", title)
         
+        # Keep only the most recent messages; older ones go into the rolling summary
+        self._trim_history(thread_id)
+        
         return True
     
+    def _trim_history(self, thread_id: str) -> None:
+        """
+        Evict messages beyond MAX_HISTORY_MESSAGES and fold them into the
+        rolling summary in the background
+        
+        Args:
+            thread_id: Thread identifier
+        """
+        history_key = f"thread:{thread_id}"
+        
+        # RedisChatMessageHistory pushes new messages to the head of the list.
+        # Read and trim in one MULTI/EXEC so a message pushed in between cannot
+        # shift the indices and be trimmed without being read.
+        pipe = self.redis_client.pipeline()
+        pipe.lrange(history_key, MAX_HISTORY_MESSAGES, -1)
+        pipe.ltrim(history_key, 0, MAX_HISTORY_MESSAGES - 1)
+        evicted_raw, _ = pipe.execute()
+        if not evicted_raw:
+            return
+        
+        evicted = []
+        for item in reversed(evicted_raw):
+            data = json.loads(item)
+            evicted.append({
+                "role": data.get("type", "human"),
+                "content": data.get("data", {}).get("content", "")
+            })
+        
+        summary_executor.submit(self._fold_evicted, thread_id, evicted)
+    
+    def _fold_evicted(self, thread_id: str, evicted: List[Dict[str, str]]) -> None:
+        """Merge evicted messages into the thread's rolling summary"""
+        try:
+            summary_key = f"thread:{thread_id}:rolling_summary"
+            previous_summary = self.redis_client.get(summary_key) or ""
+            self.redis_client.set(summary_key, fold_into_summary(self.llm, previous_summary, evicted))
+        except Exception as e:
+            logger.error(f"Failed to update rolling summary for {thread_id}: {e}")
+    
+    def get_rolling_summary(self, thread_id: str) -> str:
+        """
+        Get the summary of messages evicted from the thread window
+        
+        Args:
+            thread_id: Thread identifier
+            
+        Returns:
+            Rolling summary (empty if nothing was evicted yet)
+        """
+        return self.redis_client.get(f"thread:{thread_id}:rolling_summary") or ""
+    
     def get_memory(self, thread_id: str) -> Optional[ConversationBufferMemory]:
         """
         Get the memory object for a thread
@@ -252,7 +315,7 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
             elif isinstance(msg, AIMessage):
                 context_parts.append(f"アシスタント: {msg.content}")
         
-        return "\n\n".join(context_parts)
+        return with_rolling_summary("\n\n".join(context_parts), self.get_rolling_summary(thread_id))
     
     def get_thread_info(self, thread_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -314,8 +377,12 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
         # Delete metadata
         self.redis_client.delete(f"thread:{thread_id}:metadata")
         
-        # Delete message history
-        self.redis_client.delete(f"thread:{thread_id}")
+        # Delete message history and summaries
+        self.redis_client.delete(
+            f"thread:{thread_id}",
+            f"thread:sum:{thread_id}",
+            f"thread:{thread_id}:rolling_summary"
+        )
         
         # Remove from thread IDs set
         self.redis_client.srem("thread:ids", thread_id)
@@ -382,6 +449,48 @@ AIアシスタント: 会話履歴を踏まえて、適切に応答します。"
         
         return "新しい会話"
     
+    def get_cached_summary(self, thread_id: str, version: str) -> Optional[str]:
+        """
+        Get a cached thread summary
+        
+        Args:
+            thread_id: Thread identifier
+            version: Thread version the summary must have been built from
+            
+        Returns:
+            Cached summary or None if missing or outdated
+        """
+        try:
+            cached = self.redis_client.get(f"thread:sum:{thread_id}")
+            if not cached:
+                return None
+            data = json.loads(cached)
+            if data.get("version") != version:
+                return None
+            return data.get("summary")
+        except Exception as e:
+            logger.warning(f"Failed to read cached summary for {thread_id}: {e}")
+            return None
+    
+    def set_cached_summary(self, thread_id: str, version: str, summary: str, ttl: int = 3600) -> None:
+        """
+        Cache a thread summary
+        
+        Args:
+            thread_id: Thread identifier
+            version: Thread version the summary was built from
+            summary: Summary text
+            ttl: Expiration in seconds
+        """
+        try:
+            self.redis_client.setex(
+                f"thread:sum:{thread_id}",
+                ttl,
+                json.dumps({"version": version, "summary": summary}, ensure_ascii=False)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache summary for {thread_id}: {e}")
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get Redis statistics
@@ -0,0 +1,164 @@
+"""
+Two-tier response cache for RAG chat
+
+Exact tier: Redis, keyed by a hash of the normalized query and search options.
+Semantic tier: in-process SemanticCache of recent query embeddings, matched by
+cosine similarity so near-identical questions reuse an answer.
+"""
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core.database import get_redis
+from app.services.semantic_cache import SemanticCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = int(os.getenv("CHAT_CACHE_TTL", "300"))
+SIMILARITY_THRESHOLD = float(os.getenv("CHAT_CACHE_SIMILARITY", "0.97"))
+MAX_SEMANTIC_ENTRIES = 512
+
+
+class ResponseCache:
+    """Exact + semantic cache for chat responses"""
+    
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        model: str = "",
+        ttl: int = CACHE_TTL,
+        similarity_threshold: float = SIMILARITY_THRESHOLD,
+        max_entries: int = MAX_SEMANTIC_ENTRIES
+    ):
+        """
+        Initialize response cache
+        
+        Args:
+            embed_fn: Function returning the embedding of a query (enables the semantic tier)
+            model: Name of the model producing the answers; part of every cache key
+            ttl: Seconds a cached response stays valid
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            max_entries: Maximum number of embeddings kept in the semantic tier
+        """
+        self.embed_fn = embed_fn
+        self.model = model
+        self.ttl = ttl
+        
+        # Semantic tier, keyed by the search options of each cached answer
+        self._semantic = SemanticCache(
+            similarity_threshold=similarity_threshold,
+            ttl=ttl,
+            max_entries=max_entries
+        )
+    
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Collapse whitespace and case so trivially different queries share a key"""
+        return " ".join(query.lower().split())
+    
+    @staticmethod
+    def _options_key(request) -> str:
+        """Search options that change the answer for the same query"""
+        return f"{request.use_reranking}|{request.n_results}|{request.use_database}|{request.use_web_search}"
+    
+    def make_key(self, request) -> str:
+        """Build the exact-match cache key for a chat request"""
+        raw = f"{self.model}|{self._normalize_query(request.message)}|{self._options_key(request)}"
+        return f"chat_cache:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+    
+    def is_cacheable(self, request) -> bool:
+        """Web search answers depend on live results and are never cached"""
+        return not request.use_web_search
+    
+    @staticmethod
+    def normalize_embedding(embedding: Optional[List[float]]) -> Optional[np.ndarray]:
+        """Scale an embedding to unit length so dot products are cosine similarities"""
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+    
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Return the normalized query embedding, or None if unavailable"""
+        if not self.embed_fn:
+            return None
+        try:
+            return self.normalize_embedding(self.embed_fn(query))
+        except Exception as e:
+            logger.warning(f"Query embedding for cache failed: {e}")
+            return None
+    
+    async def get(self, request, query_embedding: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+        
+        Args:
+            request: Chat request
+            query_embedding: Normalized query embedding from embed_query()
+        
+        Returns:
+            Cached chat result or None
+        """
+        if not self.is_cacheable(request):
+            return None
+        
+        # 1. Exact match in Redis
+        try:
+            redis_client = await get_redis()
+            if redis_client:
+                cached = await redis_client.get(self.make_key(request))
+                if cached:
+                    logger.info("Chat cache hit (exact)")
+                    return json.loads(cached)
+        except Exception as e:
+            logger.warning(f"Chat cache lookup failed: {e}")
+        
+        # 2. Nearest recent query by cosine similarity
+        if query_embedding is None:
+            return None
+        
+        cached = self._semantic.get(query_embedding, self._options_key(request))
+        if cached is not None:
+            logger.info("Chat cache hit (semantic)")
+            return dict(cached)
+        return None
+    
+    async def put(self, request, result: Dict[str, Any], query_embedding: Optional[np.ndarray] = None) -> None:
+        """
+        Store a chat response
+        
+        Args:
+            request: Chat request
+            result: Chat result returned by RAGChatService
+            query_embedding: Normalized query embedding from embed_query()
+        """
+        if not self.is_cacheable(request) or result.get("error"):
+            return
+        # Sources pointing at live URLs go stale quickly
+        if any(source.get("url") for source in result.get("sources", [])):
+            return
+        
+        try:
+            redis_client = await get_redis()
+            if redis_client:
+                await redis_client.setex(
+                    self.make_key(request),
+                    self.ttl,
+                    json.dumps(result, ensure_ascii=False, default=str)
+                )
+        except Exception as e:
+            logger.warning(f"Chat cache store failed: {e}")
+        
+        if query_embedding is None:
+            return
+        
+        self._semantic.put(query_embedding, self._options_key(request), dict(result))
+    
+    def clear(self) -> None:
+        """Drop the in-process semantic tier"""
+        self._semantic.clear()
@@ -0,0 +1,51 @@
+"""
+Precomputed search suggestion counts
+
+/search/suggestions used to run a case-insensitive $regex + $group over the
+whole search history on every keystroke. A background task now aggregates the
+history into search_history_counts (one document per lower-cased query with its
+count), and the endpoint answers with an indexed prefix range on that
+collection.
+"""
+import os
+import asyncio
+import logging
+
+from app.core.database import get_mongodb
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = int(os.getenv("SEARCH_SUGGESTIONS_REFRESH", "300"))
+
+COUNTS_COLLECTION = "search_history_counts"
+
+# Group the history by lower-cased query and upsert the counts
+_REFRESH_PIPELINE = [
+    {"$match": {"query": {"$type": "string"}}},
+    {"$group": {"_id": {"$toLower": "$query"}, "query": {"$first": "$query"}, "count": {"$sum": 1}}},
+    {"$project": {"_id": 0, "query_lower": "$_id", "query": 1, "count": 1}},
+    {"$merge": {"into": COUNTS_COLLECTION, "on": "query_lower", "whenMatched": "replace", "whenNotMatched": "insert"}}
+]
+
+
+async def refresh_search_history_counts() -> None:
+    """Rebuild search_history_counts from search_history"""
+    mongodb = await get_mongodb()
+    # $merge on query_lower requires a unique index on that field
+    await mongodb[COUNTS_COLLECTION].create_index("query_lower", unique=True)
+    await mongodb.search_history.aggregate(_REFRESH_PIPELINE).to_list(length=None)
+
+
+async def run_refresh_loop(interval: int = REFRESH_INTERVAL) -> None:
+    """
+    Refresh the suggestion counts now and then every interval seconds
+    
+    Args:
+        interval: Seconds between refreshes
+    """
+    while True:
+        try:
+            await refresh_search_history_counts()
+        except Exception as e:
+            logger.warning(f"Failed to refresh search suggestions: {e}")
+        await asyncio.sleep(interval)
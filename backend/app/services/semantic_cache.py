@@ -0,0 +1,127 @@
+"""
+In-process semantic cache for vector search results
+
+Entries are keyed by the (unit-length) query embedding plus the search options.
+A lookup returns the result of the most similar cached query if its cosine
+similarity reaches the threshold, so near-duplicate queries skip the vector
+store. Services clear the cache whenever their index changes.
+"""
+import os
+import time
+import threading
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+SIMILARITY_THRESHOLD = float(os.getenv("SEARCH_CACHE_SIMILARITY", "0.97"))
+CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "300"))
+MAX_ENTRIES = 1024
+
+
+class SemanticCache:
+    """Bounded embedding-similarity cache (oldest entries are evicted first)"""
+    
+    def __init__(
+        self,
+        similarity_threshold: float = SIMILARITY_THRESHOLD,
+        ttl: int = CACHE_TTL,
+        max_entries: int = MAX_ENTRIES
+    ):
+        """
+        Initialize semantic cache
+        
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit
+            ttl: Seconds an entry stays valid
+            max_entries: Maximum number of cached queries
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        
+        # Ring buffer: row i of _vectors and _expires belongs to _entries[i]:
+        # (options, value). Rows are allocated once, on the first put, and
+        # overwritten in place starting from the oldest; expired rows are
+        # masked out on lookup. _size counts the rows written so far.
+        self._vectors: Optional[np.ndarray] = None
+        self._expires = np.full(max_entries, -np.inf)
+        self._entries: List[Optional[tuple]] = [None] * max_entries
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def normalize(embedding) -> Optional[np.ndarray]:
+        """Scale an embedding to unit length so dot products are cosine similarities"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+    
+    def get(self, embedding, options: Hashable) -> Optional[Any]:
+        """
+        Look up the result of the most similar cached query with the same options
+        
+        Args:
+            embedding: Query embedding
+            options: Search options that change the result (filters, result count)
+        
+        Returns:
+            Cached value or None
+        """
+        vector = self.normalize(embedding)
+        if vector is None:
+            return None
+        
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                return None
+            
+            # Only live rows above the threshold are ranked, best first
+            size = self._size
+            scores = self._vectors[:size] @ vector
+            live = self._expires[:size] > time.monotonic()
+            candidates = np.flatnonzero((scores >= self.similarity_threshold) & live)
+            for i in candidates[np.argsort(scores[candidates])[::-1]]:
+                entry_options, value = self._entries[i]
+                if entry_options == options:
+                    return value
+        return None
+    
+    def put(self, embedding, options: Hashable, value: Any) -> None:
+        """
+        Store a search result
+        
+        Args:
+            embedding: Query embedding
+            options: Search options that change the result
+            value: Result to return for similar queries (treated as read-only)
+        """
+        vector = self.normalize(embedding)
+        if vector is None:
+            return
+        
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                # First entry (or the embedding size changed): allocate the buffer
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._reset()
+            
+            # Overwrite the oldest row in place
+            i = self._next
+            self._vectors[i] = vector
+            self._expires[i] = time.monotonic() + self.ttl
+            self._entries[i] = (options, value)
+            self._next = (i + 1) % self.max_entries
+            self._size = max(self._size, i + 1)
+    
+    def _reset(self) -> None:
+        """Mark every row empty (caller holds the lock)"""
+        self._expires.fill(-np.inf)
+        self._entries = [None] * self.max_entries
+        self._next = 0
+        self._size = 0
+    
+    def clear(self) -> None:
+        """Drop every entry (call when the underlying index changes)"""
+        with self._lock:
+            self._reset()
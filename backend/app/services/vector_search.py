@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 import numpy as np
 import asyncio
+import threading
 try:
     from sentence_transformers import SentenceTransformer
     SENTENCE_TRANSFORMERS_AVAILABLE = True
@@ -54,37 +55,31 @@ class VectorSearchService:
         # テキストをチャンクに分割
         chunks = self._split_text(content)
         
-        # 各チャンクをベクトル化
-        documents = []
-        embeddings = []
-        ids = []
-        metadatas = []
-        
-        for i, chunk in enumerate(chunks):
-            # 非同期でベクトル化を実行
-            if self.encoder:
-                loop = asyncio.get_event_loop()
-                embedding = await loop.run_in_executor(None, self.encoder.encode, chunk)
-            else:
-                # エンコーダーが利用できない場合はダミーベクトルを使用
-                embedding = np.random.rand(384)  # デフォルトのembedding size
-            
-            chunk_id = f"{document_id}_{i}"
-            chunk_metadata = {
+        if not chunks:
+            return
+        
+        # 全チャンクを1回のエンコード呼び出しでまとめてベクトル化
+        if self.encoder:
+            loop = asyncio.get_event_loop()
+            embeddings = await loop.run_in_executor(None, self.encoder.encode, chunks)
+        else:
+            # エンコーダーが利用できない場合はダミーベクトルを使用
+            embeddings = np.random.rand(len(chunks), 384)  # デフォルトのembedding size
+        
+        ids = [f"{document_id}_{i}" for i in range(len(chunks))]
+        metadatas = [
+            {
                 **metadata,
                 "chunk_index": i,
                 "document_id": document_id
             }
-            
-            documents.append(chunk)
-            embeddings.append(embedding.tolist())
-            ids.append(chunk_id)
-            metadatas.append(chunk_metadata)
+            for i in range(len(chunks))
+        ]
         
         # バッチでコレクションに追加
         self.collection.add(
-            documents=documents,
-            embeddings=embeddings,
+            documents=chunks,
+            embeddings=embeddings.tolist(),
             ids=ids,
             metadatas=metadatas
         )
@@ -104,8 +99,9 @@ class VectorSearchService:
             # エンコーダーが利用できない場合はダミーベクトルを使用
             query_embedding = np.random.rand(384)
         
-        # 検索実行
-        results = self.collection.query(
+        # 検索実行（ChromaDBの検索はブロッキングのためスレッドで行う）
+        results = await asyncio.to_thread(
+            self.collection.query,
             query_embeddings=[query_embedding.tolist()],
             where=filters,
             n_results=top_k
@@ -194,4 +190,17 @@ class VectorSearchService:
             "application/msword": "doc",
             "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "doc"
         }
-        return type_mapping.get(content_type, "txt")
\ No newline at end of file
+        return type_mapping.get(content_type, "txt")
+
+# Singleton instance (the encoder and the Chroma client are expensive to create)
+_vector_search_service: Optional[VectorSearchService] = None
+_vector_search_service_lock = threading.Lock()
+
+def get_vector_search_service() -> VectorSearchService:
+    """Get or create the singleton vector search service"""
+    global _vector_search_service
+    if _vector_search_service is None:
+        with _vector_search_service_lock:
+            if _vector_search_service is None:
+                _vector_search_service = VectorSearchService()
+    return _vector_search_service
@@ -4,15 +4,21 @@ Vector Database Service using ChromaDB for RAG implementation
 import os
 import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import chromadb
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from app.services.semantic_cache import SemanticCache
+
 logger = logging.getLogger(__name__)
 
+# Results of recent searches, shared by every instance (they all use the same
+# collection) and cleared whenever the collection changes
+_search_cache = SemanticCache()
+
 class VectorizationService:
     """Service for vectorizing and storing converted documents in ChromaDB"""
     
@@ -130,6 +136,7 @@ class VectorizationService:
             if existing and existing['ids']:
                 # Delete existing chunks
                 self.collection.delete(ids=existing['ids'])
+                _search_cache.clear()
                 logger.info(f"Deleted {len(existing['ids'])} existing chunks for {filename}")
             
             # Create chunks
@@ -148,6 +155,7 @@ class VectorizationService:
                 documents=[chunk["text"] for chunk in chunks],
                 metadatas=[chunk["metadata"] for chunk in chunks]
             )
+            _search_cache.clear()
             
             logger.info(f"Vectorized {filename}: {len(chunks)} chunks")
             
@@ -211,30 +219,61 @@ class VectorizationService:
         Returns:
             Search results with metadata
         """
+        return self.search_batch([(query, n_results)])[0]
+    
+    def search_batch(self, requests: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+        """
+        Run several searches with one embedding pass and one query per result count
+        
+        Args:
+            requests: (query, n_results) pairs
+            
+        Returns:
+            Search results for each request, in order
+        """
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results,
-                include=["documents", "metadatas", "distances"]
-            )
+            query_embeddings = self.embedding_function([query for query, _ in requests])
+            timestamp = datetime.now().isoformat()
+            search_results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
             
-            # Format results
-            formatted_results = []
-            if results and results['ids'] and results['ids'][0]:
-                for i in range(len(results['ids'][0])):
-                    formatted_results.append({
-                        "text": results['documents'][0][i],
-                        "metadata": results['metadatas'][0][i],
-                        "distance": results['distances'][0][i],
-                        "similarity": 1 - results['distances'][0][i]  # Convert distance to similarity
-                    })
+            # Near-duplicate queries reuse a recent result instead of querying the index
+            pending: Dict[int, List[int]] = {}
+            for i, (query, n_results) in enumerate(requests):
+                cached = _search_cache.get(query_embeddings[i], n_results)
+                if cached is not None:
+                    search_results[i] = {**cached, "query": query, "timestamp": timestamp}
+                else:
+                    pending.setdefault(n_results, []).append(i)
             
-            return {
-                "query": query,
-                "results": formatted_results,
-                "count": len(formatted_results),
-                "timestamp": datetime.now().isoformat()
-            }
+            for n_results, indices in pending.items():
+                results = self.collection.query(
+                    query_embeddings=[query_embeddings[i] for i in indices],
+                    n_results=n_results,
+                    include=["documents", "metadatas", "distances"]
+                )
+                
+                # Format results
+                for row, i in enumerate(indices):
+                    formatted_results = []
+                    if results and results['ids'] and results['ids'][row]:
+                        for j in range(len(results['ids'][row])):
+                            formatted_results.append({
+                                "text": results['documents'][row][j],
+                                "metadata": results['metadatas'][row][j],
+                                "distance": results['distances'][row][j],
+                                "similarity": 1 - results['distances'][row][j]  # Convert distance to similarity
+                            })
+                    
+                    search_result = {
+                        "query": requests[i][0],
+                        "results": formatted_results,
+                        "count": len(formatted_results),
+                        "timestamp": timestamp
+                    }
+                    _search_cache.put(query_embeddings[i], n_results, search_result)
+                    search_results[i] = search_result
+            
+            return search_results
             
         except Exception as e:
             logger.error(f"Search error: {e}")
@@ -291,6 +330,7 @@ class VectorizationService:
             if results and results['ids']:
                 # Delete all chunks
                 self.collection.delete(ids=results['ids'])
+                _search_cache.clear()
                 
                 return {
                     "status": "success",
@@ -327,6 +367,7 @@ class VectorizationService:
                 embedding_function=self.embedding_function,
                 metadata={"hnsw:space": "cosine"}
             )
+            _search_cache.clear()
             
             return {
                 "status": "success",
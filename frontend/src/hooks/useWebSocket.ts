@@ -16,6 +16,12 @@ interface ProgressData {
   output_file?: string;
 }
 
+// Several queued messages sent in one frame by the backend
+interface BatchFrame {
+  type: 'batch';
+  messages: ProgressData[];
+}
+
 interface UseWebSocketReturn {
   isConnected: boolean;
   progressData: Record<string, ProgressData>;
@@ -78,6 +84,58 @@ export const useWebSocket = (url?: string): UseWebSocketReturn => {
         }, 30000);
       };
 
+      const handleMessage = (data: ProgressData) => {
+        console.log('🔄 WebSocket message received:', data);
+        console.log('Message type:', data.type);
+        console.log('Conversion ID:', data.conversion_id);
+        console.log('Progress:', data.progress);
+        console.log('Status:', data.status);
+        
+        if (data.type === 'progress' && data.conversion_id) {
+          console.log('📊 Updating progress data for conversion:', data.conversion_id);
+          setProgressData(prev => {
+            // Don't clear other conversions when progress is 0, just add/update
+            console.log('📈 Updating conversion progress');
+            const updated = {
+              ...prev,
+              [data.conversion_id!]: data
+            };
+            console.log('Updated progress data:', updated);
+            return updated;
+          });
+        } else if (data.type === 'batch_progress' && data.batch_id) {
+          setProgressData(prev => ({
+            ...prev,
+            [data.batch_id!]: data
+          }));
+        } else if (data.type === 'completion' && data.conversion_id) {
+          console.log('Processing completion event:', data);
+          setProgressData(prev => {
+            const updatedData = {
+              ...prev,
+              [data.conversion_id!]: {
+                ...prev[data.conversion_id!],
+                ...data,
+                progress: 100,
+                status: data.success ? 'completed' as const : 'error' as const
+              }
+            };
+            console.log('Updated progress data:', updatedData);
+            return updatedData;
+          });
+          
+          // Auto-clear completed progress after 10 seconds (increased from 5)
+          setTimeout(() => {
+            console.log('Auto-clearing progress for conversion:', data.conversion_id);
+            setProgressData(prev => {
+              const newData = { ...prev };
+              delete newData[data.conversion_id!];
+              return newData;
+            });
+          }, 10000);
+        }
+      };
+
       ws.onmessage = (event) => {
         try {
           // Handle pong response
@@ -85,56 +143,9 @@ export const useWebSocket = (url?: string): UseWebSocketReturn => {
             return;
           }
           
-          const data: ProgressData = JSON.parse(event.data);
-          console.log('🔄 WebSocket message received:', data);
-          console.log('Message type:', data.type);
-          console.log('Conversion ID:', data.conversion_id);
-          console.log('Progress:', data.progress);
-          console.log('Status:', data.status);
-          
-          if (data.type === 'progress' && data.conversion_id) {
-            console.log('📊 Updating progress data for conversion:', data.conversion_id);
-            setProgressData(prev => {
-              // Don't clear other conversions when progress is 0, just add/update
-              console.log('📈 Updating conversion progress');
-              const updated = {
-                ...prev,
-                [data.conversion_id!]: data
-              };
-              console.log('Updated progress data:', updated);
-              return updated;
-            });
-          } else if (data.type === 'batch_progress' && data.batch_id) {
-            setProgressData(prev => ({
-              ...prev,
-              [data.batch_id!]: data
-            }));
-          } else if (data.type === 'completion' && data.conversion_id) {
-            console.log('Processing completion event:', data);
-            setProgressData(prev => {
-              const updatedData = {
-                ...prev,
-                [data.conversion_id!]: {
-                  ...prev[data.conversion_id!],
-                  ...data,
-                  progress: 100,
-                  status: data.success ? 'completed' as const : 'error' as const
-                }
-              };
-              console.log('Updated progress data:', updatedData);
-              return updatedData;
-            });
-            
-            // Auto-clear completed progress after 10 seconds (increased from 5)
-            setTimeout(() => {
-              console.log('Auto-clearing progress for conversion:', data.conversion_id);
-              setProgressData(prev => {
-                const newData = { ...prev };
-                delete newData[data.conversion_id!];
-                return newData;
-              });
-            }, 10000);
-          }
+          const frame: ProgressData | BatchFrame = JSON.parse(event.data);
+          const messages = frame.type === 'batch' ? frame.messages : [frame];
+          messages.forEach(handleMessage);
         } catch (error) {
           console.error('Failed to parse WebSocket message:', error, event.data);
         }